@@ -0,0 +1,106 @@
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import connection, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+from .models import ActivityEvent
+
+logger = logging.getLogger('activity')
+
+# Registro de atividade sem INSERT por mutação: record() só enfileira o
+# evento depois do commit da mutação, num buffer por processo. O buffer vira
+# um INSERT de várias linhas quando enche (ACTIVITY_BUFFER_SIZE) ou quando o
+# evento mais antigo passa de ACTIVITY_FLUSH_INTERVAL segundos. Os dois casos
+# rodam na thread de fundo: na requisição, o INSERT passaria pelo roteador
+# como escrita do usuário e prenderia as leituras dele ao primário
+# (organiza_me.db_router). Se o processo morrer sem flush, os eventos
+# pendentes se perdem: é um feed de atividade, não uma trilha contábil.
+
+
+class ActivityBuffer:
+    def __init__(self):
+        self.events = []
+        self.oldest = None
+        self.lock = threading.Lock()
+        # Acorda a thread no primeiro evento (começa a contar o intervalo) e
+        # quando o buffer enche
+        self.wake = threading.Event()
+        self.flusher = None
+
+    def add(self, event):
+        with self.lock:
+            first = not self.events
+            if first:
+                self.oldest = time.monotonic()
+            self.events.append(event)
+            full = len(self.events) >= settings.ACTIVITY_BUFFER_SIZE
+        if first or full:
+            self.wake.set()
+        self.start_flusher()
+
+    def flush(self):
+        with self.lock:
+            events, self.events = self.events, []
+            self.oldest = None
+        if not events:
+            return 0
+        try:
+            ActivityEvent.objects.bulk_create(events, batch_size=500)
+        except Exception:
+            logger.exception("Falha ao gravar %s evento(s) de atividade", len(events))
+            return 0
+        return len(events)
+
+    def start_flusher(self):
+        if self.flusher is not None and self.flusher.is_alive():
+            return
+        self.flusher = threading.Thread(target=self.run, name='activity-flusher', daemon=True)
+        self.flusher.start()
+
+    def run(self):
+        while True:
+            self.wake.clear()
+            # Lidos a cada volta: valem sem reiniciar a thread
+            interval = settings.ACTIVITY_FLUSH_INTERVAL
+            with self.lock:
+                if self.oldest is None:
+                    timeout = interval
+                elif len(self.events) >= settings.ACTIVITY_BUFFER_SIZE:
+                    timeout = 0
+                else:
+                    timeout = self.oldest + interval - time.monotonic()
+            if timeout > 0:
+                self.wake.wait(timeout)
+                continue
+            self.flush()
+            # Conexão desta thread: não fica ociosa até o próximo flush
+            connection.close()
+
+
+buffer = ActivityBuffer()
+atexit.register(buffer.flush)
+
+# Enviado na hora, dentro da transação da mutação (ex.: webhooks.outbox grava
+# o evento na mesma transação). Independe de ACTIVITY_ENABLED
+event_recorded = Signal()
+
+
+def record(request, action, workspace_id, object_type, object_id=None, board_id=None, **payload):
+    event = ActivityEvent(
+        workspace_id=workspace_id,
+        board_id=board_id,
+        actor_uid=request.auth,
+        action=action,
+        object_type=object_type,
+        object_id=object_id,
+        payload=payload,
+        created_at=timezone.now(),
+    )
+    event_recorded.send(sender=ActivityEvent, event=event)
+    if not settings.ACTIVITY_ENABLED:
+        return
+    # Mutação desfeita não gera evento
+    transaction.on_commit(lambda: buffer.add(event))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from activity.models import ActivityEvent
+from activity.partitions import drop_partitions_before, ensure_partitions, month_start, partitioned
+
+
+class Command(BaseCommand):
+    help = "Cria as partições mensais do log de atividade e descarta as antigas (rodar 1x por mês)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=3, help="Quantos meses à frente deixar criados")
+        parser.add_argument('--retain-months', type=int, help="Descarta os meses anteriores a este número de meses atrás")
+
+    def handle(self, *args, **options):
+        cutoff = None
+        if options['retain_months'] is not None:
+            cutoff = month_start(timezone.localdate(), -options['retain_months'])
+
+        if not partitioned():
+            # Outros bancos: tabela comum, a retenção vira um DELETE
+            self.stdout.write(self.style.WARNING("Particionamento só existe no Postgres"))
+            if cutoff is not None:
+                deleted, _ = ActivityEvent.objects.filter(created_at__date__lt=cutoff).delete()
+                self.stdout.write(f"{deleted} evento(s) anteriores a {cutoff} removidos")
+            return
+
+        for name in ensure_partitions(options['ahead']):
+            self.stdout.write(f"criada: {name}")
+        if cutoff is not None:
+            for name in drop_partitions_before(cutoff):
+                self.stdout.write(f"descartada: {name}")
+        self.stdout.write(self.style.SUCCESS("Partições em dia"))
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:17
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+# No Postgres a tabela vira particionada por mês (RANGE em created_at).
+# A PK precisa incluir a chave de partição; a partição DEFAULT recebe o que
+# cair fora das mensais até o activity_partitions criá-las. O índice de
+# Meta.indexes fica para o Django: o CreateModel o adia para o fim da
+# migração, quando a tabela já é a particionada
+PARTITIONED_TABLE_SQL = [
+    "DROP TABLE activity_activityevent",
+    """
+    CREATE TABLE activity_activityevent (
+        id bigserial NOT NULL,
+        workspace_id bigint NOT NULL,
+        board_id bigint NULL,
+        actor_uid varchar(255) NOT NULL,
+        action varchar(50) NOT NULL,
+        object_type varchar(20) NOT NULL,
+        object_id bigint NULL,
+        payload jsonb NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    """,
+    "CREATE TABLE activity_activityevent_default PARTITION OF activity_activityevent DEFAULT",
+]
+
+
+def partition_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in PARTITIONED_TABLE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workspace_id', models.BigIntegerField()),
+                ('board_id', models.BigIntegerField(blank=True, null=True)),
+                ('actor_uid', models.CharField(max_length=255)),
+                ('action', models.CharField(max_length=50)),
+                ('object_type', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['workspace_id', '-id'], name='activity_workspace_id_idx')],
+            },
+        ),
+        migrations.RunPython(partition_table, migrations.RunPython.noop),
+    ]
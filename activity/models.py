@@ -0,0 +1,24 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+# Create your models here.
+# No Postgres a tabela é particionada por mês em created_at (migração 0001 e
+# manage.py activity_partitions). workspace_id/board_id não são FKs: tabelas
+# particionadas não aceitam FKs de entrada e o histórico sobrevive a exclusões.
+class ActivityEvent(models.Model):
+    workspace_id = models.BigIntegerField()
+    board_id = models.BigIntegerField(null=True, blank=True)
+    actor_uid = models.CharField(max_length=255)
+    action = models.CharField(max_length=50)
+    object_type = models.CharField(max_length=20)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['workspace_id', '-id'], name='activity_workspace_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_uid} {self.action} {self.object_type}:{self.object_id}"
@@ -0,0 +1,95 @@
+from datetime import date, datetime, time
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import ActivityEvent
+
+# Partições mensais de activity_activityevent (só Postgres). Criar os meses
+# seguintes com antecedência evita que eventos caiam na partição DEFAULT;
+# apagar um mês antigo é um DROP TABLE, sem DELETE linha a linha.
+
+TABLE = ActivityEvent._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def partitioned():
+    return connection.vendor == 'postgresql'
+
+
+def month_start(day, offset=0):
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def bounds(month):
+    tz = timezone.get_default_timezone()
+    lower = timezone.make_aware(datetime.combine(month, time.min), tz)
+    upper = timezone.make_aware(datetime.combine(month_start(month, 1), time.min), tz)
+    return lower, upper
+
+
+def existing_partitions():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            """,
+            [TABLE],
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def create_partition(month):
+    # Se a DEFAULT já tem linhas do mês, o Postgres recusa a nova partição:
+    # desanexa a DEFAULT, cria o mês, move as linhas e anexa de volta
+    name = partition_name(month)
+    lower, upper = bounds(month)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s)",
+            [lower, upper],
+        )
+        stranded = cursor.fetchone()[0]
+        if stranded:
+            cursor.execute(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}")
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)", [lower, upper])
+        if stranded:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s RETURNING *) "
+                f"INSERT INTO {TABLE} SELECT * FROM moved",
+                [lower, upper],
+            )
+            cursor.execute(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+    return name
+
+
+def ensure_partitions(months_ahead=3, today=None):
+    today = today or timezone.localdate()
+    existing = existing_partitions()
+    created = []
+    for offset in range(months_ahead + 1):
+        month = month_start(today, offset)
+        if partition_name(month) not in existing:
+            created.append(create_partition(month))
+    return created
+
+
+def drop_partitions_before(cutoff):
+    # Remove os meses inteiramente anteriores a cutoff (primeiro dia de um mês)
+    prefix = f"{TABLE}_p"
+    dropped = []
+    for name in sorted(existing_partitions()):
+        if not name.startswith(prefix):
+            continue
+        month = datetime.strptime(name[len(prefix):], '%Y%m').date()
+        if month < cutoff:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {name}")
+            dropped.append(name)
+    return dropped
@@ -0,0 +1,87 @@
+import threading
+import time
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from organiza_me.bench import bearer
+from organiza_me.db_router import _wrote
+from workspaces.models import Workspace
+from .log import ActivityBuffer, buffer
+from .models import ActivityEvent
+
+# Create your tests here.
+@override_settings(ACTIVITY_FLUSH_INTERVAL=3600, ACTIVITY_BUFFER_SIZE=100)
+class ActivityFeedTests(TestCase):
+
+    def setUp(self):
+        buffer.flush()
+        self.addCleanup(buffer.flush)
+        self.client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+
+    def test_feed_read_does_not_flush_the_buffer(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/boards/', {'name': 'b', 'workspace_id': self.workspace.id}, content_type='application/json')
+        self.assertEqual(len(buffer.events), 1)
+
+        feed = self.client.get(f'/api/workspaces/{self.workspace.id}/activity/').json()
+        self.assertEqual(feed['items'], [])
+        self.assertEqual(len(buffer.events), 1)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+        buffer.flush()
+        feed = self.client.get(f'/api/workspaces/{self.workspace.id}/activity/').json()
+        self.assertEqual([item['action'] for item in feed['items']], ['board.created'])
+
+
+class FlusherTests(TransactionTestCase):
+    # O flush roda na thread de fundo, com conexão própria: os eventos
+    # precisam ser confirmados fora da transação do TestCase
+
+    def setUp(self):
+        self.buffer = ActivityBuffer()
+        self.addCleanup(self.buffer.flush)
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+
+    def event(self):
+        return ActivityEvent(
+            workspace_id=self.workspace.id, actor_uid='owner', action='board.created', object_type='board',
+            created_at=timezone.now(),
+        )
+
+    def wait_for_events(self, count, timeout=5):
+        # Só os deste buffer: o buffer global também grava pela própria
+        # thread o que outros testes deixaram nele
+        events = ActivityEvent.objects.filter(workspace_id=self.workspace.id)
+        deadline = time.monotonic() + timeout
+        while events.count() < count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return events.count()
+
+    @override_settings(ACTIVITY_FLUSH_INTERVAL=3600, ACTIVITY_BUFFER_SIZE=3)
+    def test_full_buffer_is_flushed_off_the_request_thread(self):
+        flushed_by = []
+        flush = self.buffer.flush
+        self.buffer.flush = lambda: flushed_by.append(threading.current_thread().name) or flush()
+
+        # Como o middleware faz a cada requisição
+        token = _wrote.set(False)
+        self.addCleanup(_wrote.reset, token)
+        for _ in range(3):
+            self.buffer.add(self.event())
+
+        # Nada gravado na thread que chamou add(): nenhuma escrita marcada
+        # para o roteador, então o usuário não fica preso ao primário
+        self.assertFalse(_wrote.get())
+        self.assertEqual(self.wait_for_events(3), 3)
+        self.assertEqual(flushed_by, ['activity-flusher'])
+
+    @override_settings(ACTIVITY_FLUSH_INTERVAL=3600, ACTIVITY_BUFFER_SIZE=100)
+    def test_interval_change_applies_to_running_flusher(self):
+        self.buffer.add(self.event())
+        self.buffer.flush()
+        self.assertTrue(self.buffer.flusher.is_alive())
+
+        with self.settings(ACTIVITY_FLUSH_INTERVAL=0.1):
+            self.buffer.add(self.event())
+            self.assertEqual(self.wait_for_events(2), 2)
+        self.assertEqual(self.buffer.events, [])
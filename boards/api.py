@@ -1,7 +1,12 @@
 from ninja import Router, Schema
-from .models import Board, Stage
+from ninja.errors import HttpError
+from .models import Board, Stage, ArchivePolicy
 from workspaces.models import Workspace
+from workspaces.permissions import workspace_ids, EDITOR
+from activity.log import record
+from organiza_me.sparse import sparse_values
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from typing import Optional
 
 router = Router()
@@ -11,54 +16,69 @@ class StageIn(Schema):
     board_id: int
     position: int = 0
     color: str = "#6B7280"
+    is_done: bool = False
 
 class StageUpdate(Schema):
     name: Optional[str] = None
     position: Optional[int] = None
     color: Optional[str] = None
+    is_done: Optional[bool] = None
 
 @router.get("/stages/")
-def list_stages(request, board_id: int = None):
-    stages = Stage.objects.filter(board__workspace__owner_uid=request.auth).order_by('position')
+def list_stages(request, board_id: int = None, fields: str = None):
+    stages = Stage.objects.filter(board__workspace_id__in=workspace_ids(request)).order_by('position')
     if board_id:
         stages = stages.filter(board_id=board_id)
-    return list (stages.values())
+    return list(sparse_values(stages, fields))
 
 @router.post("/stages/")
 def create_stage(request, data: StageIn):
-    board = get_object_or_404(Board, id=data.board_id, workspace__owner_uid=request.auth)
-    stage = Stage.objects.create(**data.dict())
+    board = get_object_or_404(Board, id=data.board_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        stage = Stage.objects.create(**data.dict())
+        record(request, "stage.created", board.workspace_id, "stage", stage.id, board_id=board.id, name=stage.name)
     return {"id": stage.id, "name": stage.name}
 
 @router.get("/stages/{stage_id}/")
 def get_stage(request, stage_id: int):
-    stage = get_object_or_404(Stage, id=stage_id, board__workspace__owner_uid=request.auth)
+    stage = get_object_or_404(Stage, id=stage_id, board__workspace_id__in=workspace_ids(request))
     return{
         "id": stage.id,
         "name": stage.name,
         "board": stage.board_id,
         "position": stage.position,
-        "color": stage.color
+        "color": stage.color,
+        "is_done": stage.is_done
     }
 
 @router.put("/stages/{stage_id}/")
 def update_stage(request, stage_id: int, data: StageUpdate):
-    stage = get_object_or_404(Stage, id=stage_id, board__workspace__owner_uid=request.auth)
+    stage = get_object_or_404(Stage.objects.select_related('board'), id=stage_id, board__workspace_id__in=workspace_ids(request, EDITOR))
     if data.name is not None:
         stage.name = data.name 
     if data.position is not None:
         stage.position = data.position
     if data.color is not None:
         stage.color = data.color
-    stage.save()
+    if data.is_done is not None:
+        stage.is_done = data.is_done
+    with transaction.atomic():
+        stage.save()
+        record(request, "stage.updated", stage.board.workspace_id, "stage", stage.id, board_id=stage.board_id, fields=sorted(data.dict(exclude_none=True)))
     return{"success": True}
 
 @router.delete("/stages/{stage_id}/")
 def delete_stage(request, stage_id: int):
-    stage = get_object_or_404(Stage, id=stage_id, board__workspace__owner_uid=request.auth)
-    stage.delete()
+    stage = get_object_or_404(Stage.objects.select_related('board'), id=stage_id, board__workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        stage.delete()
+        record(request, "stage.deleted", stage.board.workspace_id, "stage", stage_id, board_id=stage.board_id, name=stage.name)
     return {"success": True}
 
+class ArchivePolicyIn(Schema):
+    days: int = 30
+    is_active: bool = True
+
 class BoardIn(Schema):
     name: str
     workspace_id: int
@@ -69,21 +89,23 @@ class BoardUpdate(Schema):
     position: Optional[int] = None
 
 @router.get("/")
-def list_boards(request, workspace_id: int = None):
-    boards = Board.objects.filter(workspace__owner_uid=request.auth).order_by('position')
+def list_boards(request, workspace_id: int = None, fields: str = None):
+    boards = Board.objects.filter(workspace_id__in=workspace_ids(request)).order_by('position')
     if workspace_id:
         boards = boards.filter(workspace_id=workspace_id)
-    return list (boards.values())
+    return list(sparse_values(boards, fields))
 
 @router.post("/")
 def create_board(request, data: BoardIn):
-    workspace = get_object_or_404(Workspace, id=data.workspace_id, owner_uid=request.auth)
-    board = Board.objects.create(**data.dict())
+    workspace = get_object_or_404(Workspace, id=data.workspace_id, id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        board = Board.objects.create(**data.dict())
+        record(request, "board.created", board.workspace_id, "board", board.id, board_id=board.id, name=board.name)
     return {"id": board.id , "name": board.name}
 
 @router.get("/{board_id}/")
 def get_board(request, board_id: int):
-    board = get_object_or_404(Board, id=board_id, workspace__owner_uid=request.auth)
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request))
     return {
         "id": board.id,
         "name": board.name,
@@ -94,16 +116,39 @@ def get_board(request, board_id: int):
 
 @router.put("/{board_id}/")
 def update_board(request, board_id: int, data: BoardUpdate):
-    board = get_object_or_404(Board, id=board_id, workspace__owner_uid=request.auth)
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request, EDITOR))
     if data.name is not None:
         board.name = data.name
     if data.position is not None:
         board.position = data.position
-    board.save()
+    with transaction.atomic():
+        board.save()
+        record(request, "board.updated", board.workspace_id, "board", board.id, board_id=board.id, fields=sorted(data.dict(exclude_none=True)))
     return{"success": True}
 
 @router.delete("/{board_id}/")
 def delete_board(request, board_id: int):
-    board = get_object_or_404(Board, id=board_id, workspace__owner_uid=request.auth)
-    board.delete()
-    return {"success": True}
\ No newline at end of file
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        board.delete()
+        record(request, "board.deleted", board.workspace_id, "board", board_id, board_id=board_id, name=board.name)
+    return {"success": True}
+
+@router.get("/{board_id}/archive-policy/")
+def get_archive_policy(request, board_id: int):
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request))
+    policy = ArchivePolicy.objects.filter(board=board).first()
+    if policy is None:
+        return {"board_id": board.id, "days": None, "is_active": False}
+    return {"board_id": board.id, "days": policy.days, "is_active": policy.is_active}
+
+@router.put("/{board_id}/archive-policy/")
+def update_archive_policy(request, board_id: int, data: ArchivePolicyIn):
+    if data.days < 1:
+        # days=0 arquivaria toda tarefa concluída na próxima rodada
+        raise HttpError(400, "days deve ser pelo menos 1")
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        ArchivePolicy.objects.update_or_create(board=board, defaults=data.dict())
+        record(request, "board.archive_policy_updated", board.workspace_id, "board", board.id, board_id=board.id, **data.dict())
+    return {"success": True}
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-19 13:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def mark_done_stages(apps, schema_editor):
+    # Estágio padrão criado por boards.signals.create_default_stages
+    Stage = apps.get_model('boards', 'Stage')
+    Stage.objects.filter(name='concluido').update(is_done=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0002_stage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stage',
+            name='is_done',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_done_stages, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ArchivePolicy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('days', models.PositiveIntegerField(default=30)),
+                ('is_active', models.BooleanField(default=True)),
+                ('board', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive_policy', to='boards.board')),
+            ],
+        ),
+    ]
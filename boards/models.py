@@ -16,6 +16,15 @@ class Stage(models.Model):
     board = models.ForeignKey(Board, on_delete=models.CASCADE)
     position = models.IntegerField(default=0)
     color = models.CharField(max_length=7, default="#6B7280")
+    is_done = models.BooleanField(default=False)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class ArchivePolicy(models.Model):
+    board = models.OneToOneField(Board, on_delete=models.CASCADE, related_name='archive_policy')
+    days = models.PositiveIntegerField(default=30)
+    is_active = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.board} ({self.days} dias)"
\ No newline at end of file
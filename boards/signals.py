@@ -21,5 +21,6 @@ def create_default_stages(sender, instance, created, **kwargs):
             name="concluido",
             board=instance,
             position=2,
-            color="#10B981"
+            color="#10B981",
+            is_done=True
         )
\ No newline at end of file
@@ -1,3 +1,30 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import Client, TestCase
+from organiza_me.bench import bearer
+from workspaces.models import Workspace
+from .models import ArchivePolicy, Board
 
 # Create your tests here.
+class ArchivePolicyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        self.board = Board.objects.create(name='b', workspace=workspace)
+        self.client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+
+    def put(self, days):
+        return self.client.put(
+            f'/api/boards/{self.board.id}/archive-policy/', {'days': days, 'is_active': True},
+            content_type='application/json'
+        )
+
+    def test_days_below_one_are_rejected(self):
+        for days in (0, -1):
+            with self.subTest(days=days):
+                self.assertEqual(self.put(days).status_code, 400)
+        self.assertFalse(ArchivePolicy.objects.exists())
+
+    def test_valid_days_are_saved(self):
+        self.assertEqual(self.put(7).status_code, 200)
+        self.assertEqual(ArchivePolicy.objects.get(board=self.board).days, 7)
@@ -91,13 +91,16 @@ export function TaskModal({ isOpen, onClose, task, workspaceId, onUpdate }: Task
 
   const loadTaskData = async () => {
     try {
-      const [tagsRes, allTagsRes, subtasksRes, attachmentsRes] = await Promise.all([
+      const [taskRes, tagsRes, allTagsRes, subtasksRes, attachmentsRes] = await Promise.all([
+        tasksApi.get(task.id),
         tagsApi.listForTask(task.id),
         tagsApi.list(workspaceId),
         subtasksApi.list(task.id),
         attachmentsApi.list(task.id),
       ])
 
+      // A lista do Kanban vem sem description (?fields=); o modal busca a tarefa completa
+      setDescription(taskRes.data.description || '')
       setTaskTags(tagsRes.data)
       setAvailableTags(allTagsRes.data)
       setSubtasks(subtasksRes.data)
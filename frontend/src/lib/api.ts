@@ -1,5 +1,6 @@
 import axios from 'axios'
 import { supabase } from './supabase'
+import { ActivityPage, OverviewBucket, OverviewPage, OverviewResponse, Tag, TagMode, TimelineResponse, WebhookDeliveryPage, WebhookSubscription } from '../types'
 
 const API_BASE_URL = 'http://localhost:8000/api'
 
@@ -38,6 +39,8 @@ export const workspacesApi = {
   get: (id: number) => api.get(`/workspaces/${id}/`),
   update: (id: number, data: { name?: string; description?: string }) => api.put(`/workspaces/${id}/`, data),
   delete: (id: number) => api.delete(`/workspaces/${id}/`),
+  activity: (id: number, params: { before_id?: number; limit?: number; board_id?: number; actor_uid?: string } = {}) =>
+    api.get<ActivityPage>(`/workspaces/${id}/activity/`, { params }),
 }
 
 // ==================== BOARDS ====================
@@ -60,7 +63,13 @@ export const stagesApi = {
 
 // ==================== TASKS ====================
 export const tasksApi = {
-  list: (stageId?: number) => api.get('/tasks/', { params: stageId ? { stage_id: stageId } : {} }),
+  list: (stageId?: number, fields?: string[], tags?: { ids: number[]; mode?: TagMode }) => api.get('/tasks/', {
+    params: {
+      ...(stageId ? { stage_id: stageId } : {}),
+      ...(fields ? { fields: fields.join(',') } : {}),
+      ...(tags?.ids.length ? { tags: tags.ids.join(','), tag_mode: tags.mode ?? 'any' } : {}),
+    },
+  }),
   create: (data: { 
     title: string; 
     description?: string;
@@ -79,11 +88,23 @@ export const tasksApi = {
   }) => api.put(`/tasks/${id}/`, data),
   delete: (id: number) => api.delete(`/tasks/${id}/`),
   move: (id: number, data: { stage_id: number; position: number }) => api.patch(`/tasks/${id}/move/`, data),
+  timeline: (params: {
+    from: string
+    to: string
+    workspace_id?: number
+    board_id?: number
+    tags?: string
+    tag_mode?: TagMode
+    limit?: number
+  }) =>
+    api.get<TimelineResponse>('/tasks/timeline/', { params }),
 }
 
 // ==================== TAGS ====================
 export const tagsApi = {
-  list: (workspaceId?: number) => api.get('/tasks/tags/', { params: workspaceId ? { workspace_id: workspaceId } : {} }),
+  list: (workspaceId?: number, withCounts?: boolean) => api.get<Tag[]>('/tasks/tags/', {
+    params: { ...(workspaceId ? { workspace_id: workspaceId } : {}), ...(withCounts ? { with_counts: 1 } : {}) },
+  }),
   create: (data: { name: string; color: string; workspace_id: number }) => api.post('/tasks/tags/', data),
   get: (id: number) => api.get(`/tasks/tags/${id}/`),
   update: (id: number, data: { name?: string; color?: string }) => api.put(`/tasks/tags/${id}/`, data),
@@ -109,14 +130,67 @@ export const attachmentsApi = {
   get: (id: number) => api.get(`/tasks/attachments/${id}/`),
   update: (id: number, data: { file_url?: string; file_name?: string }) => api.put(`/tasks/attachments/${id}/`, data),
   delete: (id: number) => api.delete(`/tasks/attachments/${id}/`),
+  // Corpo bruto: o backend grava em chunks e deduplica pelo SHA-256
+  upload: (taskId: number, file: File) => api.post('/tasks/attachments/upload/', file, {
+    params: { task_id: taskId, file_name: file.name },
+    headers: { 'Content-Type': file.type || 'application/octet-stream' },
+  }),
+  download: (id: number) => api.get<Blob>(`/tasks/attachments/${id}/download/`, { responseType: 'blob' }),
 }
 
 // ==================== OVERVIEW ====================
+type OverviewParams = {
+  period?: 'day' | 'week' | 'month'
+  ref_date?: string
+  start?: string
+  end?: string
+  bucket?: OverviewBucket
+  cursor?: string
+  limit?: number
+  workspace_id?: number
+  board_id?: number
+  stage_id?: number
+  tags?: string
+  tag_mode?: TagMode
+}
+
+// Teto de páginas seguidas por bucket; além disso a lista sai com next_cursor
+export const OVERVIEW_MAX_PAGES = 25
+
 export const overviewApi = {
-  list: (params?: { period?: 'day' | 'week' | 'month'; ref_date?: string }) => 
-    api.get('/overview/', { params }),
+  list: (params?: OverviewParams) => api.get<OverviewResponse>('/overview/', { params }),
+  // Segue next_cursor até o fim do bucket (o backend devolve no máximo 200 por página)
+  listBucket: async (bucket: OverviewBucket, params: Omit<OverviewParams, 'bucket' | 'cursor' | 'limit'> = {}): Promise<OverviewPage> => {
+    const result: OverviewPage = { items: [], next_cursor: null, truncated: false }
+    let cursor: string | undefined
+    for (let pages = 0; pages < OVERVIEW_MAX_PAGES; pages++) {
+      const response = await api.get<OverviewResponse>('/overview/', { params: { ...params, bucket, cursor, limit: 200 } })
+      const page = response.data[bucket]
+      result.items.push(...(page?.items ?? []))
+      result.truncated = result.truncated || Boolean(page?.truncated)
+      result.next_cursor = page?.next_cursor ?? null
+      if (!result.next_cursor) break
+      cursor = result.next_cursor
+    }
+    return result
+  },
 }
 
 
 
 
+
+// ==================== WEBHOOKS ====================
+type WebhookData = { url?: string; events?: string[]; max_concurrency?: number; batch_size?: number }
+
+export const webhooksApi = {
+  list: (workspaceId?: number) =>
+    api.get<WebhookSubscription[]>('/webhooks/', { params: workspaceId ? { workspace_id: workspaceId } : {} }),
+  create: (data: WebhookData & { workspace_id: number; url: string }) => api.post<WebhookSubscription>('/webhooks/', data),
+  update: (id: number, data: WebhookData & { is_active?: boolean }) => api.put<WebhookSubscription>(`/webhooks/${id}/`, data),
+  rotateSecret: (id: number) => api.post<{ id: number; secret: string }>(`/webhooks/${id}/rotate-secret/`),
+  delete: (id: number) => api.delete(`/webhooks/${id}/`),
+  deliveries: (id: number, params: { status?: string; before_id?: number; limit?: number } = {}) =>
+    api.get<WebhookDeliveryPage>(`/webhooks/${id}/deliveries/`, { params }),
+  retry: (id: number, deliveryId: number) => api.post(`/webhooks/${id}/deliveries/${deliveryId}/retry/`),
+}
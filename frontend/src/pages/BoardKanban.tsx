@@ -15,12 +15,15 @@ import {
   KanbanOverlay,
   KanbanMoveEvent,
 } from '../components/kanban/Kanban'
-import { boardsApi, stagesApi, tasksApi } from '../lib/api'
-import { Board, Stage, Task } from '../types'
+import { boardsApi, stagesApi, tagsApi, tasksApi } from '../lib/api'
+import { Board, Stage, Tag, TagMode, Task } from '../types'
 import { ArrowLeft, LayoutGrid, Plus, Loader2, MoreHorizontal, Trash2 } from 'lucide-react'
 import { Modal } from '../components/ui/Modal'
 import { ConfirmModal } from '../components/ui/ConfirmModal'
 
+// Campos que o card mostra; a descrição completa é carregada pelo TaskModal
+const KANBAN_TASK_FIELDS = ['title', 'stage_id', 'position', 'start_date', 'due_date', 'tags', 'description_snippet']
+
 // Helper to format stage names (a_fazer -> A Fazer)
 function formatStageName(name: string): string {
   return name
@@ -43,10 +46,22 @@ export function BoardKanban() {
   const [newStageColor, setNewStageColor] = useState('#2383E2')
   const [savingNewStage, setSavingNewStage] = useState(false)
   const [deleteStageId, setDeleteStageId] = useState<number | null>(null)
+  const [tags, setTags] = useState<Tag[]>([])
+  const [tagFilter, setTagFilter] = useState<{ ids: number[]; mode: TagMode }>({ ids: [], mode: 'any' })
+  // loadData também é chamado de callbacks memoizados: o filtro vem do ref
+  const tagFilterRef = useRef(tagFilter)
+  tagFilterRef.current = tagFilter
 
   useEffect(() => {
     loadData()
-  }, [boardId])
+  }, [boardId, tagFilter])
+
+  const toggleTag = (tagId: number) => {
+    setTagFilter((current) => ({
+      ...current,
+      ids: current.ids.includes(tagId) ? current.ids.filter((id) => id !== tagId) : [...current.ids, tagId],
+    }))
+  }
 
   const loadData = async () => {
     if (!boardId) return
@@ -59,11 +74,13 @@ export function BoardKanban() {
       
       setBoard(boardRes.data)
       setStages(stagesRes.data.sort((a, b) => a.position - b.position))
+      tagsApi.list(boardRes.data.workspace_id).then((tagsRes) => setTags(tagsRes.data))
 
+      // Filtro por tags aplicado no servidor, coluna a coluna
       const tasksMap: Record<string, Task[]> = {}
       await Promise.all(
         stagesRes.data.map(async (stage: Stage) => {
-          const tasksRes = await tasksApi.list(stage.id)
+          const tasksRes = await tasksApi.list(stage.id, KANBAN_TASK_FIELDS, tagFilterRef.current)
           tasksMap[String(stage.id)] = tasksRes.data.sort((a, b) => a.position - b.position)
         })
       )
@@ -201,6 +218,38 @@ export function BoardKanban() {
           </Link>
           
           <h1 className="page-title" style={{ fontSize: 24 }}>{board.name}</h1>
+
+          {tags.length > 0 && (
+            <div style={{ display: 'flex', flexWrap: 'wrap', alignItems: 'center', gap: 6, marginTop: 12 }}>
+              {tags.map((tag) => {
+                const selected = tagFilter.ids.includes(tag.id)
+                return (
+                  <button
+                    key={tag.id}
+                    onClick={() => toggleTag(tag.id)}
+                    className="tag"
+                    style={{
+                      backgroundColor: selected ? tag.color : `${tag.color}20`,
+                      color: selected ? '#fff' : tag.color,
+                      border: 'none',
+                      cursor: 'pointer',
+                    }}
+                  >
+                    {tag.name}
+                  </button>
+                )
+              })}
+              {tagFilter.ids.length > 1 && (
+                <button
+                  onClick={() => setTagFilter((current) => ({ ...current, mode: current.mode === 'any' ? 'all' : 'any' }))}
+                  className="tag tag-gray"
+                  style={{ border: 'none', cursor: 'pointer' }}
+                >
+                  {tagFilter.mode === 'any' ? 'Qualquer tag' : 'Todas as tags'}
+                </button>
+              )}
+            </div>
+          )}
         </div>
 
         {/* Kanban Board */}
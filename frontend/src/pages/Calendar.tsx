@@ -11,7 +11,8 @@ import {
   Calendar as CalendarIcon,
   Clock,
   LayoutGrid,
-  FolderOpen
+  FolderOpen,
+  AlertTriangle
 } from 'lucide-react'
 import { 
   format, 
@@ -30,6 +31,7 @@ import { ptBR } from 'date-fns/locale'
 
 export function Calendar() {
   const [tasks, setTasks] = useState<OverviewTask[]>([])
+  const [incomplete, setIncomplete] = useState(false)
   const [loading, setLoading] = useState(true)
   const [currentDate, setCurrentDate] = useState(new Date())
   const [selectedDate, setSelectedDate] = useState<Date | null>(null)
@@ -37,15 +39,13 @@ export function Calendar() {
   const loadTasks = useCallback(async () => {
     setLoading(true)
     try {
-      const start = startOfMonth(currentDate)
-      const end = endOfMonth(currentDate)
-      
-      // Buscar tarefas do mês usando o endpoint de overview
-      const response = await overviewApi.list({
+      // Buscar tarefas do mês usando o endpoint de overview (todas as páginas)
+      const page = await overviewApi.listBucket('tasks', {
         period: 'month',
         ref_date: format(currentDate, 'yyyy-MM-dd'),
       })
-      setTasks(response.data)
+      setTasks(page.items)
+      setIncomplete(Boolean(page.truncated || page.next_cursor))
     } catch (error) {
       console.error('Erro ao carregar tarefas:', error)
     } finally {
@@ -139,6 +139,13 @@ export function Calendar() {
           </div>
         </div>
 
+        {!loading && incomplete && (
+          <div className="overview-truncated">
+            <AlertTriangle size={14} />
+            <span>Algumas tarefas deste mês não foram carregadas: o período passa do limite da visão geral.</span>
+          </div>
+        )}
+
         {/* Content */}
         {loading ? (
           <div className="loading-container">
@@ -177,7 +184,7 @@ export function Calendar() {
                           <div className="calendar-day-tasks">
                             {dayTasks.slice(0, 3).map((task) => (
                               <div
-                                key={task.id}
+                                key={`${task.id}-${task.due_date}`}
                                 className="calendar-day-task"
                                 style={{
                                   backgroundColor: task.stage_name.toLowerCase().includes('conclu') || task.stage_name.toLowerCase().includes('done') 
@@ -227,7 +234,7 @@ export function Calendar() {
                   <div className="calendar-tasks-list">
                     {selectedDateTasks.map((task) => (
                       <Link
-                        key={task.id}
+                        key={`${task.id}-${task.due_date}`}
                         to={`/board/${task.board_id}`}
                         className="calendar-task-item"
                       >
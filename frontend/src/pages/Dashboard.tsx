@@ -14,7 +14,8 @@ import {
   Clock,
   ChevronDown,
   Check,
-  Loader2
+  Loader2,
+  AlertTriangle
 } from 'lucide-react'
 import { format, addDays, addWeeks, addMonths, startOfWeek, endOfWeek } from 'date-fns'
 import { ptBR } from 'date-fns/locale'
@@ -34,14 +35,20 @@ interface GroupedTasks {
       [boardId: number]: {
         board_name: string
         tasks: OverviewTask[]
+        overdueTasks: OverviewTask[]
         tasksWithoutDate: OverviewTask[]
       }
     }
   }
 }
 
+type Section = 'tasks' | 'overdueTasks' | 'tasksWithoutDate'
+
+const taskKey = (task: OverviewTask) => `${task.id}-${task.due_date}`
+
 export function Dashboard() {
-  const [tasks, setTasks] = useState<OverviewTask[]>([])
+  const [sections, setSections] = useState<Record<Section, OverviewTask[]>>({ tasks: [], overdueTasks: [], tasksWithoutDate: [] })
+  const [incomplete, setIncomplete] = useState(false)
   const [loading, setLoading] = useState(true)
   const [period, setPeriod] = useState<OverviewPeriod>('month')
   const [refDate, setRefDate] = useState(new Date())
@@ -77,11 +84,21 @@ export function Dashboard() {
   const loadTasks = useCallback(async () => {
     setLoading(true)
     try {
-      const response = await overviewApi.list({
-        period,
-        ref_date: format(refDate, 'yyyy-MM-dd'),
+      // Cada bucket segue o próprio next_cursor até o fim
+      const params = { period, ref_date: format(refDate, 'yyyy-MM-dd') }
+      const [scheduled, overdue, undated] = await Promise.all([
+        overviewApi.listBucket('tasks', params),
+        overviewApi.listBucket('overdue', params),
+        overviewApi.listBucket('no_due_date', params),
+      ])
+      // Atrasadas que caem no período já aparecem na lista principal
+      const inPeriod = new Set(scheduled.items.map(taskKey))
+      setSections({
+        tasks: scheduled.items,
+        overdueTasks: overdue.items.filter(task => !inPeriod.has(taskKey(task))),
+        tasksWithoutDate: undated.items,
       })
-      setTasks(response.data)
+      setIncomplete([scheduled, overdue, undated].some(page => page.truncated || page.next_cursor))
     } catch (error) {
       console.error('Erro ao carregar tarefas:', error)
     } finally {
@@ -196,7 +213,8 @@ export function Dashboard() {
   }
 
   // Group tasks by workspace and board
-  const groupedTasks: GroupedTasks = tasks.reduce((acc, task) => {
+  const groupedTasks: GroupedTasks = {}
+  const addTask = (acc: GroupedTasks, task: OverviewTask, section: Section) => {
     if (!acc[task.workspace_id]) {
       acc[task.workspace_id] = {
         workspace_name: task.workspace_name,
@@ -208,18 +226,16 @@ export function Dashboard() {
       acc[task.workspace_id].boards[task.board_id] = {
         board_name: task.board_name,
         tasks: [],
+        overdueTasks: [],
         tasksWithoutDate: [],
       }
     }
     
-    if (task.due_date === null) {
-      acc[task.workspace_id].boards[task.board_id].tasksWithoutDate.push(task)
-    } else {
-      acc[task.workspace_id].boards[task.board_id].tasks.push(task)
-    }
-    
-    return acc
-  }, {} as GroupedTasks)
+    acc[task.workspace_id].boards[task.board_id][section].push(task)
+  }
+  for (const section of ['tasks', 'overdueTasks', 'tasksWithoutDate'] as Section[]) {
+    sections[section].forEach(task => addTask(groupedTasks, task, section))
+  }
 
   const hasNoTasks = Object.keys(groupedTasks).length === 0
 
@@ -252,6 +268,75 @@ export function Dashboard() {
     return 'var(--bg-hover)'
   }
 
+  // Linha de tarefa com o seletor de estágio
+  const renderTask = (task: OverviewTask, className = '') => (
+    <div key={taskKey(task)} className={`overview-task ${className}`}>
+      <div className="overview-task-info">
+        <span className="overview-task-title">{task.title}</span>
+        {task.due_date && (
+          <span className="overview-task-date">
+            <Clock size={12} />
+            {format(new Date(task.due_date), 'dd/MM')}
+          </span>
+        )}
+      </div>
+      
+      {/* Stage Selector */}
+      <div className="overview-stage-wrapper" style={{ position: 'relative' }}>
+        <button
+          ref={(el) => { buttonRefs.current[task.id] = el }}
+          onClick={() => handleOpenStageSelector(task.id, task.board_id)}
+          className="overview-stage-btn"
+          style={{ 
+            backgroundColor: getStageBackground(task.stage_name),
+            color: getStageColor(task.stage_name)
+          }}
+          disabled={movingTaskId === task.id}
+        >
+          {movingTaskId === task.id ? (
+            <Loader2 size={12} className="spinner" />
+          ) : (
+            <>
+              <span>{formatStageName(task.stage_name)}</span>
+              <ChevronDown size={12} />
+            </>
+          )}
+        </button>
+
+        {openStageSelector === task.id && stagesByBoard[task.board_id] && dropdownPositions[task.id] && (
+          <div 
+            ref={(el) => { dropdownRefs.current[task.id] = el }}
+            className="dropdown fade-in overview-stage-dropdown" 
+            style={{ 
+              position: 'fixed',
+              top: `${dropdownPositions[task.id].top}px`,
+              right: `${dropdownPositions[task.id].right}px`,
+              zIndex: 9999,
+              minWidth: 160
+            }}
+          >
+            {stagesByBoard[task.board_id].map((stage) => (
+              <button
+                key={stage.id}
+                onClick={() => handleMoveTask(task.id, stage.id)}
+                className={`dropdown-item ${stage.id === task.stage_id ? 'active' : ''}`}
+              >
+                <div 
+                  className="overview-stage-dot"
+                  style={{ backgroundColor: stage.color || 'var(--text-tertiary)' }}
+                />
+                <span>{formatStageName(stage.name)}</span>
+                {stage.id === task.stage_id && (
+                  <Check size={14} style={{ marginLeft: 'auto' }} />
+                )}
+              </button>
+            ))}
+          </div>
+        )}
+      </div>
+    </div>
+  )
+
   return (
     <Layout>
       <div className="page-container">
@@ -306,6 +391,13 @@ export function Dashboard() {
           </div>
         </div>
 
+        {!loading && incomplete && (
+          <div className="overview-truncated">
+            <AlertTriangle size={14} />
+            <span>Algumas tarefas não foram carregadas: o período passa do limite da visão geral.</span>
+          </div>
+        )}
+
         {/* Content */}
         {loading ? (
           <div className="loading-container">
@@ -341,79 +433,23 @@ export function Dashboard() {
                         <LayoutGrid size={14} />
                         <span>{boardData.board_name}</span>
                         <span className="overview-board-count">
-                          {boardData.tasks.length + boardData.tasksWithoutDate.length}
+                          {boardData.tasks.length + boardData.overdueTasks.length + boardData.tasksWithoutDate.length}
                         </span>
                       </Link>
 
                       {/* Tasks with due date */}
                       <div className="overview-tasks">
-                        {boardData.tasks.map((task: OverviewTask) => (
-                          <div key={task.id} className="overview-task">
-                            <div className="overview-task-info">
-                              <span className="overview-task-title">{task.title}</span>
-                              {task.due_date && (
-                                <span className="overview-task-date">
-                                  <Clock size={12} />
-                                  {format(new Date(task.due_date), 'dd/MM')}
-                                </span>
-                              )}
-                            </div>
-                            
-                            {/* Stage Selector */}
-                            <div className="overview-stage-wrapper" style={{ position: 'relative' }}>
-                              <button
-                                ref={(el) => { buttonRefs.current[task.id] = el }}
-                                onClick={() => handleOpenStageSelector(task.id, task.board_id)}
-                                className="overview-stage-btn"
-                                style={{ 
-                                  backgroundColor: getStageBackground(task.stage_name),
-                                  color: getStageColor(task.stage_name)
-                                }}
-                                disabled={movingTaskId === task.id}
-                              >
-                                {movingTaskId === task.id ? (
-                                  <Loader2 size={12} className="spinner" />
-                                ) : (
-                                  <>
-                                    <span>{formatStageName(task.stage_name)}</span>
-                                    <ChevronDown size={12} />
-                                  </>
-                                )}
-                              </button>
+                        {boardData.tasks.map(task => renderTask(task))}
 
-                              {openStageSelector === task.id && stagesByBoard[task.board_id] && dropdownPositions[task.id] && (
-                                <div 
-                                  ref={(el) => { dropdownRefs.current[task.id] = el }}
-                                  className="dropdown fade-in overview-stage-dropdown" 
-                                  style={{ 
-                                    position: 'fixed',
-                                    top: `${dropdownPositions[task.id].top}px`,
-                                    right: `${dropdownPositions[task.id].right}px`,
-                                    zIndex: 9999,
-                                    minWidth: 160
-                                  }}
-                                >
-                                  {stagesByBoard[task.board_id].map((stage) => (
-                                    <button
-                                      key={stage.id}
-                                      onClick={() => handleMoveTask(task.id, stage.id)}
-                                      className={`dropdown-item ${stage.id === task.stage_id ? 'active' : ''}`}
-                                    >
-                                      <div 
-                                        className="overview-stage-dot"
-                                        style={{ backgroundColor: stage.color || 'var(--text-tertiary)' }}
-                                      />
-                                      <span>{formatStageName(stage.name)}</span>
-                                      {stage.id === task.stage_id && (
-                                        <Check size={14} style={{ marginLeft: 'auto' }} />
-                                      )}
-                                    </button>
-                                  ))}
-                                </div>
-                              )}
+                        {/* Overdue tasks from before the period */}
+                        {boardData.overdueTasks.length > 0 && (
+                          <>
+                            <div className="overview-section-divider overview-section-overdue">
+                              <span>Atrasadas</span>
                             </div>
-                          </div>
-                        ))}
+                            {boardData.overdueTasks.map(task => renderTask(task))}
+                          </>
+                        )}
 
                         {/* Tasks without due date */}
                         {boardData.tasksWithoutDate.length > 0 && (
@@ -421,67 +457,7 @@ export function Dashboard() {
                             <div className="overview-section-divider">
                               <span>Sem data definida</span>
                             </div>
-                            {boardData.tasksWithoutDate.map((task: OverviewTask) => (
-                              <div key={task.id} className="overview-task overview-task-no-date">
-                                <div className="overview-task-info">
-                                  <span className="overview-task-title">{task.title}</span>
-                                </div>
-                                
-                            {/* Stage Selector */}
-                            <div className="overview-stage-wrapper" style={{ position: 'relative' }}>
-                              <button
-                                ref={(el) => { buttonRefs.current[task.id] = el }}
-                                onClick={() => handleOpenStageSelector(task.id, task.board_id)}
-                                className="overview-stage-btn"
-                                style={{ 
-                                  backgroundColor: getStageBackground(task.stage_name),
-                                  color: getStageColor(task.stage_name)
-                                }}
-                                disabled={movingTaskId === task.id}
-                              >
-                                {movingTaskId === task.id ? (
-                                  <Loader2 size={12} className="spinner" />
-                                ) : (
-                                  <>
-                                    <span>{formatStageName(task.stage_name)}</span>
-                                    <ChevronDown size={12} />
-                                  </>
-                                )}
-                              </button>
-
-                                  {openStageSelector === task.id && stagesByBoard[task.board_id] && dropdownPositions[task.id] && (
-                                    <div 
-                                      ref={(el) => { dropdownRefs.current[task.id] = el }}
-                                      className="dropdown fade-in overview-stage-dropdown" 
-                                      style={{ 
-                                        position: 'fixed',
-                                        top: `${dropdownPositions[task.id].top}px`,
-                                        right: `${dropdownPositions[task.id].right}px`,
-                                        zIndex: 9999,
-                                        minWidth: 160
-                                      }}
-                                    >
-                                      {stagesByBoard[task.board_id].map((stage) => (
-                                        <button
-                                          key={stage.id}
-                                          onClick={() => handleMoveTask(task.id, stage.id)}
-                                          className={`dropdown-item ${stage.id === task.stage_id ? 'active' : ''}`}
-                                        >
-                                          <div 
-                                            className="overview-stage-dot"
-                                            style={{ backgroundColor: stage.color || 'var(--text-tertiary)' }}
-                                          />
-                                          <span>{formatStageName(stage.name)}</span>
-                                          {stage.id === task.stage_id && (
-                                            <Check size={14} style={{ marginLeft: 'auto' }} />
-                                          )}
-                                        </button>
-                                      ))}
-                                    </div>
-                                  )}
-                                </div>
-                              </div>
-                            ))}
+                            {boardData.tasksWithoutDate.map(task => renderTask(task, 'overview-task-no-date'))}
                           </>
                         )}
                       </div>
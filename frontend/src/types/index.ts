@@ -2,6 +2,7 @@ export interface Workspace {
   id: number
   name: string
   description: string | null
+  role?: 'owner' | 'editor' | 'viewer'
   created_at: string
   updated_at: string
 }
@@ -21,6 +22,7 @@ export interface Stage {
   board_id: number
   position: number
   color: string
+  is_done: boolean
   created_at: string
   updated_at: string
 }
@@ -29,12 +31,17 @@ export interface Task {
   id: number
   title: string
   description: string | null
+  description_snippet?: string | null
   stage_id: number
   position: number
   start_date: string | null
   due_date: string | null
   created_at: string
   updated_at: string
+  recurrence_rule?: string
+  recurrence_parent_id?: number | null
+  recurrence_date?: string | null
+  workspace_id?: number
   tags?: Tag[]
 }
 
@@ -43,14 +50,18 @@ export interface Tag {
   name: string
   color: string
   workspace_id: number
+  task_count?: number
 }
 
+export type TagMode = 'any' | 'all'
+
 export interface Subtask {
   id: number
   title: string
   is_completed: boolean
   task_id: number
   position: number
+  workspace_id?: number
 }
 
 export interface Attachment {
@@ -59,6 +70,9 @@ export interface Attachment {
   file_name: string
   task_id: number
   created_at: string
+  sha256?: string
+  size?: number | null
+  content_type?: string
 }
 
 export interface User {
@@ -83,8 +97,102 @@ export interface OverviewTask {
   board_name: string
   workspace_id: number
   workspace_name: string
+  is_occurrence?: boolean
 }
 
+export type OverviewBucket = 'tasks' | 'overdue' | 'no_due_date'
 
+export interface OverviewPage {
+  items: OverviewTask[]
+  next_cursor: string | null
+  // Só no bucket tasks: havia mais tarefas recorrentes do que o teto por página
+  truncated?: boolean
+}
 
+export interface OverviewResponse {
+  start: string
+  end: string
+  tasks?: OverviewPage
+  overdue?: OverviewPage
+  no_due_date?: OverviewPage
+}
+
+// Timeline types
+export interface TimelineTask {
+  id: number
+  title: string
+  start_date: string | null
+  due_date: string | null
+  start: string
+  end: string
+  position: number
+  is_recurring: boolean
+}
 
+export interface TimelineStage {
+  id: number
+  name: string
+  position: number
+  is_done: boolean
+  tasks: TimelineTask[]
+}
+
+export interface TimelineBoard {
+  id: number
+  name: string
+  workspace_id: number
+  stages: TimelineStage[]
+}
+
+export interface TimelineResponse {
+  from: string
+  to: string
+  truncated: boolean
+  boards: TimelineBoard[]
+}
+
+export interface ActivityEvent {
+  id: number
+  board_id: number | null
+  actor_uid: string
+  action: string
+  object_type: string
+  object_id: number | null
+  payload: Record<string, unknown>
+  created_at: string
+}
+
+export interface ActivityPage {
+  items: ActivityEvent[]
+  next_before_id: number | null
+}
+
+export interface WebhookSubscription {
+  id: number
+  workspace_id: number
+  url: string
+  events: string[]
+  is_active: boolean
+  max_concurrency: number
+  batch_size: number
+  created_by: string
+  created_at: string
+  secret?: string
+}
+
+export interface WebhookDelivery {
+  id: number
+  event_id: number
+  action: string
+  status: 'pending' | 'delivered' | 'failed'
+  attempts: number
+  next_attempt_at: string
+  response_status: number | null
+  last_error: string
+  delivered_at: string | null
+}
+
+export interface WebhookDeliveryPage {
+  items: WebhookDelivery[]
+  next_before_id: number | null
+}
@@ -0,0 +1,28 @@
+from ninja import Router
+from .models import Notification
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+router = Router()
+
+@router.get("/")
+def list_notifications(request, unread: bool = False, before_id: int = None, limit: int = 50):
+    notifications = Notification.objects.filter(owner_uid=request.auth).order_by('-id')
+    if unread:
+        notifications = notifications.filter(read_at__isnull=True)
+    if before_id:
+        notifications = notifications.filter(id__lt=before_id)
+    return list(notifications.values('id', 'kind', 'title', 'payload', 'created_at', 'read_at')[:max(1, min(limit, 100))])
+
+@router.post("/read-all/")
+def read_all_notifications(request):
+    count = Notification.objects.filter(owner_uid=request.auth, read_at__isnull=True).update(read_at=timezone.now())
+    return {"success": True, "count": count}
+
+@router.post("/{notification_id}/read/")
+def read_notification(request, notification_id: int):
+    notification = get_object_or_404(Notification, id=notification_id, owner_uid=request.auth)
+    if notification.read_at is None:
+        notification.read_at = timezone.now()
+        notification.save()
+    return {"success": True}
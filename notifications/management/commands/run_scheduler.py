@@ -0,0 +1,32 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from notifications.scheduler import KINDS, run_scan
+from notifications.sinks import get_sinks
+
+
+class Command(BaseCommand):
+    help = "Worker que varre prazos das tarefas e gera resumos de notificações por usuário"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=300, help="Segundos entre varreduras")
+        parser.add_argument('--lookahead', type=int, default=1, help="Dias à frente para 'vencendo em breve'")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--once', action='store_true', help="Executa uma varredura e sai")
+
+    def handle(self, *args, **options):
+        sinks = get_sinks()
+        while True:
+            close_old_connections()
+            for kind in KINDS:
+                count = run_scan(
+                    kind,
+                    sinks,
+                    lookahead_days=options['lookahead'],
+                    batch_size=options['batch_size']
+                )
+                if count:
+                    self.stdout.write(f"{kind}: {count} notificação(ões)")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,49 @@
+from django.db import models
+
+# Create your models here.
+class Notification(models.Model):
+    owner_uid = models.CharField(max_length=255)
+    kind = models.CharField(max_length=20)
+    title = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner_uid', '-id']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class SchedulerState(models.Model):
+    # Marcas d'água de cada varredura: datas <= last_date já foram processadas
+    # e tarefas alteradas antes de last_run_at já foram vistas
+    name = models.CharField(max_length=50, primary_key=True)
+    last_date = models.DateField()
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_date}"
+
+class SentReminder(models.Model):
+    # Um lembrete por (tarefa, tipo, vencimento): a varredura de alterações
+    # reencontra tarefas já avisadas e só avisa de novo se o vencimento mudou.
+    # Em tarefas recorrentes, task_id é o modelo e due_date a ocorrência
+    task_id = models.BigIntegerField()
+    kind = models.CharField(max_length=20)
+    due_date = models.DateField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task_id', 'kind', 'due_date'], name='unique_sent_reminder'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'due_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.task_id} ({self.due_date})"
@@ -0,0 +1,193 @@
+from datetime import date, timedelta
+from itertools import chain, islice
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from tasks.models import Task, ArchivedTask
+from tasks.recurrence import occurrences
+from workspaces.models import Workspace, WorkspaceMember
+from .models import Notification, SchedulerState, SentReminder
+
+# Quantas tarefas vão listadas em cada resumo; o restante entra só na contagem
+DIGEST_MAX_TASKS = 50
+
+# updated_at é gravado antes do commit: uma tarefa salva pouco antes da
+# varredura anterior pode ter ficado invisível para ela. A sobreposição
+# cobre esse caso e SentReminder impede o aviso em dobro
+CHANGE_OVERLAP = timedelta(minutes=5)
+
+KINDS = {
+    'due_soon': "{count} tarefa(s) vencendo em breve",
+    'overdue': "{count} tarefa(s) atrasada(s)",
+}
+
+ROW_FIELDS = ('id', 'title', 'due_date', 'stage__board_id', 'workspace_id')
+
+
+def live_window(kind, today, lookahead_days=1):
+    # Vencimentos que ainda merecem aviso: (piso, limite]
+    if kind == 'due_soon':
+        return today - timedelta(days=1), today + timedelta(days=lookahead_days)
+    return today - timedelta(days=2), today - timedelta(days=1)
+
+
+def scan_window(kind, today, lookahead_days=1):
+    # Janela nova (marca d'água, limite]: cada due_date entra uma única vez.
+    # Abaixo da marca, dentro da janela viva, entram só as tarefas alteradas
+    # desde a última varredura (criadas ou com vencimento mudado depois dela)
+    floor, upper = live_window(kind, today, lookahead_days)
+    state = SchedulerState.objects.filter(name=kind).first()
+    if state is None:
+        return floor, floor, upper, None
+    changed_since = state.last_run_at - CHANGE_OVERLAP if state.last_run_at else None
+    return floor, state.last_date, upper, changed_since
+
+
+def due_tasks(floor, lower, upper, changed_since=None):
+    # Range scans no índice de due_date; só as colunas necessárias para o resumo
+    window = Q(due_date__gt=lower, due_date__lte=upper)
+    if changed_since is not None and floor < min(lower, upper):
+        window |= Q(due_date__gt=floor, due_date__lte=min(lower, upper), updated_at__gt=changed_since)
+    return Task.objects.filter(
+        window,
+        stage__is_done=False,
+        recurrence_rule=''
+    ).order_by('due_date', 'id').values(*ROW_FIELDS, 'recurrence_parent_id', 'recurrence_date')
+
+
+def due_occurrences(floor, lower, upper, changed_since=None, batch_size=1000):
+    # Ocorrências virtuais das tarefas modelo (índice tasks_recurring_idx).
+    # Datas já materializadas ficam de fora: a tarefa concreta vem em due_tasks.
+    # Séries encerradas antes da janela (recurrence_end) nem saem do banco
+    bottom = min(floor, lower)
+    templates = Task.objects.exclude(recurrence_rule='').filter(
+        Q(recurrence_end__isnull=True) | Q(recurrence_end__gt=bottom),
+        stage__is_done=False,
+        due_date__lte=upper
+    ).order_by('id').values(*ROW_FIELDS, 'recurrence_rule', 'updated_at')
+
+    iterator = templates.iterator(chunk_size=batch_size)
+    while True:
+        chunk = list(islice(iterator, batch_size))
+        if not chunk:
+            return
+
+        template_ids = [template['id'] for template in chunk]
+        materialized = set()
+        for model in (Task, ArchivedTask):
+            materialized.update(model.objects.filter(
+                recurrence_parent_id__in=template_ids,
+                recurrence_date__gt=bottom,
+                recurrence_date__lte=upper
+            ).values_list('recurrence_parent_id', 'recurrence_date'))
+
+        for template in chunk:
+            changed = changed_since is not None and template['updated_at'] > changed_since
+            start = bottom if changed else lower
+            rule = template.pop('recurrence_rule')
+            template.pop('updated_at')
+            for day in occurrences(rule, template['due_date'], start + timedelta(days=1), upper):
+                if (template['id'], day) not in materialized:
+                    yield {**template, 'due_date': day, 'recurrence_parent_id': None, 'recurrence_date': None}
+
+
+def unsent(kind, rows, batch_size=1000):
+    # Descarta o que já foi avisado, uma consulta a SentReminder por lote.
+    # Ocorrência materializada conta como avisada se o modelo já avisou a data
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            return
+        task_ids = {row['id'] for row in chunk}
+        task_ids.update(row['recurrence_parent_id'] for row in chunk if row['recurrence_parent_id'])
+        sent = set(SentReminder.objects.filter(kind=kind, task_id__in=task_ids).values_list('task_id', 'due_date'))
+        for row in chunk:
+            if (row['id'], row['due_date']) in sent:
+                continue
+            if row['recurrence_date'] == row['due_date'] and (row['recurrence_parent_id'], row['due_date']) in sent:
+                continue
+            yield row
+
+
+def recipients(workspace_ids):
+    # Quem enxerga as tarefas de cada workspace: o dono e os membros
+    found = {
+        workspace_id: [owner_uid]
+        for workspace_id, owner_uid in Workspace.objects.filter(id__in=workspace_ids).values_list('id', 'owner_uid')
+    }
+    members = WorkspaceMember.objects.filter(workspace_id__in=workspace_ids).values_list('workspace_id', 'member_uid')
+    for workspace_id, member_uid in members:
+        if member_uid not in found[workspace_id]:
+            found[workspace_id].append(member_uid)
+    return found
+
+
+def build_digests(kind, rows, batch_size=1000):
+    # Um resumo por usuário; os destinatários vêm numa consulta por lote,
+    # só para os workspaces ainda não vistos
+    digests = {}
+    users = {}
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        users.update(recipients({row['workspace_id'] for row in chunk} - users.keys()))
+        for row in chunk:
+            for uid in users.get(row['workspace_id'], []):
+                digest = digests.setdefault(uid, {'count': 0, 'tasks': []})
+                digest['count'] += 1
+                if len(digest['tasks']) < DIGEST_MAX_TASKS:
+                    digest['tasks'].append({
+                        'id': row['id'],
+                        'title': row['title'],
+                        'due_date': row['due_date'].isoformat(),
+                        'board_id': row['stage__board_id'],
+                    })
+
+    return [
+        Notification(
+            owner_uid=uid,
+            kind=kind,
+            title=KINDS[kind].format(count=digest['count']),
+            payload=digest
+        )
+        for uid, digest in digests.items()
+    ]
+
+
+def run_scan(kind, sinks, today=None, lookahead_days=1, batch_size=1000):
+    today = today or date.today()
+    started = timezone.now()
+    floor, lower, upper, changed_since = scan_window(kind, today, lookahead_days)
+
+    created = []
+    with transaction.atomic():
+        rows = chain(
+            due_tasks(floor, lower, upper, changed_since).iterator(chunk_size=batch_size),
+            due_occurrences(floor, lower, upper, changed_since, batch_size)
+        )
+        reminders = []
+
+        def remember(rows):
+            for row in rows:
+                reminders.append(SentReminder(task_id=row['id'], kind=kind, due_date=row['due_date']))
+                yield row
+
+        notifications = build_digests(kind, remember(unsent(kind, rows, batch_size)), batch_size)
+        for i in range(0, len(notifications), batch_size):
+            created.extend(Notification.objects.bulk_create(notifications[i:i + batch_size]))
+        SentReminder.objects.bulk_create(reminders, batch_size=batch_size, ignore_conflicts=True)
+        # Vencimentos abaixo do piso não voltam a ser varridos
+        SentReminder.objects.filter(kind=kind, due_date__lte=floor).delete()
+        SchedulerState.objects.update_or_create(
+            name=kind,
+            defaults={'last_date': max(lower, upper), 'last_run_at': started}
+        )
+
+    # Entrega só depois do commit: se a transação falhar, nada sai pelos sinks
+    for i in range(0, len(created), batch_size):
+        for sink in sinks:
+            sink.deliver(created[i:i + batch_size])
+    return len(created)
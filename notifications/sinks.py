@@ -0,0 +1,47 @@
+import json
+import logging
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('notifications')
+
+
+class BaseSink:
+    def deliver(self, notifications):
+        raise NotImplementedError
+
+
+class LogSink(BaseSink):
+    def deliver(self, notifications):
+        for notification in notifications:
+            logger.info("[%s] %s: %s", notification.kind, notification.owner_uid, notification.title)
+
+
+class FileSink(BaseSink):
+    # Uma linha JSON por notificação; útil em testes e desenvolvimento local
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFICATION_FILE_PATH
+
+    def deliver(self, notifications):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for notification in notifications:
+                f.write(json.dumps({
+                    'id': notification.id,
+                    'owner_uid': notification.owner_uid,
+                    'kind': notification.kind,
+                    'title': notification.title,
+                    'payload': notification.payload,
+                }, default=str) + '\n')
+
+
+class MemorySink(BaseSink):
+    # Guarda as notificações entregues na própria instância; usado nos testes
+    def __init__(self):
+        self.delivered = []
+
+    def deliver(self, notifications):
+        self.delivered.extend(notifications)
+
+
+def get_sinks():
+    return [import_string(path)() for path in settings.NOTIFICATION_SINKS]
@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+from unittest import mock
+from django.test import Client, TestCase
+from boards.models import Board, Stage
+from organiza_me.bench import bearer
+from tasks.models import Task
+from tasks.recurrence import materialize_occurrence, occurrences
+from workspaces.models import Workspace, WorkspaceMember
+from .models import Notification
+from .scheduler import run_scan
+from .sinks import MemorySink
+
+# Create your tests here.
+TODAY = date(2026, 3, 10)
+
+
+class SchedulerTests(TestCase):
+
+    def setUp(self):
+        self.sink = MemorySink()
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        board = Board.objects.create(name='b', workspace=self.workspace)
+        self.todo = Stage.objects.create(name='todo', board=board)
+        self.done = Stage.objects.create(name='done', board=board, is_done=True)
+
+    def task(self, due_date, stage=None, **fields):
+        return Task.objects.create(
+            title='t', stage=stage or self.todo, due_date=due_date, workspace=self.workspace, **fields
+        )
+
+    def scan(self, kind='due_soon', today=TODAY):
+        self.sink.delivered = []
+        run_scan(kind, [self.sink], today=today)
+        return [task['id'] for notification in self.sink.delivered for task in notification.payload['tasks']]
+
+    def test_due_soon_digest_per_owner(self):
+        soon = self.task(TODAY + timedelta(days=1))
+        self.task(TODAY + timedelta(days=1), stage=self.done)
+        self.task(TODAY + timedelta(days=5))
+
+        self.assertEqual(self.scan(), [soon.id])
+        self.assertEqual(self.sink.delivered[0].owner_uid, 'owner')
+        self.assertEqual(self.scan(), [])
+
+    def test_task_created_inside_scanned_window_is_reminded_once(self):
+        self.scan()
+        late = self.task(TODAY)
+
+        self.assertEqual(self.scan(), [late.id])
+        late.title = 'editada'
+        late.save()
+        self.assertEqual(self.scan(), [])
+
+    def test_task_moved_to_new_due_date_is_reminded_again(self):
+        task = self.task(TODAY + timedelta(days=1))
+        self.assertEqual(self.scan(), [task.id])
+
+        task.due_date = TODAY
+        task.save()
+        self.assertEqual(self.scan(), [task.id])
+
+    def test_overdue_catches_task_created_after_scan(self):
+        self.scan('overdue')
+        late = self.task(TODAY - timedelta(days=1))
+
+        self.assertEqual(self.scan('overdue'), [late.id])
+        self.assertEqual(self.scan('overdue'), [])
+
+    def test_recurring_occurrences_are_reminded(self):
+        template = self.task(TODAY - timedelta(days=30), recurrence_rule='FREQ=DAILY')
+
+        self.assertEqual(self.scan(), [template.id, template.id])
+        payload = self.sink.delivered[0].payload
+        self.assertEqual(
+            [task['due_date'] for task in payload['tasks']],
+            [TODAY.isoformat(), (TODAY + timedelta(days=1)).isoformat()]
+        )
+
+    def test_materialized_occurrence_is_not_reminded_twice(self):
+        template = self.task(TODAY - timedelta(days=30), recurrence_rule='FREQ=DAILY')
+        self.scan(today=TODAY - timedelta(days=1))
+
+        occurrence = materialize_occurrence(template, TODAY, title='editada')
+        ids = self.scan()
+        self.assertNotIn(occurrence.id, ids)
+        self.assertEqual(ids, [template.id])
+
+        moved = materialize_occurrence(template, TODAY + timedelta(days=2), title='nova')
+        self.assertEqual(self.scan(today=TODAY + timedelta(days=1)), [moved.id])
+
+    def test_members_get_their_own_digest(self):
+        WorkspaceMember.objects.create(workspace=self.workspace, member_uid='editor')
+        WorkspaceMember.objects.create(workspace=self.workspace, member_uid='viewer', role='viewer')
+        soon = self.task(TODAY + timedelta(days=1))
+
+        self.assertEqual(self.scan(), [soon.id] * 3)
+        self.assertEqual(
+            sorted(notification.owner_uid for notification in self.sink.delivered), ['editor', 'owner', 'viewer']
+        )
+
+    def test_ended_series_are_not_expanded(self):
+        self.task(TODAY - timedelta(days=30), recurrence_rule='FREQ=DAILY;COUNT=5', recurrence_end=TODAY - timedelta(days=25))
+        open_ended = self.task(TODAY - timedelta(days=30), recurrence_rule='FREQ=DAILY')
+
+        with mock.patch('notifications.scheduler.occurrences', wraps=occurrences) as expand:
+            self.assertEqual(self.scan(), [open_ended.id, open_ended.id])
+        # Uma expansão por modelo lido: a série encerrada fica no banco
+        self.assertEqual(expand.call_count, 1)
+
+
+class NotificationListTests(TestCase):
+
+    def test_limit_is_clamped(self):
+        Notification.objects.bulk_create([Notification(owner_uid='owner', kind='due_soon', title='t') for _ in range(3)])
+        client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+
+        for limit, expected in ((-1, 1), (0, 1), (2, 2), (500, 3)):
+            with self.subTest(limit=limit):
+                response = client.get('/api/notifications/', {'limit': limit})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()), expected)
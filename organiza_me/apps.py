@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class OrganizaMeConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'organiza_me'
+
+    def ready(self):
+        import organiza_me.checks
@@ -0,0 +1,16 @@
+"""
+ASGI config for the organiza_me JSON API.
+
+Same as organiza_me.asgi but with the API-only settings profile
+(organiza_me.settings_api): no session, CSRF, messages or admin machinery
+in the request pipeline. Route /api/ here and keep /admin/ on
+organiza_me.asgi.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'organiza_me.settings_api')
+
+application = get_asgi_application()
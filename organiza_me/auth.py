@@ -1,6 +1,7 @@
 import os
 import jwt
 from ninja.security import HttpBearer
+from .db_router import set_current_user
 
 class SupabaseAuth(HttpBearer):
     def authenticate(self, request, token):
@@ -11,7 +12,9 @@ class SupabaseAuth(HttpBearer):
                 algorithms=["HS256"],
                 audience="authenticated"
             )
-            return payload.get('sub')
+            uid = payload.get('sub')
+            set_current_user(uid)
+            return uid
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
@@ -0,0 +1,161 @@
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import jwt
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+
+# Utilitários compartilhados pelos comandos bench_* (manage.py).
+# Os dados semeados vivem dentro de uma transação desfeita no final,
+# então os benchmarks podem rodar contra qualquer banco sem sujar nada.
+
+
+def bearer(uid):
+    secret = os.getenv('SUPABASE_JWT_SECRET')
+    if not secret:
+        secret = secrets.token_hex(16)
+        os.environ['SUPABASE_JWT_SECRET'] = secret
+    token = jwt.encode({'sub': uid, 'aud': 'authenticated'}, secret, algorithm='HS256')
+    return f"Bearer {token}"
+
+
+def api_client(uid, **extra):
+    return Client(HTTP_AUTHORIZATION=bearer(uid), HTTP_HOST='localhost', **extra)
+
+
+# Prelúdio dos processos filhos: sobe a aplicação WSGI do perfil pedido e
+# define request(), que atende GET /api/hello direto no handler, sem servidor
+WSGI_CHILD = """
+import time
+START = time.perf_counter()
+import io, os, sys
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+
+def request(path='/api/hello'):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'HTTP_AUTHORIZATION': os.environ['BENCH_AUTHORIZATION'],
+        'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+    }
+    status = []
+    b''.join(application(environ, lambda s, h, *a: status.append(s)))
+    return status[0].split()[0]
+"""
+
+
+def run_wsgi_child(profile, code, *flags):
+    authorization = bearer('bench')  # garante SUPABASE_JWT_SECRET antes de copiar o ambiente
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': profile,
+        'BENCH_AUTHORIZATION': authorization,
+        'PYTHONPATH': os.pathsep.join(filter(None, [str(settings.BASE_DIR), os.environ.get('PYTHONPATH')])),
+    }
+    return subprocess.run(
+        [sys.executable, *flags, '-c', WSGI_CHILD + code],
+        env=env, capture_output=True, text=True, check=True
+    )
+
+
+def measure(fn, repeat=20, warmup=2):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+@contextmanager
+def count_queries():
+    # CaptureQueriesContext não serve aqui: o signal request_started limpa
+    # connection.queries no início de cada request
+    counter = {'count': 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter['count'] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+@contextmanager
+def rollback():
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def seed(owner_uid, workspaces=3, boards=3, tasks=200, tags=5, subtasks=2, description_size=500, date_spread=60):
+    from workspaces.models import Workspace
+    from boards.models import Board, Stage
+    from tasks.models import Task, Tag, Subtask
+
+    today = date.today()
+    created = Workspace.objects.bulk_create([
+        Workspace(name=f"bench-{i}", owner_uid=owner_uid) for i in range(workspaces)
+    ])
+    board_objs = Board.objects.bulk_create([
+        Board(name=f"bench-{i}", workspace=workspace)
+        for workspace in created for i in range(boards)
+    ])
+    # bulk_create não dispara o signal que cria os estágios padrão
+    stage_objs = Stage.objects.bulk_create([
+        Stage(name=name, board=board, position=position, is_done=(name == 'concluido'))
+        for board in board_objs
+        for position, name in enumerate(['a_fazer', 'fazendo', 'concluido'])
+    ])
+    tag_objs = Tag.objects.bulk_create([
+        Tag(name=f"t{i}", workspace=workspace) for workspace in created for i in range(tags)
+    ])
+
+    tags_by_workspace = {}
+    for tag in tag_objs:
+        tags_by_workspace.setdefault(tag.workspace_id, []).append(tag)
+    board_workspace = {board.id: board.workspace_id for board in board_objs}
+    stage_workspace = {stage.id: board_workspace[stage.board_id] for stage in stage_objs}
+
+    task_objs = Task.objects.bulk_create([
+        Task(
+            title=f"bench {i}",
+            description='x' * description_size,
+            stage=stage_objs[i % len(stage_objs)],
+            workspace_id=stage_workspace[stage_objs[i % len(stage_objs)].id],
+            position=i,
+            start_date=today + timedelta(days=(i * 7919 % date_spread) - date_spread // 2),
+            due_date=today + timedelta(days=(i * 7919 % date_spread) - date_spread // 2 + i % 20) if i % 5 else None,
+        )
+        for i in range(tasks)
+    ], batch_size=1000)
+
+    TaskTag = Task.tags.through
+    TaskTag.objects.bulk_create([
+        TaskTag(task_id=task.id, tag_id=tag.id, workspace_id=task.workspace_id)
+        for i, task in enumerate(task_objs)
+        for tag in tags_by_workspace.get(task.workspace_id, [])[:i % 3]
+    ], batch_size=1000)
+    Subtask.objects.bulk_create([
+        Subtask(title=f"sub {i}", task=task, position=i, workspace_id=task.workspace_id)
+        for task in task_objs for i in range(subtasks)
+    ], batch_size=1000)
+
+    return {
+        'workspaces': created,
+        'boards': board_objs,
+        'stages': stage_objs,
+        'tags': tag_objs,
+        'tasks': task_objs,
+    }
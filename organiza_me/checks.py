@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from .db_router import replica_configured
+
+# Backends de cache que vivem dentro de um único processo
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache():
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+@register(Tags.caches)
+def check_replica_cache(app_configs, **kwargs):
+    # O pin de read-your-writes fica no cache: num cache local, o request
+    # seguinte do usuário cai em outro worker e lê a réplica atrasada
+    if replica_configured() and not shared_cache():
+        return [Error(
+            "DATABASES['replica'] exige um cache compartilhado entre os processos",
+            hint="Defina REDIS_URL para usar o RedisCache",
+            id='organiza_me.E001',
+        )]
+    return []
@@ -0,0 +1,80 @@
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote brotli, só gzip
+    brotli = None
+
+# Compressão negociada das respostas (Accept-Encoding): brotli quando o
+# cliente aceita e o pacote está instalado, senão gzip. Respostas menores
+# que COMPRESSION_MIN_SIZE saem como estão: o ganho não paga a CPU.
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+def accepted_encodings(header):
+    # "gzip;q=0.8, br" -> {'gzip': 0.8, 'br': 1.0}; q=0 significa recusado
+    encodings = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            encodings[name.strip().lower()] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    encodings = accepted_encodings(header)
+    wildcard = encodings.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    scored = [(encodings.get(name, wildcard), name) for name in candidates]
+    # Empate de q: a ordem de candidates decide (br antes de gzip)
+    quality, name = max(scored, key=lambda item: item[0])
+    return name if quality > 0 else None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+            or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # Mesma regra do GZipMiddleware: o corpo mudou, a ETag vira fraca
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
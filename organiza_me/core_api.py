@@ -0,0 +1,7 @@
+from ninja import Router
+
+router = Router()
+
+@router.get("/hello")
+def hello(request):
+    return{"message": "Olá, OrganizaMe"}
@@ -0,0 +1,103 @@
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Roteamento para a réplica de leitura (DATABASES['replica'], opcional).
+# Só requests GET/HEAD leem da réplica. Depois que um usuário escreve, as
+# leituras dele ficam no primário por REPLICA_STICKY_SECONDS (read-your-writes).
+
+REPLICA_DB_ALIAS = 'replica'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+_current_user = ContextVar('current_user', default=None)
+_wrote = ContextVar('wrote', default=False)
+
+_health = {'checked_at': 0.0, 'ok': False}
+
+LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+
+def _pin_key(uid):
+    return f"db_primary_pin:{uid}"
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def replica_available():
+    # Resultado do health check fica em memória por alguns segundos para
+    # não pagar uma query extra a cada leitura
+    now = time.monotonic()
+    if now - _health['checked_at'] < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+        return _health['ok']
+
+    try:
+        connection = connections[REPLICA_DB_ALIAS]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(LAG_QUERY)
+                lag = cursor.fetchone()[0] or 0
+            else:
+                cursor.execute("SELECT 1")
+                lag = 0
+        ok = float(lag) <= settings.REPLICA_MAX_LAG_SECONDS
+    except Exception:
+        ok = False
+
+    _health.update(checked_at=now, ok=ok)
+    return ok
+
+
+def set_current_user(uid):
+    # Chamado pela autenticação: se o usuário escreveu há pouco, lê do primário
+    _current_user.set(uid)
+    if uid and _read_from_replica.get() and cache.get(_pin_key(uid)):
+        _read_from_replica.set(False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get() and replica_configured() and replica_available():
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplica e primário têm os mesmos dados
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = (
+            _read_from_replica.set(request.method in SAFE_METHODS),
+            _current_user.set(None),
+            _wrote.set(False),
+        )
+        try:
+            response = self.get_response(request)
+            uid = _current_user.get()
+            if uid and _wrote.get():
+                cache.set(_pin_key(uid), True, settings.REPLICA_STICKY_SECONDS)
+            return response
+        finally:
+            for var, token in zip((_read_from_replica, _current_user, _wrote), tokens):
+                var.reset(token)
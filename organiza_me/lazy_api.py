@@ -0,0 +1,37 @@
+import threading
+from django.urls import URLResolver
+from django.urls.resolvers import RoutePattern
+from django.utils.module_loading import import_string
+
+
+class LazyRouterConf:
+    # Faz o papel de um módulo de urlconf: o URLResolver só lê "urlpatterns"
+    # quando um request casa com o prefixo, então o módulo de API do app (e
+    # os schemas pydantic dos endpoints) só é importado nesse momento
+    _lock = threading.Lock()
+
+    def __init__(self, router_path, namespace):
+        self.router_path = router_path
+        self.namespace = namespace
+        self._urlpatterns = None
+
+    @property
+    def urlpatterns(self):
+        if self._urlpatterns is None:
+            with self._lock:
+                if self._urlpatterns is None:
+                    self._urlpatterns = self._build()
+        return self._urlpatterns
+
+    def _build(self):
+        from ninja import NinjaAPI
+        from .auth import SupabaseAuth
+
+        api = NinjaAPI(auth=SupabaseAuth(), urls_namespace=self.namespace, docs_url=None, openapi_url=None)
+        api.add_router("", import_string(self.router_path))
+        return api.urls[0]
+
+
+def lazy_router(prefix, router_path):
+    namespace = "api-" + (prefix.strip("/").replace("/", "-") or "core")
+    return URLResolver(RoutePattern(prefix), LazyRouterConf(router_path, namespace), namespace=namespace)
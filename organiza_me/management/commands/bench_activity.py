@@ -0,0 +1,60 @@
+from unittest import mock
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import TestCase
+from django.test.utils import override_settings
+from activity.log import buffer
+from activity.models import ActivityEvent
+from organiza_me.bench import api_client, count_queries, measure, rollback, seed
+
+# (nome, ACTIVITY_ENABLED, ACTIVITY_BUFFER_SIZE)
+MODES = [
+    ('sem log', False, 1),
+    ('síncrono', True, 1),
+    ('buffer', True, 100),
+]
+
+
+class Command(BaseCommand):
+    help = "Mede o custo do registro de atividade nas mutações: sem log, um INSERT por mutação e buffer em lote"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        # Dentro de rollback() o on_commit nunca dispara: captureOnCommitCallbacks
+        # executa os callbacks de cada requisição ao fim dela, como num commit real.
+        # A thread de fundo fica desligada para não gravar fora da transação do
+        # benchmark; o flush por tamanho que ela faria roda aqui, dentro da medição
+        with override_settings(ALLOWED_HOSTS=['*']), mock.patch.object(buffer, 'start_flusher'), rollback():
+            data = seed('bench-activity', workspaces=1, boards=1, tasks=options['tasks'], tags=0, subtasks=0, description_size=0)
+            tasks = data['tasks']
+            stages = [stage.id for stage in data['stages']]
+            client = api_client('bench-activity')
+            client.get('/api/workspaces/')  # aquece o cache de acesso
+
+            counter = {'i': 0}
+
+            def move():
+                i = counter['i'] = counter['i'] + 1
+                task = tasks[i % len(tasks)]
+                payload = {'stage_id': stages[i % len(stages)], 'position': i}
+                with TestCase.captureOnCommitCallbacks(execute=True):
+                    client.patch(f'/api/tasks/{task.id}/move/', payload, content_type='application/json')
+                if len(buffer.events) >= settings.ACTIVITY_BUFFER_SIZE:
+                    buffer.flush()
+
+            self.stdout.write(f"{'modo':<12}{'ms/mutação':>12}{'queries/mutação':>17}{'eventos':>10}")
+            for name, enabled, size in MODES:
+                with override_settings(ACTIVITY_ENABLED=enabled, ACTIVITY_BUFFER_SIZE=size):
+                    before = ActivityEvent.objects.count()
+                    with count_queries() as queries:
+                        elapsed = measure(move, repeat=options['repeat'])
+                    buffer.flush()
+                    events = ActivityEvent.objects.count() - before
+                calls = options['repeat'] + 2  # measure() inclui o aquecimento
+                self.stdout.write(f"{name:<12}{elapsed:>12.2f}{queries['count'] / calls:>17.2f}{events:>10}")
+
+            feed = client.get(f"/api/workspaces/{data['workspaces'][0].id}/activity/").json()
+            self.stdout.write(f"\nfeed: {len(feed['items'])} eventos na primeira página")
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from organiza_me.bench import api_client, count_queries, measure, rollback, seed
+from tasks.models import Task
+from workspaces.models import WorkspaceMember
+
+ENDPOINTS = [
+    ('list_workspaces', '/api/workspaces/', {}),
+    ('list_boards', '/api/boards/', {}),
+    ('list_stages', '/api/boards/stages/', {}),
+    ('list_tasks', '/api/tasks/', {}),
+    ('list_tags', '/api/tasks/tags/', {}),
+    ('list_subtasks', '/api/tasks/subtasks/', {}),
+    ('list_overview', '/api/overview/', {'period': 'month'}),
+]
+
+
+class Command(BaseCommand):
+    help = "Mede os endpoints de leitura para dono e membro de um workspace compartilhado"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--workspaces', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=['*']), rollback():
+            data = seed('bench-owner', workspaces=options['workspaces'], tasks=options['tasks'])
+            WorkspaceMember.objects.bulk_create([
+                WorkspaceMember(workspace=workspace, member_uid='bench-member', role='viewer')
+                for workspace in data['workspaces']
+            ])
+            owner = api_client('bench-owner')
+            member = api_client('bench-member')
+
+            self.stdout.write(f"{'endpoint':<16}{'dono (ms)':>12}{'membro (ms)':>14}{'queries':>10}")
+            for name, path, params in ENDPOINTS:
+                with count_queries() as queries:
+                    member.get(path, params)
+                owner_ms = measure(lambda: owner.get(path, params), repeat=options['repeat'])
+                member_ms = measure(lambda: member.get(path, params), repeat=options['repeat'])
+                self.stdout.write(f"{name:<16}{owner_ms:>12.2f}{member_ms:>14.2f}{queries['count']:>10}")
+
+            # Comparação direta com a cadeia de joins antiga (só o dono via owner_uid)
+            ids = [workspace.id for workspace in data['workspaces']]
+            legacy = measure(lambda: list(Task.objects.filter(stage__board__workspace__owner_uid='bench-owner').values('id')), repeat=options['repeat'])
+            current = measure(lambda: list(Task.objects.filter(workspace_id__in=ids).values('id')), repeat=options['repeat'])
+            self.stdout.write(f"\ntasks via owner_uid join: {legacy:.2f} ms | via workspace_id__in: {current:.2f} ms")
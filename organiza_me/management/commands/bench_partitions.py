@@ -0,0 +1,79 @@
+import re
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from organiza_me.bench import api_client, measure, rollback, seed
+from tasks.models import Task
+from tasks.partitioning import TABLES, partition_tables, supported
+
+
+def endpoints(data):
+    task = data['tasks'][0]
+    tag = data['tags'][0]
+    return [
+        ('tarefas', '/api/tasks/', {'fields': 'id,title,stage_id'}),
+        ('tarefa', f'/api/tasks/{task.id}/', {}),
+        ('subtarefas', '/api/tasks/subtasks/', {'task_id': task.id}),
+        ('por tag', '/api/tasks/', {'tags': tag.id, 'fields': 'id,title'}),
+        ('overview', '/api/overview/', {'period': 'month'}),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compara tasks_task/tasks_subtask/tasks_task_tags particionadas por workspace com a tabela única (Postgres)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--big-tasks', type=int, default=100000, help="Tarefas do workspace grande")
+        parser.add_argument('--small-workspaces', type=int, default=50)
+        parser.add_argument('--small-tasks', type=int, default=500, help="Tarefas de cada workspace pequeno")
+        parser.add_argument('--partitions', type=int, default=16)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        layouts = [('tabela única', None)]
+        if supported():
+            layouts.append(('particionada', options['partitions']))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"Banco {connection.vendor}: particionamento indisponível, medindo só a tabela única"
+            ))
+
+        # DDL do Postgres é transacional: a conversão também é desfeita no final
+        with override_settings(ALLOWED_HOSTS=['*']), rollback():
+            tenants = {
+                'grande': seed('bench-big', workspaces=1, boards=2, tasks=options['big_tasks'], tags=20, description_size=200),
+                'pequeno': seed('bench-small', workspaces=1, boards=2, tasks=options['small_tasks'], tags=20, description_size=200),
+            }
+            others = options['small_workspaces'] - 1
+            if others > 0:
+                seed('bench-others', workspaces=others, boards=1, tasks=others * options['small_tasks'], tags=5, description_size=200)
+            clients = {'grande': api_client('bench-big'), 'pequeno': api_client('bench-small')}
+            for client in clients.values():
+                client.get('/api/workspaces/')  # aquece o cache de acesso
+
+            results = {}
+            for layout, partitions in layouts:
+                if partitions:
+                    partition_tables(partitions)
+                elif connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        for table in TABLES:
+                            cursor.execute(f"ANALYZE {table}")
+
+                for tenant, data in tenants.items():
+                    client = clients[tenant]
+                    for name, path, params in endpoints(data):
+                        elapsed = measure(lambda: client.get(path, params), repeat=options['repeat'])
+                        results.setdefault((tenant, name), {})[layout] = elapsed
+
+                if partitions:
+                    small_id = tenants['pequeno']['workspaces'][0].id
+                    plan = Task.objects.filter(workspace_id__in=[small_id]).values('id').explain()
+                    scanned = len(set(re.findall(rf"{Task._meta.db_table}_p\d+", plan)))
+                    self.stdout.write(f"partições de tasks_task lidas pelo workspace pequeno: {scanned} de {partitions}\n")
+
+            header = ''.join(f"{layout + ' (ms)':>20}" for layout, _ in layouts)
+            self.stdout.write(f"{'workspace':<10}{'endpoint':<12}{header}")
+            for (tenant, name), timings in results.items():
+                row = ''.join(f"{timings[layout]:>20.2f}" for layout, _ in layouts)
+                self.stdout.write(f"{tenant:<10}{name:<12}{row}")
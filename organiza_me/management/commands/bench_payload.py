@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from organiza_me.bench import api_client, count_queries, measure, rollback, seed
+from organiza_me.compression import brotli
+from organiza_me.sparse import select_fields, selected_values, model_fields
+from tasks.api import TASK_COMPUTED_FIELDS, TASK_LIST_FIELDS
+from tasks.models import Task
+
+# Campos que o card do Kanban realmente mostra
+KANBAN_FIELDS = 'id,title,stage_id,position,start_date,due_date,tags,description_snippet'
+
+
+class Command(BaseCommand):
+    help = "Mede payload e leitura do banco de /api/tasks/ com e sem ?fields= e compressão"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--description-size', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+        variants = [('completo', None), ('kanban', KANBAN_FIELDS)]
+
+        with override_settings(ALLOWED_HOSTS=['*']), rollback():
+            data = seed('bench-payload', workspaces=1, tasks=options['tasks'], description_size=options['description_size'])
+            client = api_client('bench-payload')
+            tasks = Task.objects.filter(workspace_id__in=[w.id for w in data['workspaces']])
+
+            header = ''.join(f"{encoding + ' (KB)':>14}" for encoding in encodings)
+            self.stdout.write(f"{'variante':<10}{'banco (KB)':>12}{header}{'ms':>10}{'queries':>9}")
+            for name, fields in variants:
+                params = {'fields': fields} if fields else {}
+                sizes = [
+                    len(client.get('/api/tasks/', params, HTTP_ACCEPT_ENCODING=encoding).content) / 1024
+                    for encoding in encodings
+                ]
+                with count_queries() as queries:
+                    client.get('/api/tasks/', params, HTTP_ACCEPT_ENCODING='gzip')
+                elapsed = measure(lambda: client.get('/api/tasks/', params, HTTP_ACCEPT_ENCODING='gzip'), repeat=options['repeat'])
+                self.stdout.write(
+                    f"{name:<10}{self.db_kilobytes(tasks, fields):>12.1f}"
+                    + ''.join(f"{size:>14.1f}" for size in sizes)
+                    + f"{elapsed:>10.2f}{queries['count']:>9}"
+                )
+
+    def db_kilobytes(self, tasks, fields):
+        # Aproximação do volume lido: soma do tamanho textual das colunas selecionadas
+        allowed = model_fields(Task) + list(TASK_COMPUTED_FIELDS) + ['tags']
+        selected = select_fields(fields, allowed, TASK_LIST_FIELDS)
+        rows = selected_values(tasks, selected, TASK_COMPUTED_FIELDS)
+        return sum(len(str(value)) for row in rows for value in row.values() if value is not None) / 1024
@@ -0,0 +1,41 @@
+import json
+from django.core.management.base import BaseCommand
+from organiza_me.bench import run_wsgi_child
+
+# Aquece a aplicação e mede N requests GET /api/hello direto no handler WSGI,
+# isolando o custo do pipeline (middlewares, resolução de URL e auth)
+REQUESTS = """
+import statistics
+assert request() == '200'
+for _ in range(50):
+    request()
+timings = []
+for _ in range({count}):
+    start = time.perf_counter()
+    request()
+    timings.append((time.perf_counter() - start) * 1e6)
+timings.sort()
+print(json.dumps({{'median': statistics.median(timings), 'p95': timings[int(len(timings) * 0.95) - 1]}}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark do overhead por request de /api/hello em cada perfil de settings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=['organiza_me.settings', 'organiza_me.settings_api'])
+        parser.add_argument('--requests', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in options['profiles']:
+            output = run_wsgi_child(profile, "import json\n" + REQUESTS.format(count=options['requests']))
+            results[profile] = json.loads(output.stdout)
+            self.stdout.write(
+                f"{profile:<40} mediana {results[profile]['median']:8.1f} µs   p95 {results[profile]['p95']:8.1f} µs"
+            )
+
+        baseline, *others = options['profiles']
+        for profile in others:
+            saved = results[baseline]['median'] - results[profile]['median']
+            self.stdout.write(f"\n{profile}: {saved:.1f} µs a menos por request ({saved / results[baseline]['median']:.0%})")
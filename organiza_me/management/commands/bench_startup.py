@@ -0,0 +1,66 @@
+import statistics
+import time
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from organiza_me.bench import run_wsgi_child
+
+# Sobe o Django num processo novo e atende um único GET /api/hello
+FIRST_REQUEST = """
+status = request()
+done = time.perf_counter()
+print(status, (ready - START) * 1000, (done - START) * 1000)
+"""
+
+
+class Command(BaseCommand):
+    help = "Mede o cold start: tempo de import por módulo e tempo até a primeira resposta"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=['organiza_me.settings', 'organiza_me.settings_api'])
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15, help="Quantos módulos listar no relatório de imports")
+        parser.add_argument('--target', type=float, default=0.5, help="Fração do tempo do primeiro perfil a atingir")
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in options['profiles']:
+            samples = [self.first_response(profile) for _ in range(options['runs'])]
+            ready, done, wall = (statistics.median(column) for column in zip(*samples))
+            results[profile] = done
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{profile}"))
+            self.stdout.write(f"  aplicação WSGI pronta:     {ready:8.1f} ms")
+            self.stdout.write(f"  primeira resposta:         {done:8.1f} ms")
+            self.stdout.write(f"  com subida do interpretador: {wall:6.1f} ms (mediana de {options['runs']})")
+            self.stdout.write("  imports mais caros (cumulativo):")
+            for module, micros in self.import_times(profile)[:options['top']]:
+                self.stdout.write(f"    {micros / 1000:8.1f} ms  {module}")
+
+        baseline, *others = options['profiles']
+        for profile in others:
+            ratio = results[profile] / results[baseline]
+            status = "OK" if ratio <= options['target'] else "acima da meta"
+            self.stdout.write(f"\n{profile}: {ratio:.0%} do tempo de {baseline} (meta {options['target']:.0%}: {status})")
+
+    def first_response(self, profile):
+        start = time.perf_counter()
+        output = run_wsgi_child(profile, FIRST_REQUEST)
+        wall = (time.perf_counter() - start) * 1000
+        status, ready, done = output.stdout.split()
+        if status != '200':
+            raise RuntimeError(f"/api/hello respondeu {status}: {output.stderr[-500:]}")
+        return float(ready), float(done), wall
+
+    def import_times(self, profile):
+        # Pacotes raiz (django, ninja, pydantic...) e os módulos dos nossos apps
+        local = tuple(f"{app.name}." for app in apps.get_app_configs() if not app.name.startswith('django.'))
+        output = run_wsgi_child(profile, FIRST_REQUEST, '-X', 'importtime')
+        modules = {}
+        for line in output.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            name = name.strip()
+            if '.' not in name or name.startswith(local):
+                modules[name] = max(modules.get(name, 0), int(cumulative))
+        return sorted(modules.items(), key=lambda item: item[1], reverse=True)
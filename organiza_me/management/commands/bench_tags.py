@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import override_settings
+from organiza_me.bench import api_client, count_queries, measure, rollback, seed
+from tasks.models import Tag, Task, TaskTag
+from tasks.tagging import filter_by_tags
+
+
+class Command(BaseCommand):
+    help = "Mede o filtro por tags e a contagem de uso (as asserções de plano ficam em tasks.tests.TagFilterTests)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20000)
+        parser.add_argument('--tags', type=int, default=300)
+        parser.add_argument('--tags-per-task', type=int, default=4)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        index_name = TaskTag._meta.indexes[0].name
+        failures = []
+
+        with override_settings(ALLOWED_HOSTS=['*']), rollback():
+            data = seed('bench-tags', workspaces=1, boards=1, tasks=options['tasks'], tags=options['tags'], subtasks=0, description_size=0)
+            tag_ids = [tag.id for tag in data['tags']]
+            TaskTag.objects.bulk_create([
+                TaskTag(task_id=task.id, tag_id=tag_ids[(i * 7 + j * 13) % len(tag_ids)], workspace_id=task.workspace_id)
+                for i, task in enumerate(data['tasks'])
+                for j in range(options['tags_per_task'])
+            ], batch_size=5000, ignore_conflicts=True)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE tasks_task_tags")
+                    cursor.execute("ANALYZE tasks_task")
+
+            client = api_client('bench-tags')
+            client.get('/api/tasks/tags/')  # aquece o cache de acesso antes de contar queries
+            workspaces = [w.id for w in data['workspaces']]
+            tasks = Task.objects.filter(workspace_id__in=workspaces)
+            cases = [
+                ('any 1 tag', ','.join(map(str, tag_ids[:1])), 'any'),
+                ('any 3 tags', ','.join(map(str, tag_ids[:3])), 'any'),
+                ('all 2 tags', f"{tag_ids[0]},{tag_ids[13 % len(tag_ids)]}", 'all'),
+            ]
+
+            self.stdout.write(f"{'caso':<14}{'tarefas':>10}{'ms':>10}{'queries':>9}  índice (tag, task, workspace)")
+            for name, tags, mode in cases:
+                params = {'tags': tags, 'tag_mode': mode, 'fields': 'title'}
+                with count_queries() as queries:
+                    count = len(client.get('/api/tasks/', params).json())
+                elapsed = measure(lambda: client.get('/api/tasks/', params), repeat=options['repeat'])
+                plan = filter_by_tags(tasks, tags, mode, workspaces=workspaces).values('id').explain()
+                uses_index = index_name in plan
+                if not uses_index:
+                    failures.append((name, plan))
+                self.stdout.write(f"{name:<14}{count:>10}{elapsed:>10.2f}{queries['count']:>9}  {'sim' if uses_index else 'NÃO'}")
+
+            with count_queries() as queries:
+                client.get('/api/tasks/tags/', {'with_counts': 1})
+            elapsed = measure(lambda: client.get('/api/tasks/tags/', {'with_counts': 1}), repeat=options['repeat'])
+            self.stdout.write(f"{'with_counts':<14}{len(tag_ids):>10}{elapsed:>10.2f}{queries['count']:>9}")
+            self.stdout.write(self.style.MIGRATE_HEADING("\nplano de with_counts"))
+            self.stdout.write(Tag.objects.filter(id__in=tag_ids).annotate(task_count=Count('tasktag')).values('id', 'task_count').explain())
+
+        for name, plan in failures:
+            self.stdout.write(self.style.WARNING(f"\n{name} não usou {index_name}:\n{plan}"))
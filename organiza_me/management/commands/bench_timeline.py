@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+from django.core.management.base import BaseCommand
+from django.db import connection
+from organiza_me.bench import measure, rollback, seed
+from tasks.models import Task
+from tasks.timeline import overlapping, use_interval_index
+
+WINDOWS = [('semana', 7), ('mês', 31), ('trimestre', 92)]
+
+
+class Command(BaseCommand):
+    help = "Compara a consulta de sobreposição da timeline: índice GiST de intervalo x B-tree"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=50000)
+        parser.add_argument('--spread', type=int, default=3650, help="Dias pelos quais as datas das tarefas se espalham")
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--explain', action='store_true', help="Mostra o plano de cada variante")
+
+    def handle(self, *args, **options):
+        variants = [('b-tree', False)]
+        if use_interval_index():
+            variants.insert(0, ('gist', True))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"Banco {connection.vendor}: índice GiST indisponível, medindo só o B-tree"
+            ))
+
+        with rollback():
+            data = seed(
+                'bench-timeline', workspaces=1, boards=1, tasks=options['tasks'],
+                tags=0, subtasks=0, description_size=0, date_spread=options['spread'],
+            )
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE tasks_task")
+            tasks = Task.objects.filter(workspace_id__in=[w.id for w in data['workspaces']])
+
+            header = ''.join(f"{name + ' (ms)':>16}" for name, _ in variants)
+            self.stdout.write(f"{'janela':<12}{'tarefas':>10}{header}")
+            for label, days in WINDOWS:
+                start = date.today() - timedelta(days=days // 2)
+                end = start + timedelta(days=days - 1)
+                count = overlapping(tasks, start, end, interval_index=False).count()
+                timings = [
+                    measure(lambda: list(overlapping(tasks, start, end, interval_index=flag).values_list('id', flat=True)), repeat=options['repeat'])
+                    for _, flag in variants
+                ]
+                self.stdout.write(f"{label:<12}{count:>10}" + ''.join(f"{ms:>16.2f}" for ms in timings))
+
+                if options['explain']:
+                    for name, flag in variants:
+                        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{label} / {name}"))
+                        self.stdout.write(overlapping(tasks, start, end, interval_index=flag).values('id').explain())
@@ -0,0 +1,12 @@
+# Tabela única dos routers da API: (prefixo, caminho do router).
+# Só strings, para que organiza_me.urls_api consiga carregar cada app sob
+# demanda sem importar os módulos de API de todos os apps.
+ROUTERS = [
+    ("workspaces/", "workspaces.api.router"),
+    ("boards/", "boards.api.router"),
+    ("tasks/", "tasks.api.router"),
+    ("overview/", "overview.api.router"),
+    ("notifications/", "notifications.api.router"),
+    ("webhooks/", "webhooks.api.router"),
+    ("", "organiza_me.core_api.router"),
+]
@@ -11,14 +11,17 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
 from pathlib import Path
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Em containers as variáveis já vêm do ambiente: DJANGO_SKIP_DOTENV=1 evita
+# importar o python-dotenv e procurar o arquivo a cada cold start
+if not os.getenv('DJANGO_SKIP_DOTENV'):
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/4.2/howto/deployment/checklist/
@@ -35,11 +38,15 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'organiza_me',
     'overview.apps.OverviewConfig',
     'corsheaders',
     'tasks.apps.TasksConfig',
     'boards.apps.BoardsConfig',
     'workspaces.apps.WorkspacesConfig',
+    'notifications.apps.NotificationsConfig',
+    'activity.apps.ActivityConfig',
+    'webhooks.apps.WebhooksConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -50,9 +57,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'organiza_me.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'organiza_me.db_router.ReplicaRoutingMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -97,6 +106,42 @@ DATABASES = {
     }
 }
 
+# Réplica de leitura opcional: requests GET leem dela, exceto logo depois de
+# o usuário escrever (ver organiza_me/db_router.py)
+
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('DB_REPLICA_NAME', DATABASES['default']['NAME']),
+        'HOST': os.getenv('DB_REPLICA_HOST'),
+        'PORT': os.getenv('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['organiza_me.db_router.ReplicaRouter']
+
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 2))
+
+REPLICA_HEALTH_CHECK_INTERVAL = 5
+
+
+# Cache
+# Sem REDIS_URL cada processo tem o próprio cache em memória; em produção com
+# vários workers use Redis para que invalidações cheguem a todos. Com réplica
+# configurada o cache compartilhado é obrigatório (organiza_me.checks)
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+
+WORKSPACE_ACCESS_CACHE_TIMEOUT = int(os.getenv('WORKSPACE_ACCESS_CACHE_TIMEOUT', 60))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -138,3 +183,73 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Notificações (manage.py run_scheduler)
+
+NOTIFICATION_SINKS = ['notifications.sinks.LogSink']
+
+NOTIFICATION_FILE_PATH = os.getenv('NOTIFICATION_FILE_PATH', BASE_DIR / 'notifications.jsonl')
+
+
+# Compressão das respostas (organiza_me.compression). brotli é opcional:
+# pip install brotli para habilitar Content-Encoding: br
+
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+
+COMPRESSION_GZIP_LEVEL = 6
+
+COMPRESSION_BROTLI_QUALITY = 4
+
+
+# Anexos enviados pela API (tasks.storage). Pillow é opcional: sem ele não
+# há miniaturas de imagem
+
+ATTACHMENT_STORAGE = 'tasks.storage.LocalStorage'
+
+ATTACHMENT_ROOT = os.getenv('ATTACHMENT_ROOT', BASE_DIR / 'media' / 'attachments')
+
+ATTACHMENT_MAX_SIZE = int(os.getenv('ATTACHMENT_MAX_SIZE', 50 * 1024 * 1024))
+
+ATTACHMENT_CHUNK_SIZE = 64 * 1024
+
+THUMBNAIL_SIZE = (320, 320)
+
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', 2))
+
+
+# Log de atividade (activity.log): eventos ficam num buffer por processo e
+# são gravados em lote quando ele enche ou a cada ACTIVITY_FLUSH_INTERVAL segundos
+
+ACTIVITY_ENABLED = True
+
+ACTIVITY_BUFFER_SIZE = int(os.getenv('ACTIVITY_BUFFER_SIZE', 100))
+
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv('ACTIVITY_FLUSH_INTERVAL', 2))
+
+
+# Webhooks (webhooks.outbox / webhooks.delivery): mutações gravam no outbox na
+# mesma transação e o worker run_webhooks entrega em lotes, com retentativas
+
+WEBHOOKS_ENABLED = True
+
+WEBHOOK_SUBSCRIPTION_CACHE_TIMEOUT = 60
+
+WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', 10))
+
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', 8))
+
+# Espera antes da tentativa n: BASE * 2^(n-1) segundos, até MAX
+WEBHOOK_BACKOFF_BASE = 10
+
+WEBHOOK_BACKOFF_MAX = 3600
+
+# Por quantos segundos uma entrega reservada fica fora do alcance de outros workers.
+# O worker só reserva o lote que já vai enviar: basta ser bem maior que WEBHOOK_TIMEOUT
+WEBHOOK_LEASE = 300
+
+WEBHOOK_RETENTION_DAYS = int(os.getenv('WEBHOOK_RETENTION_DAYS', 7))
+
+# URLs de webhook só podem apontar para endereços públicos (webhooks.destinations).
+# Ligue só em desenvolvimento, para o receptor local (manage.py webhook_receiver)
+WEBHOOK_ALLOW_LOCALHOST = os.getenv('WEBHOOK_ALLOW_LOCALHOST') == '1'
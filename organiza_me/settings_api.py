@@ -0,0 +1,43 @@
+"""
+API-only settings for organiza_me.
+
+Used by the autoscaled API containers: drops the admin, sessions, messages
+and static files apps that the JSON API never uses, and loads each app's
+router lazily through organiza_me.urls_api.
+
+The middleware stack keeps CORS and the security headers but skips the
+session, CSRF, authentication, messages and clickjacking middleware:
+every /api/ call authenticates with a bearer token (SupabaseAuth) and
+never touches cookies. /admin/ is not served by this profile; keep it on
+the default settings (organiza_me.wsgi / organiza_me.asgi).
+
+Served by organiza_me.wsgi_api / organiza_me.asgi_api.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE
+
+API_UNUSED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+API_UNUSED_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_UNUSED_APPS]
+
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in API_UNUSED_MIDDLEWARE]
+
+ROOT_URLCONF = 'organiza_me.urls_api'
+
+TEMPLATES = []
@@ -0,0 +1,48 @@
+from django.db.models.functions import Substr
+from ninja.errors import HttpError
+
+# Sparse fieldsets para os endpoints de listagem: ?fields=id,title,due_date
+# vira um .values(*fields), então colunas não pedidas nem saem do banco.
+# Sem ?fields= a resposta continua com todas as colunas, como antes.
+
+SNIPPET_LENGTH = 140
+
+
+def description_snippet(field='description'):
+    return Substr(field, 1, SNIPPET_LENGTH)
+
+
+def model_fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def select_fields(fields, allowed, default):
+    # id sempre vem primeiro: o frontend usa como chave das listas
+    if not fields:
+        return list(default)
+    selected = ['id']
+    for name in fields.split(','):
+        name = name.strip()
+        if not name or name in selected:
+            continue
+        if name not in allowed:
+            raise HttpError(400, f"Campo desconhecido em fields: {name}")
+        selected.append(name)
+    return selected
+
+
+def selected_values(queryset, selected, computed=None):
+    # computed: campos calculados no banco (ex.: description_snippet), só
+    # anotados quando pedidos. Nomes fora do modelo e de computed (ex.: tags)
+    # são montados pelo endpoint e ficam fora do .values()
+    computed = computed or {}
+    columns = set(model_fields(queryset.model))
+    annotations = {name: computed[name] for name in selected if name in computed}
+    values = [name for name in selected if name in columns]
+    return queryset.annotate(**annotations).values(*values, *annotations)
+
+
+def sparse_values(queryset, fields, computed=None):
+    columns = model_fields(queryset.model)
+    selected = select_fields(fields, columns + list(computed or {}), columns)
+    return selected_values(queryset, selected, computed)
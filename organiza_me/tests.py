@@ -0,0 +1,286 @@
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from boards.models import Board
+from tasks.models import Task
+from workspaces.models import Workspace, WorkspaceMember
+from .bench import bearer
+from . import settings_api
+from .db_router import REPLICA_DB_ALIAS, ReplicaRouter, ReplicaRoutingMiddleware, _health, replica_configured, set_current_user
+
+
+@skipUnless(replica_configured(), "DATABASES['replica'] não configurado")
+class ReplicaRoutingTests(TestCase):
+    # O runner cria/valida todo alias citado, mesmo em classe pulada
+    databases = {'default', REPLICA_DB_ALIAS} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        # Health check em memória: cada teste começa e termina sem ele
+        _health.update(checked_at=0.0, ok=False)
+        self.addCleanup(_health.update, checked_at=0.0, ok=False)
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def read_alias(self, method='get', uid='u1', write=False):
+        # Passa pelo middleware e devolve o banco escolhido para uma leitura
+        seen = {}
+
+        def view(request):
+            set_current_user(uid)
+            seen['alias'] = self.router.db_for_read(Task)
+            if write:
+                self.router.db_for_write(Task)
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(getattr(self.factory, method)('/api/tasks/'))
+        return seen['alias']
+
+    def test_safe_reads_go_to_replica(self):
+        self.assertEqual(self.read_alias('get'), REPLICA_DB_ALIAS)
+        self.assertEqual(self.read_alias('post'), 'default')
+
+    def test_write_pins_user_to_primary(self):
+        self.read_alias('post', write=True)
+        self.assertEqual(self.read_alias('get'), 'default')
+        self.assertEqual(self.read_alias('get', uid='u2'), REPLICA_DB_ALIAS)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        with mock.patch.object(connections[REPLICA_DB_ALIAS], 'cursor', side_effect=Exception("fora do ar")):
+            self.assertEqual(self.read_alias('get'), 'default')
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=-1)
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.assertEqual(self.read_alias('get'), 'default')
+
+
+@skipUnless(replica_configured(), "DATABASES['replica'] não configurado")
+class ReplicaReadTests(TransactionTestCase):
+    # A réplica é outra conexão: só enxerga dados já confirmados, então aqui
+    # não dá para usar a transação que o TestCase desfaz no final
+    databases = {'default', REPLICA_DB_ALIAS} & set(settings.DATABASES)
+
+    def setUp(self):
+        cache.clear()
+        # Health check em memória: cada teste começa e termina sem ele
+        _health.update(checked_at=0.0, ok=False)
+        self.addCleanup(_health.update, checked_at=0.0, ok=False)
+
+    def test_reads_after_write_see_own_data(self):
+        client = Client(HTTP_AUTHORIZATION=bearer('u1'))
+        created = client.post('/api/workspaces/', {'name': 'w'}, content_type='application/json').json()
+
+        response = client.get(f"/api/workspaces/{created['id']}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['name'], 'w')
+
+
+class AliasedReplicaTests(TransactionTestCase):
+    # Roda sem DB_REPLICA_HOST: "replica" vira uma segunda conexão ao banco
+    # de teste. Os dados são os mesmos, mas as queries de cada alias são
+    # contadas em separado, o que basta para ver o roteamento. O alias entra
+    # só no setUpClass: o runner não pode tentar criar um banco para ele
+    databases = {'default'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.databases = {'default', REPLICA_DB_ALIAS}
+        if not replica_configured():
+            alias = {**connections['default'].settings_dict, 'TEST': {'MIRROR': 'default'}}
+            patcher = mock.patch.dict(settings.DATABASES, {REPLICA_DB_ALIAS: alias})
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+            cls.addClassCleanup(connections.__delitem__, REPLICA_DB_ALIAS)
+            cls.addClassCleanup(lambda: connections[REPLICA_DB_ALIAS].close())
+        super().setUpClass()
+
+    def setUp(self):
+        cache.clear()
+        # Health check em memória: cada teste começa e termina sem ele
+        _health.update(checked_at=0.0, ok=False)
+        self.addCleanup(_health.update, checked_at=0.0, ok=False)
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica:
+            with CaptureQueriesContext(connections['default']) as primary:
+                response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(primary), len(replica)
+
+    def test_writer_is_pinned_to_primary(self):
+        writer = Client(HTTP_AUTHORIZATION=bearer('u1'))
+        created = writer.post('/api/workspaces/', {'name': 'w'}, content_type='application/json').json()
+
+        response, primary, replica = self.get(writer, f"/api/workspaces/{created['id']}/")
+        self.assertEqual(response.json()['name'], 'w')
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        # O acesso aos workspaces sempre vem do primário (load_access); na
+        # segunda leitura ele já está no cache
+        WorkspaceMember.objects.create(workspace_id=created['id'], member_uid='u2')
+        reader = Client(HTTP_AUTHORIZATION=bearer('u2'))
+        reader.get('/api/workspaces/')
+        response, primary, replica = self.get(reader, '/api/workspaces/')
+        self.assertEqual([workspace['id'] for workspace in response.json()], [created['id']])
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_pin_expires(self):
+        writer = Client(HTTP_AUTHORIZATION=bearer('u1'))
+        writer.post('/api/workspaces/', {'name': 'w'}, content_type='application/json')
+        writer.get('/api/workspaces/')
+
+        _, primary, replica = self.get(writer, '/api/workspaces/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+
+# Roda num processo à parte com organiza_me.settings_api: um Router do
+# django-ninja só pode ser ligado a uma NinjaAPI, e este processo já montou
+# a API completa. Só resolve URLs, então não abre conexão com o banco
+API_PROFILE_SCRIPT = """
+import json
+import django
+django.setup()
+from django.apps import apps
+from django.conf import settings
+from django.urls import get_resolver
+
+resolver = get_resolver()
+confs = {pattern.pattern._route: pattern.urlconf_name for pattern in resolver.url_patterns}
+resolved = {}
+first = None
+for path in json.loads(input()):
+    resolved[path] = resolver.resolve(path).url_name
+    if first is None:
+        first = sorted(route for route, conf in confs.items() if conf._urlpatterns is not None)
+print(json.dumps({
+    'resolved': resolved,
+    'built_after_first': first,
+    'admin': apps.is_installed('django.contrib.admin'),
+    'sessions': apps.is_installed('django.contrib.sessions'),
+    'middleware': settings.MIDDLEWARE,
+}))
+"""
+
+
+class ApiProfileTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Um caminho de exemplo por rota da API completa: "tasks/<int:task_id>/" -> "/api/tasks/1/".
+        # /api/docs e o schema OpenAPI só existem no perfil completo
+        full = get_resolver('organiza_me.urls')
+        api_urls = next(pattern for pattern in full.url_patterns if pattern.pattern._route == 'api/')
+        paths = [
+            '/api/' + re.sub(r'<(?:\w+:)?\w+>', '1', pattern.pattern._route)
+            for pattern in api_urls.url_patterns
+            if pattern.name not in ('openapi-json', 'openapi-view')
+        ]
+        cls.expected = {path: full.resolve(path).url_name for path in paths}
+        paths = ['/api/boards/1/'] + paths
+        result = subprocess.run(
+            [sys.executable, '-c', API_PROFILE_SCRIPT],
+            input=json.dumps(paths), capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'organiza_me.settings_api'},
+        )
+        cls.profile = json.loads(result.stdout)
+
+    def test_same_routes_as_full_profile(self):
+        self.assertGreater(len(self.expected), 30)
+        self.assertEqual(self.profile['resolved'], {**self.expected, '/api/boards/1/': 'get_board'})
+
+    def test_router_loads_on_first_request(self):
+        self.assertEqual(self.profile['built_after_first'], ['api/boards/'])
+
+    def test_unused_apps_and_middleware_are_skipped(self):
+        self.assertFalse(self.profile['admin'])
+        self.assertFalse(self.profile['sessions'])
+        # O resto da pilha fica, na mesma ordem
+        self.assertEqual(
+            self.profile['middleware'],
+            [middleware for middleware in settings.MIDDLEWARE if middleware not in settings_api.API_UNUSED_MIDDLEWARE]
+        )
+        self.assertIn('organiza_me.db_router.ReplicaRoutingMiddleware', self.profile['middleware'])
+
+
+class SparseFieldsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        board = Board.objects.create(name='b', workspace=workspace)
+        Task.objects.create(
+            title='t', description='x' * 500, stage=board.stage_set.first(), workspace=workspace
+        )
+        self.client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+
+    def test_subset_of_fields(self):
+        boards = self.client.get('/api/boards/', {'fields': 'name'}).json()
+        self.assertEqual([set(board) for board in boards], [{'id', 'name'}])
+
+        tasks = self.client.get('/api/tasks/', {'fields': 'title,description_snippet,tags'}).json()
+        self.assertEqual(set(tasks[0]), {'id', 'title', 'description_snippet', 'tags'})
+        self.assertEqual(len(tasks[0]['description_snippet']), 140)
+
+    def test_without_fields_returns_every_column(self):
+        boards = self.client.get('/api/boards/').json()
+        self.assertEqual(set(boards[0]), {field.attname for field in Board._meta.concrete_fields})
+
+    def test_unknown_field_is_rejected(self):
+        for url in ('/api/boards/', '/api/tasks/', '/api/boards/stages/'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url, {'fields': 'name,senha'}).status_code, 400)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=1024)
+class CompressionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        self.client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+
+    def boards(self, count, **headers):
+        Board.objects.bulk_create([Board(name=f'quadro {i}', workspace=self.workspace) for i in range(count)])
+        return self.client.get('/api/boards/', **headers)
+
+    def test_large_body_is_gzipped(self):
+        response = self.boards(50, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = gzip.decompress(response.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(len(json.loads(body)), 50)
+
+    def test_small_body_is_not_compressed(self):
+        response = self.boards(1, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertLess(len(response.content), 1024)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(len(response.json()), 1)
+
+    def test_client_without_accept_encoding_gets_plain_body(self):
+        self.boards(50)
+        for headers in ({}, {'HTTP_ACCEPT_ENCODING': 'gzip;q=0'}):
+            with self.subTest(headers=headers):
+                response = self.client.get('/api/boards/', **headers)
+
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertIn('Accept-Encoding', response['Vary'])
+                self.assertEqual(len(response.json()), 50)
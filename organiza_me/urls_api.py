@@ -0,0 +1,9 @@
+from .lazy_api import lazy_router
+from .routers import ROUTERS
+
+# URLconf do perfil só-API (organiza_me.settings_api): sem admin e com cada
+# router carregado no primeiro request do seu prefixo. A documentação
+# interativa (/api/docs) continua disponível apenas no perfil completo.
+urlpatterns = [
+    lazy_router(f"api/{prefix}", router) for prefix, router in ROUTERS
+]
@@ -0,0 +1,16 @@
+"""
+WSGI config for the organiza_me JSON API.
+
+Same as organiza_me.wsgi but with the API-only settings profile
+(organiza_me.settings_api): no session, CSRF, messages or admin machinery
+in the request pipeline. Route /api/ here and keep /admin/ on
+organiza_me.wsgi.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'organiza_me.settings_api')
+
+application = get_wsgi_application()
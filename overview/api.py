@@ -1,52 +1,318 @@
 from ninja import Router, Schema
-from tasks.models import Task
+from ninja.errors import HttpError
+from tasks.models import Task, ArchivedTask
+from tasks.recurrence import occurrences, parse_rule
+from tasks.tagging import filter_by_tags
 from boards.models import Stage, Board
 from workspaces.models import Workspace
+from .models import StageDailyFlow, DailyThroughput
+from workspaces.permissions import workspace_ids
 from datetime import datetime, date, timedelta
 from django.shortcuts import get_object_or_404
 import calendar
-from django.db.models import Q
+import heapq
+import math
+from django.db.models import Q, Sum
 
 router = Router()
 
+# Teto por bucket em cada resposta; o resto vem por next_cursor
+MAX_LIMIT = 200
+MAX_RANGE_DAYS = 366
+# Tarefas modelo lidas por página; acima disso o bucket tasks sai com truncated
+MAX_RECURRING_TEMPLATES = 500
+EXPANSION_CHUNK_DAYS = 31
+BUCKETS = ("tasks", "overdue", "no_due_date")
+METRICS_DEFAULT_DAYS = 30
+PERCENTILES = (50, 85, 95)
+
 @router.get("/")
-def list_overview(request, period: str = "week", ref_date: date = None):
+def list_overview(
+    request,
+    period: str = "week",
+    ref_date: date = None,
+    start: date = None,
+    end: date = None,
+    bucket: str = None,
+    cursor: str = None,
+    limit: int = 100,
+    workspace_id: int = None,
+    board_id: int = None,
+    stage_id: int = None,
+    tags: str = None,
+    tag_mode: str = "any",
+):
+    start_date, end_date = resolve_window(period, ref_date, start, end)
+    if bucket is not None and bucket not in BUCKETS:
+        raise HttpError(400, f"bucket deve ser um de: {', '.join(BUCKETS)}")
+    if cursor is not None and bucket is None:
+        raise HttpError(400, "cursor exige bucket")
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    # workspace_id da própria tarefa: chave de partição (tasks.partitioning)
+    allowed = workspace_ids(request)
+    visible = Task.objects.select_related(
+        'stage',
+        'stage__board',
+        'workspace'
+    ).filter(
+        workspace_id__in=allowed
+    )
+    if workspace_id:
+        visible = visible.filter(workspace_id=workspace_id)
+    if board_id:
+        visible = visible.filter(stage__board_id=board_id)
+    if stage_id:
+        visible = visible.filter(stage_id=stage_id)
+    visible = filter_by_tags(visible, tags, tag_mode, workspaces=allowed)
+
+    loaders = {
+        "tasks": lambda: scheduled_page(visible, start_date, end_date, cursor, limit),
+        "overdue": lambda: overdue_page(visible, cursor, limit),
+        "no_due_date": lambda: undated_page(visible, cursor, limit),
+    }
+    result = {"start": start_date, "end": end_date}
+    for name in ([bucket] if bucket else BUCKETS):
+        result[name] = loaders[name]()
+    return result
+
+def resolve_window(period, ref_date, start, end):
+    if start is not None or end is not None:
+        if start is None or end is None:
+            raise HttpError(400, "Informe start e end juntos")
+        if start > end:
+            raise HttpError(400, "start deve ser anterior a end")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise HttpError(400, f"Intervalo máximo de {MAX_RANGE_DAYS} dias")
+        return start, end
+
     if ref_date is None:
         ref_date = date.today()
 
     if period == "day":
-        start_date = ref_date
-        end_date = ref_date
-    elif period == "week":
+        return ref_date, ref_date
+    if period == "week":
         start_date = ref_date - timedelta(days=ref_date.weekday())
-        end_date = start_date + timedelta(days=6)
-    elif period == "month":
-        start_date = ref_date.replace(day=1)
+        return start_date, start_date + timedelta(days=6)
+    if period == "month":
         last_day = calendar.monthrange(ref_date.year, ref_date.month)[1]
-        end_date = ref_date.replace(day=last_day)
+        return ref_date.replace(day=1), ref_date.replace(day=last_day)
+    raise HttpError(400, "period deve ser day, week ou month")
 
-    tasks = Task.objects.select_related(
-        'stage',
-        'stage__board',
-        'stage__board__workspace'
-    ).filter(
-        stage__board__workspace__owner_uid=request.auth
-    ).filter(
-        Q(due_date__gte=start_date, due_date__lte=end_date) |
-        Q(due_date__isnull=True)
-    ).order_by('stage__position', 'due_date')
+def parse_cursor(cursor, dated=True):
+    # Keyset: "AAAA-MM-DD:id" nos buckets com data, "id" no bucket sem data
+    if cursor is None:
+        return None
+    try:
+        if not dated:
+            return int(cursor)
+        day, task_id = cursor.split(":")
+        return date.fromisoformat(day), int(task_id)
+    except ValueError:
+        raise HttpError(400, "cursor inválido")
+
+def after_cursor(queryset, key):
+    if key is None:
+        return queryset
+    day, task_id = key
+    return queryset.filter(Q(due_date__gt=day) | Q(due_date=day, id__gt=task_id))
+
+def page(items, limit, key):
+    if len(items) <= limit:
+        return {"items": items, "next_cursor": None}
+    items = items[:limit]
+    return {"items": items, "next_cursor": key(items[-1])}
+
+def dated_key(item):
+    return f"{item['due_date'].isoformat()}:{item['id']}"
+
+def scheduled_page(visible, start_date, end_date, cursor, limit):
+    key = parse_cursor(cursor)
+    tasks = list(after_cursor(
+        visible.filter(recurrence_rule='', due_date__gte=start_date, due_date__lte=end_date),
+        key
+    ).order_by('due_date', 'id')[:limit + 1])
+
+    # Com a página cheia de tarefas concretas, ocorrências depois da última
+    # não entram: a expansão para nesse ponto
+    bound = (tasks[-1].due_date, tasks[-1].id) if len(tasks) > limit else None
+    # Séries encerradas antes do período não ocupam vaga no limite de modelos
+    templates = list(visible.exclude(recurrence_rule='').filter(
+        Q(recurrence_end__isnull=True) | Q(recurrence_end__gte=start_date),
+        due_date__lte=end_date
+    ).order_by('id')[:MAX_RECURRING_TEMPLATES + 1])
+    truncated = len(templates) > MAX_RECURRING_TEMPLATES
+
+    items = [overview_item(task, task.due_date) for task in tasks]
+    items.extend(expand_recurring(templates[:MAX_RECURRING_TEMPLATES], start_date, end_date, key, bound, limit))
+    items.sort(key=lambda item: (item['due_date'], item['id']))
+    return {**page(items, limit, dated_key), "truncated": truncated}
+
+def overdue_page(visible, cursor, limit):
+    tasks = after_cursor(
+        visible.filter(recurrence_rule='', due_date__lt=date.today(), stage__is_done=False),
+        parse_cursor(cursor)
+    ).order_by('due_date', 'id')[:limit + 1]
+    return page([overview_item(task, task.due_date) for task in tasks], limit, dated_key)
+
+def undated_page(visible, cursor, limit):
+    tasks = visible.filter(recurrence_rule='', due_date__isnull=True)
+    after_id = parse_cursor(cursor, dated=False)
+    if after_id is not None:
+        tasks = tasks.filter(id__gt=after_id)
+    tasks = tasks.order_by('id')[:limit + 1]
+    return page([overview_item(task, None) for task in tasks], limit, lambda item: str(item['id']))
+
+def overview_item(task, due_date, occurrence=False):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'due_date': due_date,
+        'stage_id': task.stage.id,
+        'stage_name': task.stage.name,
+        'stage_position': task.stage.position,
+        'board_id': task.stage.board.id,
+        'board_name': task.stage.board.name,
+        'workspace_id': task.workspace.id,
+        'workspace_name': task.workspace.name,
+        'is_occurrence': occurrence,
+    }
+
+def template_days(task, start_date, end_date):
+    # Ocorrências de uma tarefa modelo em ordem, calculadas mês a mês: a
+    # página só paga pelos dias que consome, não pela janela inteira
+    rule = parse_rule(task.recurrence_rule)
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(end_date, chunk_start + timedelta(days=EXPANSION_CHUNK_DAYS - 1))
+        for day in occurrences(rule, task.due_date, chunk_start, chunk_end):
+            yield day, task.id, task
+        chunk_start = chunk_end + timedelta(days=1)
+
+def materialized_dates(template_ids, first_day, last_day):
+    # Sem filtro de workspace: uma ocorrência pode ter ido para um quadro de
+    # outro workspace. Com as tabelas particionadas, a busca usa o índice
+    # único (recurrence_parent, recurrence_date, workspace) de cada partição
+    materialized = set()
+    for model in (Task, ArchivedTask):
+        materialized.update(model.objects.filter(
+            recurrence_parent_id__in=template_ids,
+            recurrence_date__gte=first_day,
+            recurrence_date__lte=last_day
+        ).values_list('recurrence_parent_id', 'recurrence_date'))
+    return materialized
+
+def expand_recurring(templates, start_date, end_date, key, bound, limit):
+    # Ocorrências virtuais: nada é gravado. As séries são intercaladas em
+    # ordem (dia, id) a partir do cursor e a geração para em limit + 1 itens
+    # ou na chave bound. Datas que já viraram tarefa concreta (ativa ou
+    # arquivada) são puladas, consultadas lote a lote
+    first_day = max(start_date, key[0]) if key else start_date
+    stream = heapq.merge(
+        *(template_days(task, first_day, end_date) for task in templates),
+        key=lambda occurrence: occurrence[:2]
+    )
 
     result = []
-    for task in tasks:
-        result.append({
-            'id': task.id,
-            'title': task.title,
-            'due_date': task.due_date,
-            'stage_id': task.stage.id,
-            'stage_name': task.stage.name,
-            'board_id': task.stage.board.id,
-            'board_name': task.stage.board.name,
-            'workspace_id': task.stage.board.workspace.id,
-            'workspace_name': task.stage.board.workspace.name,
-        })
-    return result
\ No newline at end of file
+    exhausted = False
+    while not exhausted and len(result) <= limit:
+        batch = []
+        for day, task_id, task in stream:
+            if key is not None and (day, task_id) <= key:
+                continue
+            if bound is not None and (day, task_id) > bound:
+                exhausted = True
+                break
+            batch.append((day, task))
+            if len(batch) > limit:
+                break
+        else:
+            exhausted = True
+        if batch:
+            skip = materialized_dates({task.id for _, task in batch}, batch[0][0], batch[-1][0])
+            result.extend(
+                overview_item(task, day, occurrence=True)
+                for day, task in batch if (task.id, day) not in skip
+            )
+    return result[:limit + 1]
+
+# ===== MÉTRICAS DE FLUXO =====
+# Leem só os rollups diários (overview.flow), nunca o log de transições
+
+def metrics_window(start, end):
+    if end is None:
+        end = date.today()
+    if start is None:
+        start = end - timedelta(days=METRICS_DEFAULT_DAYS - 1)
+    return resolve_window(None, None, start, end)
+
+@router.get("/boards/{board_id}/cfd/")
+def board_cfd(request, board_id: int, start: date = None, end: date = None):
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request))
+    start_date, end_date = metrics_window(start, end)
+    stages = list(Stage.objects.filter(board=board).order_by('position').values('id', 'name', 'is_done'))
+
+    flows = StageDailyFlow.objects.filter(board=board)
+    counts = {stage['id']: 0 for stage in stages}
+    baseline = flows.filter(day__lt=start_date).values('stage_id').annotate(
+        entered=Sum('entered'), exited=Sum('exited')
+    )
+    for row in baseline:
+        if row['stage_id'] in counts:
+            counts[row['stage_id']] = row['entered'] - row['exited']
+
+    deltas = {}
+    for row in flows.filter(day__gte=start_date, day__lte=end_date).values('day', 'stage_id', 'entered', 'exited'):
+        deltas.setdefault(row['day'], []).append(row)
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        for row in deltas.get(day, []):
+            if row['stage_id'] in counts:
+                counts[row['stage_id']] += row['entered'] - row['exited']
+        days.append({"day": day, "stages": dict(counts)})
+        day += timedelta(days=1)
+
+    return {"start": start_date, "end": end_date, "stages": stages, "days": days}
+
+@router.get("/boards/{board_id}/throughput/")
+def board_throughput(request, board_id: int, start: date = None, end: date = None):
+    board = get_object_or_404(Board, id=board_id, workspace_id__in=workspace_ids(request))
+    start_date, end_date = metrics_window(start, end)
+
+    completed = {}
+    histogram = {}
+    rows = DailyThroughput.objects.filter(board=board, day__gte=start_date, day__lte=end_date)
+    for day, cycle_days, count in rows.values_list('day', 'cycle_days', 'count'):
+        completed[day] = completed.get(day, 0) + count
+        histogram[cycle_days] = histogram.get(cycle_days, 0) + count
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        days.append({"day": day, "completed": completed.get(day, 0)})
+        day += timedelta(days=1)
+
+    total = sum(histogram.values())
+    return {
+        "start": start_date,
+        "end": end_date,
+        "completed": total,
+        "days": days,
+        "cycle_time": {
+            "average": round(sum(c * n for c, n in histogram.items()) / total, 2) if total else None,
+            **{f"p{p}": histogram_percentile(histogram, total, p) for p in PERCENTILES},
+        },
+    }
+
+def histogram_percentile(histogram, total, percentile):
+    # Nearest-rank sobre o histograma (cycle_days -> quantidade)
+    if not total:
+        return None
+    rank = math.ceil(percentile / 100 * total)
+    seen = 0
+    for cycle_days in sorted(histogram):
+        seen += histogram[cycle_days]
+        if seen >= rank:
+            return cycle_days
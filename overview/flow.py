@@ -0,0 +1,228 @@
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import F, Min
+from django.utils import timezone
+from boards.models import Stage
+from tasks.models import Task, TaskStageTransition
+from .models import StageDailyFlow, DailyThroughput
+
+# Manutenção das métricas de fluxo. Cada transição grava uma linha no log e
+# soma deltas nos rollups diários; rebuild_flow() recalcula os rollups
+# a partir do log com as mesmas regras (flow_deltas). Arquivar e restaurar
+# também registram transições, para o CFD não divergir.
+
+
+def first_positions(board_ids):
+    # Posição do primeiro estágio de cada quadro: a fila de entrada
+    return dict(
+        Stage.objects.filter(board_id__in=board_ids).values('board_id').annotate(
+            first=Min('position')
+        ).values_list('board_id', 'first')
+    )
+
+
+def in_progress(stage, first_position):
+    # Em andamento: nem concluído nem o primeiro estágio do quadro
+    # ("a_fazer" nos quadros padrão). Entrar num deles inicia o ciclo
+    return not stage.is_done and stage.position > first_position
+
+
+def flow_deltas(transition, stages):
+    # Só usa o que a própria transição guardou; o estágio serve apenas para
+    # achar o quadro. Assim rebuild_flow() bate com os rollups incrementais
+    # mesmo depois de um estágio mudar de is_done.
+    # Concluir = movimento para um estágio is_done vindo de um que não é;
+    # cycle time = da entrada em andamento (started_at) até a conclusão
+    day = timezone.localdate(transition.moved_at)
+    from_stage = stages.get(transition.from_stage_id)
+    to_stage = stages.get(transition.to_stage_id)
+    if from_stage is not None:
+        yield ('stage', from_stage.board_id, from_stage.id, day, 'exited')
+    if to_stage is not None:
+        yield ('stage', to_stage.board_id, to_stage.id, day, 'entered')
+    if transition.kind == TaskStageTransition.MOVE and transition.to_done and not transition.from_done:
+        started_at = transition.started_at or transition.moved_at
+        cycle_days = max((transition.moved_at - started_at).days, 0)
+        yield ('throughput', transition.board_id, day, cycle_days)
+
+
+def apply_deltas(deltas):
+    # Agrupa os deltas iguais: um upsert por linha de rollup
+    stage_counts, throughput_counts = Counter(), Counter()
+    for delta in deltas:
+        if delta[0] == 'stage':
+            stage_counts[delta[1:]] += 1
+        else:
+            throughput_counts[delta[1:]] += 1
+    for (board_id, stage_id, day, field), amount in stage_counts.items():
+        increment(StageDailyFlow, {'board_id': board_id, 'stage_id': stage_id, 'day': day}, field, amount)
+    for (board_id, day, cycle_days), amount in throughput_counts.items():
+        increment(DailyThroughput, {'board_id': board_id, 'day': day, 'cycle_days': cycle_days}, 'count', amount)
+
+
+def record_transition(task, from_stage_id, to_stage_id, moved_at=None, kind=TaskStageTransition.MOVE):
+    if from_stage_id == to_stage_id:
+        return
+    moved_at = moved_at or timezone.now()
+    stages = Stage.objects.in_bulk([stage_id for stage_id in (from_stage_id, to_stage_id) if stage_id])
+    from_stage = stages.get(from_stage_id)
+    to_stage = stages.get(to_stage_id)
+
+    started_at = TaskStageTransition.objects.filter(task_id=task.id).order_by(
+        '-moved_at', '-id'
+    ).values_list('started_at', flat=True).first()
+    if started_at is None and to_stage is not None:
+        if in_progress(to_stage, first_positions([to_stage.board_id])[to_stage.board_id]):
+            started_at = moved_at
+
+    with transaction.atomic():
+        transition = TaskStageTransition.objects.create(
+            task_id=task.id,
+            board_id=(to_stage or from_stage).board_id,
+            from_stage=from_stage,
+            to_stage=to_stage,
+            from_done=from_stage.is_done if from_stage else None,
+            to_done=to_stage.is_done if to_stage else None,
+            kind=kind,
+            task_created_at=task.created_at,
+            started_at=started_at,
+            moved_at=moved_at,
+        )
+        apply_deltas(flow_deltas(transition, stages))
+
+
+def record_bulk_transitions(rows, kind, moved_at=None):
+    # Arquivamento e restauração em lote: rows = (task_id, created_at,
+    # from_stage_id, to_stage_id). Uma linha de log por tarefa e um upsert
+    # por estágio/dia, em vez de record_transition() tarefa a tarefa
+    rows = [row for row in rows if row[2] != row[3]]
+    if not rows:
+        return 0
+    moved_at = moved_at or timezone.now()
+    stages = Stage.objects.in_bulk({stage_id for row in rows for stage_id in row[2:] if stage_id})
+    # started_at, uma vez definido, se repete: o menor não nulo é o atual
+    started = dict(
+        TaskStageTransition.objects.filter(
+            task_id__in=[row[0] for row in rows], started_at__isnull=False
+        ).values('task_id').annotate(first=Min('started_at')).values_list('task_id', 'first')
+    )
+
+    transitions = []
+    for task_id, created_at, from_stage_id, to_stage_id in rows:
+        from_stage, to_stage = stages.get(from_stage_id), stages.get(to_stage_id)
+        if from_stage is None and to_stage is None:
+            continue
+        transitions.append(TaskStageTransition(
+            task_id=task_id,
+            board_id=(to_stage or from_stage).board_id,
+            from_stage=from_stage,
+            to_stage=to_stage,
+            from_done=from_stage.is_done if from_stage else None,
+            to_done=to_stage.is_done if to_stage else None,
+            kind=kind,
+            task_created_at=created_at,
+            started_at=started.get(task_id),
+            moved_at=moved_at,
+        ))
+
+    with transaction.atomic():
+        TaskStageTransition.objects.bulk_create(transitions)
+        apply_deltas(delta for transition in transitions for delta in flow_deltas(transition, stages))
+    return len(transitions)
+
+
+def increment(model, lookup, field, amount=1):
+    # Upsert: tenta o UPDATE; se a linha não existe, cria. Duas transações
+    # criando a mesma linha: a perdedora cai no IntegrityError e refaz o UPDATE
+    if model.objects.filter(**lookup).update(**{field: F(field) + amount}):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **{field: amount})
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**{field: F(field) + amount})
+
+
+def backfill_transitions(board_id=None, chunk_size=2000):
+    # Tarefas anteriores ao log não têm a linha de criação (from_stage nulo).
+    # Registra a entrada no estágio inicial na data de criação: o from_stage
+    # do primeiro movimento logado, ou o estágio atual se nunca se moveu.
+    # Sem histórico anterior, o ciclo conta da criação se já nasceu em andamento
+    tasks = Task.objects.exclude(
+        id__in=TaskStageTransition.objects.filter(from_stage__isnull=True).values('task_id')
+    ).select_related('stage').order_by('id')
+    if board_id:
+        tasks = tasks.filter(stage__board_id=board_id)
+
+    created = 0
+    for chunk in chunked(tasks.iterator(chunk_size=chunk_size), chunk_size):
+        first_moves = {}
+        logged = TaskStageTransition.objects.filter(
+            task_id__in=[task.id for task in chunk]
+        ).order_by('-moved_at', '-id').select_related('from_stage')
+        for transition in logged:
+            first_moves[transition.task_id] = transition.from_stage
+
+        initial = {task.id: first_moves.get(task.id, task.stage) for task in chunk}
+        positions = first_positions({stage.board_id for stage in initial.values() if stage})
+        backfill = []
+        for task in chunk:
+            stage = initial[task.id]
+            if stage is None:
+                continue
+            backfill.append(TaskStageTransition(
+                task_id=task.id,
+                board_id=stage.board_id,
+                to_stage=stage,
+                to_done=stage.is_done,
+                task_created_at=task.created_at,
+                started_at=task.created_at if in_progress(stage, positions[stage.board_id]) else None,
+                moved_at=task.created_at,
+            ))
+        created += len(TaskStageTransition.objects.bulk_create(backfill))
+    return created
+
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def rebuild_flow(board_id=None, chunk_size=2000):
+    transitions = TaskStageTransition.objects.order_by('id')
+    flows = StageDailyFlow.objects.all()
+    throughput = DailyThroughput.objects.all()
+    if board_id:
+        # Movimentos entre quadros aparecem no log do quadro de destino
+        transitions = transitions.filter(board_id=board_id) | transitions.filter(from_stage__board_id=board_id)
+        flows = flows.filter(board_id=board_id)
+        throughput = throughput.filter(board_id=board_id)
+
+    stages = Stage.objects.in_bulk()
+    entered, exited, completed = Counter(), Counter(), Counter()
+    for transition in transitions.iterator(chunk_size=chunk_size):
+        for delta in flow_deltas(transition, stages):
+            if delta[0] == 'throughput':
+                completed[delta[1:]] += 1
+            elif board_id is None or delta[1] == board_id:
+                (entered if delta[4] == 'entered' else exited)[delta[1:4]] += 1
+
+    with transaction.atomic():
+        flows.delete()
+        throughput.delete()
+        StageDailyFlow.objects.bulk_create([
+            StageDailyFlow(board_id=key[0], stage_id=key[1], day=key[2], entered=entered[key], exited=exited[key])
+            for key in entered.keys() | exited.keys()
+        ], batch_size=chunk_size)
+        DailyThroughput.objects.bulk_create([
+            DailyThroughput(board_id=board, day=day, cycle_days=cycle_days, count=count)
+            for (board, day, cycle_days), count in completed.items()
+            if board_id is None or board == board_id
+        ], batch_size=chunk_size)
+    return len(entered.keys() | exited.keys()), len(completed)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from overview.flow import backfill_transitions, rebuild_flow
+
+
+class Command(BaseCommand):
+    help = "Recalcula os rollups de fluxo (CFD, throughput e cycle time) a partir do histórico de estágios"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', type=int, help="Recalcula apenas o quadro informado")
+        parser.add_argument('--backfill', action='store_true', help="Antes, registra a criação das tarefas que ainda não têm histórico")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            count = backfill_transitions(options['board'], chunk_size=options['chunk_size'])
+            self.stdout.write(f"{count} transição(ões) de criação registradas")
+
+        flows, throughput = rebuild_flow(options['board'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{flows} linha(s) de fluxo por estágio e {throughput} de throughput recalculadas"
+        ))
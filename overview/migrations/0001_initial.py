@@ -0,0 +1,48 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('boards', '0003_stage_is_done_archivepolicy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyThroughput',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('cycle_days', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.board')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StageDailyFlow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('entered', models.IntegerField(default=0)),
+                ('exited', models.IntegerField(default=0)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.board')),
+                ('stage', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.stage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', 'day'], name='overview_st_board_i_5a116f_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stagedailyflow',
+            constraint=models.UniqueConstraint(fields=('stage', 'day'), name='unique_stage_daily_flow'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailythroughput',
+            constraint=models.UniqueConstraint(fields=('board', 'day', 'cycle_days'), name='unique_daily_throughput'),
+        ),
+    ]
@@ -1,3 +1,41 @@
 from django.db import models
+from boards.models import Board, Stage
 
 # Create your models here.
+# Rollups diários mantidos incrementalmente por overview.flow a cada
+# transição de estágio (ver tasks.models.TaskStageTransition).
+
+class StageDailyFlow(models.Model):
+    # Entradas e saídas do estágio no dia; a quantidade de tarefas no estágio
+    # em um dia é a soma acumulada de (entered - exited) até ele
+    board = models.ForeignKey(Board, on_delete=models.CASCADE)
+    stage = models.ForeignKey(Stage, on_delete=models.CASCADE)
+    day = models.DateField()
+    entered = models.IntegerField(default=0)
+    exited = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['stage', 'day'], name='unique_stage_daily_flow'),
+        ]
+        indexes = [
+            models.Index(fields=['board', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.stage} {self.day}: +{self.entered} -{self.exited}"
+
+class DailyThroughput(models.Model):
+    # Histograma do cycle time (em dias) das tarefas concluídas no dia
+    board = models.ForeignKey(Board, on_delete=models.CASCADE)
+    day = models.DateField()
+    cycle_days = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'day', 'cycle_days'], name='unique_daily_throughput'),
+        ]
+
+    def __str__(self):
+        return f"{self.board} {self.day}: {self.count} em {self.cycle_days}d"
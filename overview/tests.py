@@ -1,3 +1,152 @@
-from django.test import TestCase
+from datetime import date, datetime, timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.utils import timezone
+from boards.models import ArchivePolicy, Board, Stage
+from organiza_me.bench import bearer
+from tasks.archive import archive_batch, restore_task
+from tasks.models import ArchivedTask, Task, Tag, TaskTag
+from tasks.recurrence import materialize_occurrence, occurrences
+from workspaces.models import Workspace
+from .flow import rebuild_flow, record_transition
+from .models import DailyThroughput, StageDailyFlow
 
 # Create your tests here.
+START = date(2026, 1, 1)
+END = date(2026, 12, 31)
+
+
+class OverviewScheduledTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        board = Board.objects.create(name='b', workspace=self.workspace)
+        self.stage = Stage.objects.create(name='s', board=board)
+
+    def task(self, due_date, **fields):
+        return Task.objects.create(title='t', stage=self.stage, due_date=due_date, workspace=self.workspace, **fields)
+
+    def get(self, **params):
+        params = {'start': START, 'end': END, 'bucket': 'tasks', **params}
+        response = self.client.get('/api/overview/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['tasks']
+
+    def pages(self, limit):
+        keys, cursor = [], None
+        while True:
+            params = {'limit': limit, **({'cursor': cursor} if cursor else {})}
+            bucket = self.get(**params)
+            self.assertLessEqual(len(bucket['items']), limit)
+            keys.extend((item['due_date'], item['id']) for item in bucket['items'])
+            cursor = bucket['next_cursor']
+            if cursor is None:
+                return keys
+
+    def test_keyset_pages_merge_tasks_and_occurrences(self):
+        weekly = self.task(START, recurrence_rule='FREQ=WEEKLY')
+        monthly = self.task(START + timedelta(days=3), recurrence_rule='FREQ=MONTHLY')
+        for day in range(0, 365, 9):
+            self.task(START + timedelta(days=day))
+        materialize_occurrence(weekly, START + timedelta(weeks=2), title='editada')
+
+        keys = self.pages(limit=7)
+
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len([k for k in keys if k[1] == weekly.id]), 52)
+        self.assertEqual(len([k for k in keys if k[1] == monthly.id]), 12)
+        self.assertNotIn(((START + timedelta(weeks=2)).isoformat(), weekly.id), keys)
+
+    def test_page_expands_only_what_it_returns(self):
+        for _ in range(20):
+            self.task(START, recurrence_rule='FREQ=DAILY')
+
+        with mock.patch('overview.api.occurrences', wraps=occurrences) as spy:
+            bucket = self.get(limit=10)
+
+        self.assertEqual(len(bucket['items']), 10)
+        self.assertIsNotNone(bucket['next_cursor'])
+        # Um mês por série, não a janela de um ano inteira
+        self.assertEqual(spy.call_count, 20)
+
+    def test_template_cap_marks_bucket_truncated(self):
+        for _ in range(3):
+            self.task(START, recurrence_rule='FREQ=DAILY')
+        with mock.patch('overview.api.MAX_RECURRING_TEMPLATES', 2):
+            bucket = self.get(limit=10)
+        self.assertTrue(bucket['truncated'])
+        self.assertFalse(self.get(limit=10)['truncated'])
+
+    def test_tag_filter_applies_to_scheduled_bucket(self):
+        tag = Tag.objects.create(name='x', workspace=self.workspace)
+        tagged = self.task(START)
+        self.task(START)
+        TaskTag.objects.create(task=tagged, tag=tag, workspace=self.workspace)
+
+        items = self.get(tags=str(tag.id))['items']
+        self.assertEqual([item['id'] for item in items], [tagged.id])
+
+
+def at(day):
+    return timezone.make_aware(datetime(2026, 3, day, 12))
+
+
+class FlowMetricsTests(TestCase):
+
+    def setUp(self):
+        workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        self.board = Board.objects.create(name='b', workspace=workspace)
+        self.todo = Stage.objects.create(name='todo', board=self.board, position=0)
+        self.doing = Stage.objects.create(name='doing', board=self.board, position=1)
+        self.done = Stage.objects.create(name='done', board=self.board, position=2, is_done=True)
+        self.task = Task.objects.create(title='t', stage=self.todo, workspace=workspace)
+        Task.objects.filter(id=self.task.id).update(created_at=at(1))
+        self.task.refresh_from_db()
+        record_transition(self.task, None, self.todo.id, moved_at=at(1))
+
+    def rollups(self):
+        flows = sorted(StageDailyFlow.objects.values_list('stage_id', 'day', 'entered', 'exited'))
+        throughput = sorted(DailyThroughput.objects.values_list('day', 'cycle_days', 'count'))
+        return flows, throughput
+
+    def in_stage(self, stage):
+        return sum(entered - exited for entered, exited in StageDailyFlow.objects.filter(stage=stage).values_list('entered', 'exited'))
+
+    def test_cycle_time_starts_when_work_starts(self):
+        record_transition(self.task, self.todo.id, self.doing.id, moved_at=at(5))
+        record_transition(self.task, self.doing.id, self.todo.id, moved_at=at(6))
+        record_transition(self.task, self.todo.id, self.done.id, moved_at=at(8))
+
+        # Lead time seria 7 dias; o ciclo começou na primeira entrada em "doing"
+        self.assertEqual(list(DailyThroughput.objects.values_list('cycle_days', 'count')), [(3, 1)])
+
+    def test_rebuild_matches_incremental_after_stage_toggle(self):
+        record_transition(self.task, self.todo.id, self.doing.id, moved_at=at(2))
+        record_transition(self.task, self.doing.id, self.done.id, moved_at=at(4))
+        incremental = self.rollups()
+
+        Stage.objects.filter(id=self.done.id).update(is_done=False)
+        Stage.objects.filter(id=self.doing.id).update(is_done=True)
+        rebuild_flow()
+
+        self.assertEqual(self.rollups(), incremental)
+
+    def test_archive_and_restore_keep_cfd_without_throughput(self):
+        record_transition(self.task, self.todo.id, self.done.id, moved_at=at(3))
+        Task.objects.filter(id=self.task.id).update(stage=self.done, updated_at=at(3))
+        policy = ArchivePolicy.objects.create(board=self.board, days=1)
+
+        self.assertEqual(archive_batch(policy, [self.task.id]), 1)
+        self.assertEqual(self.in_stage(self.done), 0)
+
+        restore_task(ArchivedTask.objects.get(id=self.task.id))
+        self.assertEqual(self.in_stage(self.done), 1)
+        self.assertEqual(DailyThroughput.objects.get().count, 1)
+
+        incremental = self.rollups()
+        rebuild_flow()
+        self.assertEqual(self.rollups(), incremental)
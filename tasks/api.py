@@ -1,10 +1,28 @@
-from ninja import Router, Schema
-from .models import Task, Tag, Subtask, Attachment
+from ninja import Router, Schema, Query
+from .models import Task, Tag, Subtask, Attachment, ArchivedTask
+from .archive import restore_task
+from .recurrence import parse_rule, series_end, is_occurrence, materialize_occurrence
+from .timeline import overlapping, interval_bounds
+from .partitioning import move_to_workspace
+from .tagging import filter_by_tags
+from .storage import FileTooLarge, claim_blob, get_storage, release_unreferenced, thumbnail_key
+from .thumbnails import schedule_thumbnail
+from .downloads import download_response
 from boards.models import Stage
+from overview.flow import record_transition
+from activity.log import record
 from workspaces.models import Workspace
+from workspaces.permissions import workspace_ids, EDITOR
+from organiza_me.sparse import model_fields, select_fields, selected_values, sparse_values, description_snippet
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db import transaction
+from django.http import HttpResponseRedirect
+from django.db.models import Count
+from ninja.errors import HttpError
 from datetime import date
 from typing import Optional
+import mimetypes
 
 router = Router()
 
@@ -37,25 +55,38 @@ class AttachmentUpdate(Schema):
     file_url: Optional[str] = None
     file_name: Optional[str] = None
 
+def record_task_event(request, action, task, object_type, object_id, **payload):
+    # task vem com select_related('stage__board'): o workspace sai sem query extra
+    board = task.stage.board
+    record(request, action, board.workspace_id, object_type, object_id, board_id=board.id, **payload)
+
 # ===== ROTAS ESTÁTICAS PRIMEIRO =====
 
 # Tags (rotas estáticas)
 @router.get("/tags/")
-def list_tags(request, workspace_id: int = None):
-    tags = Tag.objects.filter(workspace__owner_uid=request.auth)
+def list_tags(request, workspace_id: int = None, fields: str = None, with_counts: bool = False):
+    tags = Tag.objects.filter(workspace_id__in=workspace_ids(request))
     if workspace_id:
         tags = tags.filter(workspace_id=workspace_id)
-    return list (tags.values())
+    if not with_counts:
+        return list(sparse_values(tags, fields))
+
+    # Contagem de uso em uma query só: LEFT JOIN em tasks_task_tags + GROUP BY
+    columns = model_fields(Tag)
+    selected = select_fields(fields, columns, columns) + ['task_count']
+    return list(selected_values(tags, selected, {'task_count': Count('tasktag')}))
 
 @router.post("/tags/")
 def create_tag(request, data: TagIn):
-    workspace = get_object_or_404(Workspace, id=data.workspace_id, owner_uid=request.auth)
-    tag = Tag.objects.create(**data.dict())
+    workspace = get_object_or_404(Workspace, id=data.workspace_id, id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        tag = Tag.objects.create(**data.dict())
+        record(request, "tag.created", tag.workspace_id, "tag", tag.id, name=tag.name)
     return {"id": tag.id, "name": tag.name}
 
 @router.get("/tags/{tag_id}/")
 def get_tag(request, tag_id: int):
-    tag = get_object_or_404(Tag, id=tag_id, workspace__owner_uid=request.auth)
+    tag = get_object_or_404(Tag, id=tag_id, workspace_id__in=workspace_ids(request))
     return{
         "id": tag.id,
         "name": tag.name,
@@ -64,37 +95,43 @@ def get_tag(request, tag_id: int):
     }
 @router.put("/tags/{tag_id}/")
 def update_tag(request, tag_id: int, data: TagUpdate):
-    tag = get_object_or_404(Tag, id=tag_id, workspace__owner_uid=request.auth)
+    tag = get_object_or_404(Tag, id=tag_id, workspace_id__in=workspace_ids(request, EDITOR))
     if data.name is not None:
         tag.name = data.name
     if data.color is not None:
         tag.color = data.color
-    tag.save()
+    with transaction.atomic():
+        tag.save()
+        record(request, "tag.updated", tag.workspace_id, "tag", tag.id, fields=sorted(data.dict(exclude_none=True)))
     return{"success": True}
 
 @router.delete("/tags/{tag_id}/")
 def delete_tags(request, tag_id: int):
-    tag = get_object_or_404(Tag, id=tag_id, workspace__owner_uid=request.auth)
-    tag.delete()
+    tag = get_object_or_404(Tag, id=tag_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        tag.delete()
+        record(request, "tag.deleted", tag.workspace_id, "tag", tag_id, name=tag.name)
     return{"success": True}
 
 # Subtasks (rotas estáticas)
 @router.get("/subtasks/")
-def list_subtasks(request, task_id: int = None):
-    subtasks = Subtask.objects.filter(task__stage__board__workspace__owner_uid=request.auth).order_by('position')
+def list_subtasks(request, task_id: int = None, fields: str = None):
+    subtasks = Subtask.objects.filter(workspace_id__in=workspace_ids(request)).order_by('position')
     if task_id:
         subtasks = subtasks.filter(task_id=task_id)
-    return list (subtasks.values())
+    return list(sparse_values(subtasks, fields))
 
 @router.post("/subtasks/")
 def create_subtask(request, data: SubtaskIn):
-    task = get_object_or_404(Task, id=data.task_id, stage__board__workspace__owner_uid=request.auth)
-    subtask = Subtask.objects.create(**data.dict())
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=data.task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        subtask = Subtask.objects.create(**data.dict(), workspace_id=task.workspace_id)
+        record_task_event(request, "subtask.created", task, "subtask", subtask.id, title=subtask.title)
     return {"id": subtask.id, "title": subtask.title}
 
 @router.get("/subtasks/{subtask_id}/")
 def get_subtask(request, subtask_id: int):
-    subtask = get_object_or_404(Subtask, id=subtask_id, task__stage__board__workspace__owner_uid=request.auth)
+    subtask = get_object_or_404(Subtask, id=subtask_id, workspace_id__in=workspace_ids(request))
     return{
         "id": subtask.id,
         "title": subtask.title,
@@ -105,62 +142,261 @@ def get_subtask(request, subtask_id: int):
 
 @router.put("/subtasks/{subtask_id}/")
 def update_subtask(request, subtask_id: int, data: SubtaskUpdate):
-    subtask = get_object_or_404(Subtask, id=subtask_id, task__stage__board__workspace__owner_uid=request.auth)
+    subtask = get_object_or_404(Subtask.objects.select_related('task__stage__board'), id=subtask_id, workspace_id__in=workspace_ids(request, EDITOR))
     if data.title is not None:
         subtask.title = data.title
     if data.is_completed is not None:
         subtask.is_completed = data.is_completed
     if data.position is not None:
         subtask.position = data.position
-    subtask.save()
+    with transaction.atomic():
+        subtask.save()
+        record_task_event(request, "subtask.updated", subtask.task, "subtask", subtask.id, fields=sorted(data.dict(exclude_none=True)))
     return{"success": True}
 
 @router.delete("/subtasks/{subtask_id}/")
 def delete_subtask(request, subtask_id: int):
-    subtask = get_object_or_404(Subtask, id=subtask_id, task__stage__board__workspace__owner_uid=request.auth)
-    subtask.delete()
+    subtask = get_object_or_404(Subtask.objects.select_related('task__stage__board'), id=subtask_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        subtask.delete()
+        record_task_event(request, "subtask.deleted", subtask.task, "subtask", subtask_id, title=subtask.title)
     return{"success": True}
 
 # Attachments (rotas estáticas)
 @router.get("/attachments/")
-def list_attachments(request, task_id: int = None):
-    attachments = Attachment.objects.filter(task__stage__board__workspace__owner_uid=request.auth)
+def list_attachments(request, task_id: int = None, fields: str = None):
+    attachments = Attachment.objects.filter(task__workspace_id__in=workspace_ids(request))
     if task_id:
         attachments = attachments.filter(task_id=task_id)
-    return list (attachments.values())
+    return list(sparse_values(attachments, fields))
 
 @router.post("/attachments/")
 def create_attachment(request, data: AttachmentIn):
-    task = get_object_or_404(Task, id=data.task_id, stage__board__workspace__owner_uid=request.auth)
-    attachment = Attachment.objects.create(**data.dict())
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=data.task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        attachment = Attachment.objects.create(**data.dict())
+        record_task_event(request, "attachment.created", task, "attachment", attachment.id, file_name=attachment.file_name)
     return {"id": attachment.id, "file_name": attachment.file_name}
 
+@router.post("/attachments/upload/")
+def upload_attachment(request, task_id: int, file_name: str):
+    # Corpo bruto (não multipart), lido em chunks direto para o storage
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    if request.content_type.startswith('multipart/'):
+        raise HttpError(400, "Envie o arquivo como corpo da requisição, não multipart")
+    if int(request.META.get('CONTENT_LENGTH') or 0) > settings.ATTACHMENT_MAX_SIZE:
+        raise HttpError(413, "Arquivo muito grande")
+
+    content_type = request.content_type
+    if not content_type or content_type == 'application/octet-stream':
+        content_type = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+    chunks = iter(lambda: request.read(settings.ATTACHMENT_CHUNK_SIZE), b'')
+    try:
+        sha256, size, created = get_storage().save_stream(chunks, max_size=settings.ATTACHMENT_MAX_SIZE)
+    except FileTooLarge:
+        raise HttpError(413, "Arquivo muito grande")
+    if size == 0:
+        # Nenhum anexo aponta para o arquivo vazio que acabou de ser gravado
+        if created:
+            get_storage().delete(sha256)
+        raise HttpError(400, "Arquivo vazio")
+
+    with transaction.atomic():
+        if not claim_blob(sha256, size):
+            raise HttpError(409, "O arquivo foi removido durante o envio; envie novamente")
+        attachment = Attachment.objects.create(
+            task=task,
+            file_name=file_name[:100],
+            sha256=sha256,
+            size=size,
+            content_type=content_type,
+        )
+        transaction.on_commit(lambda: schedule_thumbnail(sha256, content_type))
+        record_task_event(request, "attachment.created", task, "attachment", attachment.id, file_name=attachment.file_name, size=size)
+    return {
+        "id": attachment.id,
+        "file_name": attachment.file_name,
+        "sha256": sha256,
+        "size": size,
+        "content_type": content_type,
+        "deduplicated": not created,
+    }
+
 @router.get("/attachments/{attachment_id}/")
 def get_attachment(request, attachment_id: int):
-    attachment = get_object_or_404(Attachment, id=attachment_id, task__stage__board__workspace__owner_uid=request.auth)
+    attachment = get_object_or_404(Attachment, id=attachment_id, task__workspace_id__in=workspace_ids(request))
     return{
         "id": attachment.id,
         "file_url": attachment.file_url,
         "file_name": attachment.file_name,
-        "task_id": attachment.task_id
+        "task_id": attachment.task_id,
+        "sha256": attachment.sha256,
+        "size": attachment.size,
+        "content_type": attachment.content_type
     }
 
+@router.get("/attachments/{attachment_id}/download/")
+def download_attachment(request, attachment_id: int):
+    attachment = get_object_or_404(Attachment, id=attachment_id, task__workspace_id__in=workspace_ids(request))
+    if not attachment.sha256:
+        if not attachment.file_url:
+            raise HttpError(404, "Anexo sem arquivo")
+        return HttpResponseRedirect(attachment.file_url)
+    storage = get_storage()
+    if not storage.exists(attachment.sha256):
+        raise HttpError(404, "Arquivo não encontrado no storage")
+    return download_response(storage, attachment.sha256, attachment.file_name, attachment.content_type, request.META.get('HTTP_RANGE'))
+
+@router.get("/attachments/{attachment_id}/thumbnail/")
+def attachment_thumbnail(request, attachment_id: int):
+    attachment = get_object_or_404(Attachment, id=attachment_id, task__workspace_id__in=workspace_ids(request))
+    storage = get_storage()
+    key = thumbnail_key(attachment.sha256)
+    if not attachment.sha256 or not storage.exists(key):
+        raise HttpError(404, "Miniatura indisponível")
+    return download_response(storage, key, f"thumb-{attachment.file_name}", 'image/jpeg', request.META.get('HTTP_RANGE'))
+
 @router.put("/attachments/{attachment_id}/")
 def update_attachment(request, attachment_id: int, data: AttachmentUpdate):
-    attachment = get_object_or_404(Attachment, id=attachment_id, task__stage__board__workspace__owner_uid=request.auth)
+    attachment = get_object_or_404(Attachment.objects.select_related('task__stage__board'), id=attachment_id, task__workspace_id__in=workspace_ids(request, EDITOR))
     if data.file_url is not None:
         attachment.file_url = data.file_url
     if data.file_name is not None:
         attachment.file_name = data.file_name
-    attachment.save()
+    with transaction.atomic():
+        attachment.save()
+        record_task_event(request, "attachment.updated", attachment.task, "attachment", attachment.id, fields=sorted(data.dict(exclude_none=True)))
     return{"success": True}
 
 @router.delete("/attachments/{attachment_id}/")
 def delete_attachment(request, attachment_id: int):
-    attachment = get_object_or_404(Attachment, id=attachment_id, task__stage__board__workspace__owner_uid=request.auth)
-    attachment.delete()
+    attachment = get_object_or_404(Attachment.objects.select_related('task__stage__board'), id=attachment_id, task__workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        attachment.delete()
+        record_task_event(request, "attachment.deleted", attachment.task, "attachment", attachment_id, file_name=attachment.file_name)
+        transaction.on_commit(lambda: release_unreferenced([attachment.sha256]))
     return{"success": True}
 
+# Arquivo (rotas estáticas)
+ARCHIVED_MAX_LIMIT = 100
+
+@router.get("/archived/")
+def list_archived_tasks(
+    request, board_id: int = None, q: str = None, tags: str = None, tag_mode: str = "any",
+    limit: int = 50, offset: int = 0
+):
+    if not 1 <= limit <= ARCHIVED_MAX_LIMIT:
+        raise HttpError(400, f"limit deve estar entre 1 e {ARCHIVED_MAX_LIMIT}")
+    if offset < 0:
+        raise HttpError(400, "offset não pode ser negativo")
+    archived = ArchivedTask.objects.filter(stage__board__workspace_id__in=workspace_ids(request)).order_by('-archived_at')
+    if board_id:
+        archived = archived.filter(stage__board_id=board_id)
+    if q:
+        archived = archived.filter(title__icontains=q)
+    archived = filter_by_tags(archived, tags, tag_mode, through=ArchivedTask.tags.through, through_task='archivedtask_id')
+    return list(archived.values(
+        'id', 'title', 'stage_id', 'start_date', 'due_date', 'created_at', 'archived_at'
+    )[offset:offset + limit])
+
+@router.get("/archived/{task_id}/")
+def get_archived_task(request, task_id: int):
+    archived = get_object_or_404(ArchivedTask, id=task_id, stage__board__workspace_id__in=workspace_ids(request))
+    return {
+        "id": archived.id,
+        "title": archived.title,
+        "description": archived.description,
+        "stage_id": archived.stage_id,
+        "position": archived.position,
+        "start_date": archived.start_date,
+        "due_date": archived.due_date,
+        "created_at": archived.created_at,
+        "archived_at": archived.archived_at,
+        "tags": list(archived.tags.values("id", "name", "color")),
+        "subtasks": list(archived.archivedsubtask_set.order_by('position').values()),
+        "attachments": list(archived.archivedattachment_set.values())
+    }
+
+@router.post("/archived/{task_id}/restore/")
+def restore_archived_task(request, task_id: int):
+    archived = get_object_or_404(ArchivedTask.objects.select_related('stage__board'), id=task_id, stage__board__workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        task = restore_task(archived)
+        record(request, "task.restored", archived.stage.board.workspace_id, "task", task.id, board_id=archived.stage.board_id, title=task.title)
+    return {"id": task.id, "title": task.title}
+
+# Timeline (Gantt): tarefas cujo intervalo [start_date, due_date] cruza a janela
+TIMELINE_MAX_DAYS = 366
+TIMELINE_MAX_TASKS = 2000
+
+@router.get("/timeline/")
+def timeline(
+    request,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    workspace_id: int = None,
+    board_id: int = None,
+    tags: str = None,
+    tag_mode: str = "any",
+    limit: int = TIMELINE_MAX_TASKS,
+):
+    if date_from > date_to:
+        raise HttpError(400, "from deve ser anterior a to")
+    if (date_to - date_from).days >= TIMELINE_MAX_DAYS:
+        raise HttpError(400, f"Intervalo máximo de {TIMELINE_MAX_DAYS} dias")
+    limit = max(1, min(limit, TIMELINE_MAX_TASKS))
+
+    visible = workspace_ids(request)
+    tasks = Task.objects.filter(workspace_id__in=visible)
+    if workspace_id:
+        tasks = tasks.filter(workspace_id=workspace_id)
+    if board_id:
+        tasks = tasks.filter(stage__board_id=board_id)
+    tasks = filter_by_tags(tasks, tags, tag_mode, workspaces=visible)
+    rows = list(overlapping(tasks, date_from, date_to).values(
+        'id', 'title', 'start_date', 'due_date', 'position', 'recurrence_rule',
+        'stage_id', 'stage__name', 'stage__position', 'stage__is_done',
+        'stage__board_id', 'stage__board__name', 'workspace_id',
+    ).order_by('stage__board_id', 'stage__position', 'stage_id', 'id')[:limit + 1])
+
+    boards = {}
+    for row in rows[:limit]:
+        board = boards.setdefault(row['stage__board_id'], {
+            "id": row['stage__board_id'],
+            "name": row['stage__board__name'],
+            "workspace_id": row['workspace_id'],
+            "stages": {},
+        })
+        stage = board["stages"].setdefault(row['stage_id'], {
+            "id": row['stage_id'],
+            "name": row['stage__name'],
+            "position": row['stage__position'],
+            "is_done": row['stage__is_done'],
+            "tasks": [],
+        })
+        start, end = interval_bounds(row['start_date'], row['due_date'])
+        stage["tasks"].append({
+            "id": row['id'],
+            "title": row['title'],
+            "start_date": row['start_date'],
+            "due_date": row['due_date'],
+            "start": start,
+            "end": end,
+            "position": row['position'],
+            "is_recurring": bool(row['recurrence_rule']),
+        })
+
+    for board in boards.values():
+        board["stages"] = list(board["stages"].values())
+        for stage in board["stages"]:
+            stage["tasks"].sort(key=lambda task: (task["start"], task["id"]))
+    return {
+        "from": date_from,
+        "to": date_to,
+        "truncated": len(rows) > limit,
+        "boards": list(boards.values()),
+    }
+
 # ===== ROTAS DINÂMICAS DEPOIS =====
 
 class TaskIn(Schema):
@@ -170,6 +406,7 @@ class TaskIn(Schema):
     position: int = 0
     start_date: Optional[date] = None
     due_date: Optional[date] = None
+    recurrence_rule: str = ""
 
 class TaskUpdate(Schema):
     title: Optional[str] = None
@@ -178,38 +415,75 @@ class TaskUpdate(Schema):
     position: Optional[int] = None
     start_date: Optional[date] = None
     due_date: Optional[date] = None
+    recurrence_rule: Optional[str] = None
+
+class OccurrenceIn(Schema):
+    occurrence_date: date
+    title: Optional[str] = None
+    description: Optional[str] = None
+    stage_id: Optional[int] = None
+    position: Optional[int] = None
+    due_date: Optional[date] = None
+
+def validate_recurrence(rule, due_date):
+    # Devolve o recurrence_end a gravar junto com a regra
+    if not rule:
+        return None
+    try:
+        parsed = parse_rule(rule)
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    if due_date is None:
+        raise HttpError(400, "Tarefas recorrentes precisam de due_date")
+    return series_end(parsed, due_date)
+
+# Campos padrão da listagem; ?fields= escolhe um subconjunto (o Kanban não
+# precisa de description, só de description_snippet)
+TASK_LIST_FIELDS = [
+    'id', 'title', 'description', 'stage_id', 'position', 'start_date', 'due_date',
+    'created_at', 'recurrence_rule', 'recurrence_parent_id', 'recurrence_date', 'tags',
+]
+TASK_COMPUTED_FIELDS = {'description_snippet': description_snippet()}
 
 @router.get("/")
-def list_tasks(request, stage_id: int = None):
-    tasks = Task.objects.filter(stage__board__workspace__owner_uid=request.auth).order_by('position')
+def list_tasks(request, stage_id: int = None, fields: str = None, tags: str = None, tag_mode: str = "any"):
+    visible = workspace_ids(request)
+    tasks = Task.objects.filter(workspace_id__in=visible).order_by('position')
     if stage_id:
         tasks = tasks.filter(stage_id=stage_id)
-    
-    result = []
-    for task in tasks:
-        task_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "stage_id": task.stage_id,
-            "position": task.position,
-            "start_date": task.start_date,
-            "due_date": task.due_date,
-            "created_at": task.created_at,
-            "tags": list(task.tags.values("id", "name", "color"))
-        }
-        result.append(task_data)
+    tasks = filter_by_tags(tasks, tags, tag_mode, workspaces=visible)
+
+    allowed = model_fields(Task) + list(TASK_COMPUTED_FIELDS) + ['tags']
+    selected = select_fields(fields, allowed, TASK_LIST_FIELDS)
+    result = list(selected_values(tasks, selected, TASK_COMPUTED_FIELDS))
+
+    if 'tags' in selected and result:
+        # Uma query para as tags de todas as tarefas da página
+        tags_by_task = {task['id']: [] for task in result}
+        links = Task.tags.through.objects.filter(workspace_id__in=visible, task_id__in=tags_by_task).values(
+            'task_id', 'tag__id', 'tag__name', 'tag__color'
+        ).order_by('tag__id')
+        for link in links:
+            tags_by_task[link['task_id']].append(
+                {"id": link['tag__id'], "name": link['tag__name'], "color": link['tag__color']}
+            )
+        for task in result:
+            task["tags"] = tags_by_task[task['id']]
     return result
 
 @router.post("/")
 def create_task(request, data: TaskIn):
-    stage = get_object_or_404(Stage, id=data.stage_id, board__workspace__owner_uid=request.auth)
-    task = Task.objects.create(**data.dict())
+    stage = get_object_or_404(Stage.objects.select_related('board'), id=data.stage_id, board__workspace_id__in=workspace_ids(request, EDITOR))
+    recurrence_end = validate_recurrence(data.recurrence_rule, data.due_date)
+    with transaction.atomic():
+        task = Task.objects.create(**data.dict(), workspace_id=stage.board.workspace_id, recurrence_end=recurrence_end)
+        record_transition(task, None, task.stage_id)
+        record(request, "task.created", stage.board.workspace_id, "task", task.id, board_id=stage.board_id, title=task.title)
     return {"id": task.id, "title": task.title}
 
 @router.get("/{task_id}/")
 def get_task(request, task_id: int):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
+    task = get_object_or_404(Task, id=task_id, workspace_id__in=workspace_ids(request))
     return{
         "id": task.id,
         "title": task.title,
@@ -217,49 +491,69 @@ def get_task(request, task_id: int):
         "stage_id": task.stage_id,
         "position": task.position,
         "start_date": task.start_date,
-        "due_date": task.due_date
+        "due_date": task.due_date,
+        "recurrence_rule": task.recurrence_rule,
+        "recurrence_parent_id": task.recurrence_parent_id,
+        "recurrence_date": task.recurrence_date
     }
 @router.put("/{task_id}/")
 def update_task(request, task_id: int, data: TaskUpdate):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    previous_stage_id = task.stage_id
     if data.title is not None:
         task.title = data.title
     if data.description is not None:
         task.description = data.description
     if data.stage_id is not None:
-        task.stage_id = data.stage_id
+        task.stage = get_object_or_404(Stage.objects.select_related('board'), id=data.stage_id, board__workspace_id__in=workspace_ids(request, EDITOR))
     if data.position is not None:
         task.position = data.position
     if data.start_date is not None:
         task.start_date = data.start_date
     if data.due_date is not None:
         task.due_date = data.due_date
-    task.save()
+    if data.recurrence_rule is not None:
+        task.recurrence_rule = data.recurrence_rule
+    task.recurrence_end = validate_recurrence(task.recurrence_rule, task.due_date)
+    with transaction.atomic():
+        move_to_workspace(task, task.stage.board.workspace_id)
+        task.save()
+        record_transition(task, previous_stage_id, task.stage_id)
+        record_task_event(request, "task.updated", task, "task", task.id, fields=sorted(data.dict(exclude_none=True)))
     return{"success": True}
 
 @router.delete("/{task_id}/")
 def delete_tasks(request, task_id: int):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
-    task.delete()
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    stored_files = list(task.attachment_set.exclude(sha256='').values_list('sha256', flat=True))
+    with transaction.atomic():
+        record_transition(task, task.stage_id, None)
+        task.delete()
+        record_task_event(request, "task.deleted", task, "task", task_id, title=task.title)
+        transaction.on_commit(lambda: release_unreferenced(stored_files))
     return{"success": True}
 
 @router.get("/{task_id}/tags/")
 def list_task_tags(request, task_id: int):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
+    task = get_object_or_404(Task, id=task_id, workspace_id__in=workspace_ids(request))
     return list(task.tags.values())
 
 @router.post("/{task_id}/tags/{tag_id}/")
 def add_tag_to_task(request, task_id: int, tag_id: int):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
-    tag = get_object_or_404(Tag, id=tag_id, workspace__owner_uid=request.auth)
-    task.tags.add(tag)
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    tag = get_object_or_404(Tag, id=tag_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        task.tags.add(tag, through_defaults={'workspace_id': task.workspace_id})
+        record_task_event(request, "task.tag_added", task, "task", task.id, tag_id=tag.id, tag=tag.name)
     return {"success": True, "message": "Tag adicionada"}
 
 @router.delete("/{task_id}/tags/{tag_id}/")
 def remove_tag_from_task(request, task_id: int, tag_id:int):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
-    tag = get_object_or_404(Tag, id=tag_id, workspace__owner_uid=request.auth)
-    task.tags.remove(tag)
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    tag = get_object_or_404(Tag, id=tag_id, workspace_id__in=workspace_ids(request, EDITOR))
+    with transaction.atomic():
+        task.tags.remove(tag)
+        record_task_event(request, "task.tag_removed", task, "task", task.id, tag_id=tag.id, tag=tag.name)
     return {"success": True, "message": "Tag removida"}
 
 class MoveTaskIn(Schema):
@@ -268,9 +562,27 @@ class MoveTaskIn(Schema):
 
 @router.patch("/{task_id}/move/")
 def move_task(request, task_id: int, data: MoveTaskIn):
-    task = get_object_or_404(Task, id=task_id, stage__board__workspace__owner_uid=request.auth)
-    new_stage = get_object_or_404(Stage, id=data.stage_id, board__workspace__owner_uid=request.auth)
-    task.stage_id = data.stage_id
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    new_stage = get_object_or_404(Stage.objects.select_related('board'), id=data.stage_id, board__workspace_id__in=workspace_ids(request, EDITOR))
+    previous_stage_id = task.stage_id
+    task.stage = new_stage
     task.position = data.position
-    task.save()
-    return {"success": True}
\ No newline at end of file
+    with transaction.atomic():
+        move_to_workspace(task, new_stage.board.workspace_id)
+        task.save()
+        record_transition(task, previous_stage_id, new_stage.id)
+        record_task_event(request, "task.moved", task, "task", task.id, from_stage_id=previous_stage_id, to_stage_id=new_stage.id, position=data.position)
+    return {"success": True}
+
+@router.post("/{task_id}/occurrences/")
+def materialize_task_occurrence(request, task_id: int, data: OccurrenceIn):
+    task = get_object_or_404(Task.objects.select_related('stage__board'), id=task_id, workspace_id__in=workspace_ids(request, EDITOR))
+    if not task.recurrence_rule or not is_occurrence(task.recurrence_rule, task.due_date, data.occurrence_date):
+        raise HttpError(400, "Data não corresponde a uma ocorrência da tarefa")
+    if data.stage_id is not None:
+        get_object_or_404(Stage, id=data.stage_id, board__workspace_id__in=workspace_ids(request, EDITOR))
+    changes = data.dict(exclude={'occurrence_date'})
+    with transaction.atomic():
+        occurrence = materialize_occurrence(task, data.occurrence_date, **changes)
+        record_task_event(request, "task.occurrence_materialized", task, "task", occurrence.id, occurrence_date=data.occurrence_date)
+    return {"id": occurrence.id, "title": occurrence.title}
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from .models import Task, Subtask, Attachment, ArchivedTask, ArchivedSubtask, ArchivedAttachment, TaskStageTransition
+
+TASK_FIELDS = (
+    'id', 'title', 'description', 'stage_id', 'position', 'start_date', 'due_date',
+    'created_at', 'updated_at', 'recurrence_parent_id', 'recurrence_date'
+)
+SUBTASK_FIELDS = ('id', 'title', 'task_id', 'is_completed', 'position')
+ATTACHMENT_FIELDS = ('id', 'file_url', 'file_name', 'task_id', 'uploaded_at', 'sha256', 'size', 'content_type')
+
+
+def archive_candidates(policy):
+    # Usa o índice (stage, updated_at) da tabela quente. Tarefas modelo de
+    # recorrência ficam na tabela quente para continuar gerando ocorrências
+    cutoff = timezone.now() - timedelta(days=policy.days)
+    return Task.objects.filter(
+        workspace_id=policy.board.workspace_id,
+        stage__board_id=policy.board_id,
+        stage__is_done=True,
+        updated_at__lt=cutoff,
+        recurrence_rule=''
+    )
+
+
+def archive_batch(policy, task_ids):
+    from overview.flow import record_bulk_transitions
+
+    with transaction.atomic():
+        # Revalida a política dentro do lock: a tarefa pode ter sido editada
+        # entre a seleção dos ids e o início do lote
+        tasks = list(
+            archive_candidates(policy)
+            .select_for_update(of=('self',))
+            .filter(id__in=task_ids)
+            .values(*TASK_FIELDS)
+        )
+        ids = [task['id'] for task in tasks]
+        if not ids:
+            return 0
+        # Filtrar pela chave de partição limita cada leitura às partições do workspace
+        workspace_id = policy.board.workspace_id
+
+        ArchivedTask.objects.bulk_create([ArchivedTask(**task) for task in tasks])
+        ArchivedSubtask.objects.bulk_create([
+            ArchivedSubtask(**subtask)
+            for subtask in Subtask.objects.filter(workspace_id=workspace_id, task_id__in=ids).values(*SUBTASK_FIELDS)
+        ])
+        ArchivedAttachment.objects.bulk_create([
+            ArchivedAttachment(**attachment)
+            for attachment in Attachment.objects.filter(task_id__in=ids).values(*ATTACHMENT_FIELDS)
+        ])
+        ArchivedTagLink = ArchivedTask.tags.through
+        ArchivedTagLink.objects.bulk_create([
+            ArchivedTagLink(archivedtask_id=link['task_id'], tag_id=link['tag_id'])
+            for link in Task.tags.through.objects.filter(workspace_id=workspace_id, task_id__in=ids).values('task_id', 'tag_id')
+        ])
+
+        # Saída do estágio no CFD; não conta como conclusão
+        record_bulk_transitions(
+            [(task['id'], task['created_at'], task['stage_id'], None) for task in tasks],
+            TaskStageTransition.ARCHIVE
+        )
+        Task.objects.filter(workspace_id=workspace_id, id__in=ids).delete()
+    return len(ids)
+
+
+def archive_policy(policy, batch_size=500):
+    total = 0
+    while True:
+        ids = list(archive_candidates(policy).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        archived = archive_batch(policy, ids)
+        total += archived
+        if archived == 0:
+            # Todos os candidatos do lote mudaram no meio do caminho
+            break
+    return total
+
+
+def restore_task(archived):
+    from overview.flow import record_bulk_transitions
+
+    parent_id = archived.recurrence_parent_id
+    if parent_id and not Task.objects.filter(id=parent_id).exists():
+        parent_id = None
+
+    with transaction.atomic():
+        task = Task.objects.create(
+            id=archived.id,
+            title=archived.title,
+            description=archived.description,
+            stage_id=archived.stage_id,
+            position=archived.position,
+            start_date=archived.start_date,
+            due_date=archived.due_date,
+            recurrence_parent_id=parent_id,
+            recurrence_date=archived.recurrence_date,
+            workspace_id=archived.stage.board.workspace_id,
+        )
+        # auto_now_add sobrescreve created_at no insert; updated_at fica "agora"
+        # para a tarefa não voltar ao arquivo na próxima execução
+        Task.objects.filter(id=task.id).update(created_at=archived.created_at)
+
+        Subtask.objects.bulk_create([
+            Subtask(**subtask, workspace_id=task.workspace_id)
+            for subtask in archived.archivedsubtask_set.values(*SUBTASK_FIELDS)
+        ])
+        attachments = list(archived.archivedattachment_set.values(*ATTACHMENT_FIELDS))
+        Attachment.objects.bulk_create([Attachment(**attachment) for attachment in attachments])
+        for attachment in attachments:
+            Attachment.objects.filter(id=attachment['id']).update(uploaded_at=attachment['uploaded_at'])
+        task.tags.set(archived.tags.all(), through_defaults={'workspace_id': task.workspace_id})
+        record_bulk_transitions([(task.id, archived.created_at, None, task.stage_id)], TaskStageTransition.RESTORE)
+
+        archived.delete()
+    return task
@@ -0,0 +1,65 @@
+import re
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+# Respostas de download dos anexos. Arquivo inteiro: FileResponse, que o
+# servidor WSGI entrega com wsgi.file_wrapper (sendfile, sem copiar para o
+# Python). Range: 206 com o trecho lido em chunks.
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    # Só um intervalo por requisição; múltiplos ou malformados caem no
+    # arquivo inteiro (permitido pela RFC 9110). Fora do arquivo -> inválido
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        length = int(end)
+        if length == 0:
+            raise ValueError("Range vazio")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range fora do arquivo")
+    return start, end
+
+
+def read_range(file, start, end):
+    try:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def download_response(storage, key, file_name, content_type, range_header=None):
+    size = storage.size(key)
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(storage.open(key), content_type=content_type or None, filename=file_name)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(read_range(storage.open(key), start, end), status=206, content_type=content_type or 'application/octet-stream')
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Disposition'] = content_disposition_header(False, file_name)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = f'"{key}"'
+    return response
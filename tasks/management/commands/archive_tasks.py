@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from boards.models import ArchivePolicy
+from tasks.archive import archive_candidates, archive_policy
+
+
+class Command(BaseCommand):
+    help = "Move tarefas concluídas e paradas para as tabelas de arquivo, seguindo a política de cada quadro"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--board', type=int, help="Processa apenas o quadro informado")
+        parser.add_argument('--dry-run', action='store_true', help="Apenas conta as tarefas que seriam arquivadas")
+
+    def handle(self, *args, **options):
+        policies = ArchivePolicy.objects.filter(is_active=True).select_related('board')
+        if options['board']:
+            policies = policies.filter(board_id=options['board'])
+
+        total = 0
+        for policy in policies:
+            if options['dry_run']:
+                count = archive_candidates(policy).count()
+            else:
+                count = archive_policy(policy, batch_size=options['batch_size'])
+            total += count
+            self.stdout.write(f"{policy.board.name}: {count} tarefa(s)")
+
+        verb = "seriam arquivadas" if options['dry_run'] else "arquivadas"
+        self.stdout.write(self.style.SUCCESS(f"{total} tarefa(s) {verb}"))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from tasks.partitioning import TABLES, is_partitioned, partition_names, partition_tables, supported
+
+
+class Command(BaseCommand):
+    help = "Converte tarefas, subtarefas e vínculos de tag em tabelas particionadas por HASH(workspace_id) (só Postgres)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partitions', type=int, default=16, help="Número de partições de cada tabela")
+        parser.add_argument('--status', action='store_true', help="Só mostra o estado atual das tabelas")
+
+    def handle(self, *args, **options):
+        if not supported():
+            raise CommandError("Particionamento só existe no Postgres")
+
+        if options['status']:
+            for table in TABLES:
+                if is_partitioned(table):
+                    self.stdout.write(f"{table}: {len(partition_names(table))} partição(ões)")
+                else:
+                    self.stdout.write(f"{table}: não particionada")
+            return
+
+        if options['partitions'] < 2:
+            raise CommandError("--partitions deve ser pelo menos 2")
+
+        converted = partition_tables(options['partitions'])
+        for table, dropped in converted.items():
+            self.stdout.write(f"{table}: {options['partitions']} partição(ões)")
+            for name in dropped:
+                self.stdout.write(f"  FK removida: {name}")
+        if not converted:
+            self.stdout.write("Nada a fazer: as tabelas já estão particionadas")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(converted)} tabela(s) particionada(s)"))
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.27 on 2026-10-19 13:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_stage_is_done_archivepolicy'),
+        ('tasks', '0002_tag_subtask_attachment_task_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttachment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('file_url', models.URLField()),
+                ('file_name', models.CharField(max_length=100)),
+                ('uploaded_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubtask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('is_completed', models.BooleanField(default=False)),
+                ('position', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('position', models.IntegerField(default=0)),
+                ('start_date', models.DateField(blank=True, null=True)),
+                ('due_date', models.DateField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['stage', 'updated_at'], name='tasks_task_stage_i_9d9df7_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='stage',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.stage'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='archived_tasks', to='tasks.tag'),
+        ),
+        migrations.AddField(
+            model_name='archivedsubtask',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.archivedtask'),
+        ),
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.archivedtask'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['stage', '-archived_at'], name='tasks_archi_stage_i_f69847_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['due_date'], name='tasks_task_due_dat_bce847_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_stage_is_done_archivepolicy'),
+        ('tasks', '0005_task_tasks_task_due_dat_bce847_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStageTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('task_created_at', models.DateTimeField()),
+                ('moved_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='boards.board')),
+                ('from_stage', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='boards.stage')),
+                ('to_stage', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='boards.stage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', 'moved_at'], name='tasks_tasks_board_i_2c3317_idx'), models.Index(fields=['task_id', 'moved_at'], name='tasks_tasks_task_id_e86357_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+# Índice GiST de intervalo só existe no Postgres; nos outros bancos a
+# timeline usa os índices B-tree de start_date e due_date.
+# A expressão precisa ser idêntica à de tasks.timeline.task_interval()
+INTERVAL_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS tasks_task_interval_gist ON tasks_task
+    USING gist (daterange(LEAST(start_date, due_date), GREATEST(start_date, due_date), '[]'))
+    WHERE (start_date IS NOT NULL OR due_date IS NOT NULL)
+"""
+
+
+def create_interval_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(INTERVAL_INDEX_SQL)
+
+
+def drop_interval_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS tasks_task_interval_gist")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_taskstagetransition'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['start_date'], name='tasks_task_start_d_eb2c37_idx'),
+        ),
+        migrations.RunPython(create_interval_index, drop_interval_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_interval_indexes'),
+    ]
+
+    operations = [
+        # O through explícito reaproveita a tabela do M2M automático
+        # (tasks_task_tags): só o estado muda, nada é recriado no banco
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='TaskTag',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.tag')),
+                        ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tasks.task')),
+                    ],
+                    options={
+                        'db_table': 'tasks_task_tags',
+                        'unique_together': {('task', 'tag')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='task',
+                    name='tags',
+                    field=models.ManyToManyField(blank=True, through='tasks.TaskTag', to='tasks.tag'),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tasktag',
+            index=models.Index(fields=['tag', 'task'], name='tasks_task__tag_id_397b41_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_tag_through'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='content_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='archivedattachment',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='content_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedattachment',
+            name='file_url',
+            field=models.URLField(blank=True, default=''),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file_url',
+            field=models.URLField(blank=True, default=''),
+        ),
+    ]
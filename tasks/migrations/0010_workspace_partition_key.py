@@ -0,0 +1,49 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+
+def backfill_workspace(apps, schema_editor):
+    # Um UPDATE por tabela com subselect correlacionado; subtarefas e tags
+    # copiam da tarefa, que já está preenchida
+    Stage = apps.get_model('boards', 'Stage')
+    Task = apps.get_model('tasks', 'Task')
+    Subtask = apps.get_model('tasks', 'Subtask')
+    TaskTag = apps.get_model('tasks', 'TaskTag')
+
+    Task.objects.update(workspace_id=Subquery(
+        Stage.objects.filter(id=OuterRef('stage_id')).values('board__workspace_id')[:1]
+    ))
+    task_workspace = Subquery(Task.objects.filter(id=OuterRef('task_id')).values('workspace_id')[:1])
+    Subtask.objects.update(workspace_id=task_workspace)
+    TaskTag.objects.update(workspace_id=task_workspace)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('boards', '0003_stage_is_done_archivepolicy'),
+        ('workspaces', '0002_alter_workspace_owner_uid_workspacemember_and_more'),
+        ('tasks', '0009_attachment_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspaces.workspace'),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspaces.workspace'),
+        ),
+        migrations.AddField(
+            model_name='tasktag',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspaces.workspace'),
+        ),
+        migrations.RunPython(backfill_workspace, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_workspace_partition_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='workspace',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspaces.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='subtask',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspaces.workspace'),
+        ),
+        migrations.AlterField(
+            model_name='tasktag',
+            name='workspace',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='workspaces.workspace'),
+        ),
+        migrations.RemoveIndex(
+            model_name='tasktag',
+            name='tasks_task__tag_id_397b41_idx',
+        ),
+        migrations.AddIndex(
+            model_name='tasktag',
+            index=models.Index(fields=['tag', 'task', 'workspace'], name='tasks_task__tag_id_dfb3d6_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_alter_workspace_not_null'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='recurrence_parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='occurrences', to='tasks.task'),
+        ),
+    ]
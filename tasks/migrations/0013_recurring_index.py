@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_recurrence_parent_set_null'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('recurrence_rule', ''), _negated=True), fields=['due_date'], name='tasks_recurring_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:43
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def snapshot_existing(apps, schema_editor):
+    # Linhas antigas: is_done atual dos estágios (o melhor que há) e início do
+    # ciclo na criação da tarefa, que é como os rollups já existentes contaram
+    Stage = apps.get_model('boards', 'Stage')
+    TaskStageTransition = apps.get_model('tasks', 'TaskStageTransition')
+
+    def is_done(field):
+        return Subquery(Stage.objects.filter(id=OuterRef(field)).values('is_done')[:1])
+
+    TaskStageTransition.objects.update(
+        from_done=is_done('from_stage_id'),
+        to_done=is_done('to_stage_id'),
+        started_at=F('task_created_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_recurring_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstagetransition',
+            name='from_done',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskstagetransition',
+            name='kind',
+            field=models.CharField(choices=[('move', 'Movimento'), ('archive', 'Arquivamento'), ('restore', 'Restauração')], default='move', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='taskstagetransition',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskstagetransition',
+            name='to_done',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.RunPython(snapshot_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:47
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def register_existing(apps, schema_editor):
+    # Arquivos já enviados ganham a linha que a coleta trava antes de apagar
+    StoredBlob = apps.get_model('tasks', 'StoredBlob')
+    sizes = {}
+    for model in ('Attachment', 'ArchivedAttachment'):
+        rows = apps.get_model('tasks', model).objects.exclude(sha256='').values('sha256').annotate(size=Max('size'))
+        for row in rows.iterator():
+            sizes[row['sha256']] = row['size'] or 0
+    StoredBlob.objects.bulk_create(
+        [StoredBlob(sha256=key, size=size) for key, size in sizes.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_transition_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(register_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+def fill_recurrence_end(apps, schema_editor):
+    # Séries já gravadas; regra inválida fica sem fim (sempre varrida)
+    from tasks.recurrence import series_end
+
+    Task = apps.get_model('tasks', 'Task')
+    templates = Task.objects.exclude(recurrence_rule='').filter(due_date__isnull=False)
+    ended = []
+    for task in templates.only('id', 'recurrence_rule', 'due_date').iterator(chunk_size=1000):
+        try:
+            task.recurrence_end = series_end(task.recurrence_rule, task.due_date)
+        except ValueError:
+            continue
+        if task.recurrence_end is not None:
+            ended.append(task)
+    Task.objects.bulk_update(ended, ['recurrence_end'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_stored_blobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_end',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_recurrence_end, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-19 15:13
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_task_recurrence_end'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tasktag',
+            name='tag',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='tasks.tag'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
-from boards.models import Stage
+from django.utils import timezone
+from boards.models import Board, Stage
 from workspaces.models import Workspace
 # Create your models here.
 class Task(models.Model):
@@ -10,7 +11,34 @@ class Task(models.Model):
     start_date = models.DateField(blank=True, null=True)
     due_date = models.DateField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    tags = models.ManyToManyField('Tag', blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    tags = models.ManyToManyField('Tag', blank=True, through='TaskTag')
+    # Regra de recorrência (ver tasks.recurrence); ocorrências concluídas ou
+    # editadas viram tarefas concretas apontando para a tarefa modelo. Apagar
+    # o modelo só desvincula as ocorrências: elas mantêm recurrence_date
+    recurrence_rule = models.CharField(max_length=200, blank=True, default='')
+    recurrence_parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='occurrences')
+    recurrence_date = models.DateField(blank=True, null=True)
+    # Limite da última ocorrência do modelo (tasks.recurrence.series_end),
+    # gravado junto com a regra; nulo quando a série não tem fim. Deixa as
+    # varreduras pularem no banco as séries já encerradas
+    recurrence_end = models.DateField(blank=True, null=True)
+    # Cópia de stage.board.workspace: chave de partição (tasks.partitioning)
+    # e filtro de acesso sem join até boards_board
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['stage', 'updated_at']),
+            models.Index(fields=['due_date']),
+            models.Index(fields=['start_date']),
+            # Só as tarefas modelo de recorrência, que a varredura por
+            # due_date não alcança (a âncora pode ser antiga)
+            models.Index(fields=['due_date'], condition=~models.Q(recurrence_rule=''), name='tasks_recurring_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['recurrence_parent', 'recurrence_date'], name='unique_task_occurrence'),
+        ]
 
     def __str__(self):
         return self.title
@@ -23,20 +51,143 @@ class Tag(models.Model):
     def __str__(self):
         return self.name
 
+class TaskTag(models.Model):
+    # Mesma tabela do M2M automático (tasks_task_tags); o índice (tag, task,
+    # workspace) atende os filtros por tag sem tocar em tasks_task. Ele começa
+    # por tag_id, então a FK não tem índice próprio: com os dois, o planner
+    # escolhia o de tag_id e ia até a tabela buscar task_id e workspace_id
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, db_index=False)
+    # Só chave de partição: sem índice próprio, vai no fim do índice (tag, task)
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='+', db_index=False)
+
+    class Meta:
+        db_table = 'tasks_task_tags'
+        unique_together = [('task', 'tag')]
+        indexes = [
+            models.Index(fields=['tag', 'task', 'workspace']),
+        ]
+
 class Subtask(models.Model):
     title = models.CharField(max_length=100)
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
     is_completed = models.BooleanField(default=False)
     position = models.IntegerField(default=0)
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='+', db_index=False)
 
     def __str__(self):
         return self.title
 
 class Attachment(models.Model):
-    file_url = models.URLField(max_length=200)
+    # file_url: anexo hospedado fora; sha256: arquivo enviado para a API
+    # (tasks.storage), baixado por /attachments/{id}/download/
+    file_url = models.URLField(max_length=200, blank=True, default='')
     file_name = models.CharField(max_length=100)
     task = models.ForeignKey(Task, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    size = models.BigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True, default='')
+
+    def __str__(self):
+        return self.file_name
+
+class StoredBlob(models.Model):
+    # Uma linha por arquivo no storage (tasks.storage). O lock nesta linha
+    # serializa o upload que reaproveita um arquivo e a coleta que o apaga
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+# ===== HISTÓRICO DE ESTÁGIOS =====
+# Log append-only: uma linha por entrada/saída de estágio. task_id não é FK
+# para o histórico sobreviver à exclusão e ao arquivamento da tarefa.
+# As métricas leem os rollups de overview.models, nunca este log. Cada linha
+# guarda o que as métricas usam (is_done dos dois lados, início do ciclo),
+# então recalcular os rollups não depende do estado atual dos estágios.
+
+class TaskStageTransition(models.Model):
+    MOVE = 'move'
+    ARCHIVE = 'archive'
+    RESTORE = 'restore'
+    KIND_CHOICES = [
+        (MOVE, 'Movimento'),
+        (ARCHIVE, 'Arquivamento'),
+        (RESTORE, 'Restauração'),
+    ]
+
+    task_id = models.BigIntegerField()
+    board = models.ForeignKey(Board, on_delete=models.CASCADE)
+    from_stage = models.ForeignKey(Stage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    to_stage = models.ForeignKey(Stage, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    from_done = models.BooleanField(null=True, blank=True)
+    to_done = models.BooleanField(null=True, blank=True)
+    # Arquivar/restaurar mexe no CFD, mas não conta como conclusão
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=MOVE)
+    task_created_at = models.DateTimeField()
+    # Primeira entrada num estágio em andamento (ver overview.flow); nulo
+    # enquanto a tarefa não começou. Repetido nas linhas seguintes da tarefa
+    started_at = models.DateTimeField(null=True, blank=True)
+    moved_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['board', 'moved_at']),
+            models.Index(fields=['task_id', 'moved_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.from_stage_id} -> {self.to_stage_id}"
+
+# ===== ARQUIVO (tabelas frias) =====
+# Tarefas arquivadas mantêm o mesmo id da tabela quente para que a restauração
+# não quebre links já compartilhados.
+
+class ArchivedTask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=100)
+    description = models.TextField(null=True, blank=True)
+    stage = models.ForeignKey(Stage, on_delete=models.CASCADE)
+    position = models.IntegerField(default=0)
+    start_date = models.DateField(blank=True, null=True)
+    due_date = models.DateField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    recurrence_parent_id = models.BigIntegerField(blank=True, null=True)
+    recurrence_date = models.DateField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    tags = models.ManyToManyField(Tag, blank=True, related_name='archived_tasks')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['stage', '-archived_at']),
+        ]
+
+    def __str__(self):
+        return self.title
+
+class ArchivedSubtask(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=100)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE)
+    is_completed = models.BooleanField(default=False)
+    position = models.IntegerField(default=0)
+
+    def __str__(self):
+        return self.title
+
+class ArchivedAttachment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    file_url = models.URLField(max_length=200, blank=True, default='')
+    file_name = models.CharField(max_length=100)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE)
+    uploaded_at = models.DateTimeField()
+    sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    size = models.BigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True, default='')
 
     def __str__(self):
-        return self.file_name
\ No newline at end of file
+        return self.file_name
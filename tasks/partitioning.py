@@ -0,0 +1,185 @@
+import re
+from django.db import connection, transaction
+from .models import Task, Subtask, TaskTag
+
+# Particionamento declarativo (Postgres) de tasks_task, tasks_subtask e
+# tasks_task_tags por HASH (workspace_id). Com workspace_id em toda consulta
+# o planner descarta as partições dos outros workspaces: vacuum, índices e
+# cache de um workspace grande deixam de pesar nos pequenos.
+#
+# A conversão é opcional (manage.py partition_tasks) e tem custos:
+# - a PK vira (id, workspace_id) e todo UNIQUE ganha workspace_id no fim;
+# - o Postgres não aceita FK apontando para tabela particionada sem a chave
+#   de partição, então as FKs que referenciam tasks_task (subtarefas, anexos,
+#   tags, notificações, recorrência) são removidas. O CASCADE dessas relações
+#   já é feito pelo ORM do Django, não pelo banco;
+# - migrações futuras nessas tabelas não podem criar UNIQUE sem workspace_id.
+
+PARTITION_KEY = 'workspace_id'
+TABLES = [Task._meta.db_table, Subtask._meta.db_table, TaskTag._meta.db_table]
+
+
+def move_to_workspace(task, workspace_id):
+    # Tarefa movida para um quadro de outro workspace leva junto as subtarefas
+    # e os vínculos de tag, que carregam a mesma chave de partição
+    if task.workspace_id == workspace_id:
+        return
+    previous = task.workspace_id
+    task.workspace_id = workspace_id
+    Subtask.objects.filter(workspace_id=previous, task_id=task.id).update(workspace_id=workspace_id)
+    TaskTag.objects.filter(workspace_id=previous, task_id=task.id).update(workspace_id=workspace_id)
+
+
+def supported():
+    return connection.vendor == 'postgresql'
+
+
+def is_partitioned(table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+
+def partition_names(table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(%s) ORDER BY 1",
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def with_partition_key(columns):
+    # "(a, b)" -> "(a, b, workspace_id)": UNIQUE em tabela particionada
+    # precisa conter a chave de partição. No fim, o índice continua servindo
+    # às buscas por (a, b) que não filtram workspace. Se a chave já é uma
+    # das colunas, fica como está
+    depth = 0
+    start = None
+    for position, char in enumerate(columns):
+        if char == '(':
+            depth += 1
+            if depth == 1:
+                start = position + 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                names = [part.split(' ')[0].strip('"') for part in top_level(columns[start:position])]
+                if PARTITION_KEY in names:
+                    return columns
+                return f"{columns[:position]}, {PARTITION_KEY}{columns[position:]}"
+    return columns
+
+
+def top_level(columns):
+    # "a, lower(b, c), d" -> ['a', 'lower(b, c)', 'd']
+    parts, depth, current = [], 0, ''
+    for char in columns:
+        if char == ',' and depth == 0:
+            parts.append(current.strip())
+            current = ''
+            continue
+        depth += (char == '(') - (char == ')')
+        current += char
+    parts.append(current.strip())
+    return parts
+
+
+def table_definition(cursor, table, partitioned):
+    cursor.execute("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'", [table])
+    primary_key = cursor.fetchone()[0]
+
+    cursor.execute(
+        """
+        SELECT conname, contype, pg_get_constraintdef(oid), confrelid::regclass::text
+        FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype IN ('u', 'f')
+        """,
+        [table],
+    )
+    constraints = []
+    for name, kind, definition, referenced in cursor.fetchall():
+        if kind == 'u':
+            constraints.append((name, with_partition_key(definition)))
+        elif referenced not in partitioned:
+            constraints.append((name, definition))
+
+    # Índices avulsos (os que sustentam PK/UNIQUE são recriados pelas constraints)
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(i.indexrelid), i.indisunique FROM pg_index i
+        WHERE i.indrelid = to_regclass(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        """,
+        [table],
+    )
+    indexes = []
+    for definition, unique in cursor.fetchall():
+        definition = re.sub(r' ON \S+ USING ', f" ON {table} USING ", definition, count=1)
+        if unique:
+            head, columns = definition.split(' USING ', 1)
+            method, columns = columns.split(' ', 1)
+            definition = f"{head} USING {method} {with_partition_key(columns)}"
+        indexes.append(definition)
+
+    cursor.execute(
+        "SELECT conname FROM pg_constraint WHERE confrelid = to_regclass(%s) AND conrelid <> confrelid",
+        [table],
+    )
+    dropped = [row[0] for row in cursor.fetchall()]
+    return primary_key, constraints, indexes, dropped
+
+
+def partition_table(table, partitions, partitioned=()):
+    # Renomeia a tabela, cria a particionada com as mesmas colunas, copia as
+    # linhas e recria PK, UNIQUE, FKs e índices. Tudo numa transação (um
+    # savepoint dentro da de partition_tables): se algo falhar, a tabela
+    # original volta intacta
+    old = f"{table}_unpartitioned"
+    sequence = f"{table}_id_seq"
+    with transaction.atomic(), connection.cursor() as cursor:
+        # FKs adiadas com checagem pendente impedem o ALTER TABLE
+        cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+        primary_key, constraints, indexes, dropped = table_definition(cursor, table, {table, *partitioned})
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+            f"PARTITION BY HASH ({PARTITION_KEY})"
+        )
+        for remainder in range(partitions):
+            cursor.execute(
+                f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+                f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+            )
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {old}")
+        max_id = cursor.fetchone()[0]
+        # Leva junto a sequência de identidade e as FKs que apontavam para ela
+        cursor.execute(f"DROP TABLE {old} CASCADE")
+
+        # Identidade não é suportada em tabela particionada: sequência própria
+        cursor.execute(f"CREATE SEQUENCE {sequence} OWNED BY {table}.id")
+        cursor.execute("SELECT setval(%s, %s, %s)", [sequence, max(max_id, 1), max_id > 0])
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {primary_key} PRIMARY KEY (id, {PARTITION_KEY})")
+        for name, definition in constraints:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        for definition in indexes:
+            cursor.execute(definition)
+        cursor.execute(f"ANALYZE {table}")
+    return dropped
+
+
+def partition_tables(partitions=16):
+    # tasks_task primeiro: as FKs das outras duas para ela caem junto.
+    # Uma transação para as três: se a segunda falhar, a primeira volta e as
+    # FKs removidas com ela não ficam faltando (DDL é transacional no Postgres)
+    converted = {}
+    with transaction.atomic():
+        done = {table for table in TABLES if is_partitioned(table)}
+        for table in TABLES:
+            if table in done:
+                continue
+            converted[table] = partition_table(table, partitions, done)
+            done.add(table)
+    return converted
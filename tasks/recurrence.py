@@ -0,0 +1,199 @@
+import calendar
+from datetime import date, datetime, timedelta
+from django.db import transaction
+
+# Subconjunto de RRULE (RFC 5545) aceito em Task.recurrence_rule:
+#   FREQ=DAILY|WEEKLY|MONTHLY, INTERVAL=n, BYDAY=MO,WE (semanal),
+#   BYMONTHDAY=n (mensal), UNTIL=AAAAMMDD, COUNT=n
+# Também aceita os atalhos "daily", "weekly" e "monthly".
+# A âncora da série é o due_date da tarefa modelo.
+
+WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+SHORTCUTS = {
+    'daily': 'FREQ=DAILY',
+    'weekly': 'FREQ=WEEKLY',
+    'monthly': 'FREQ=MONTHLY',
+}
+
+
+def parse_rule(rule):
+    rule = SHORTCUTS.get(rule.strip().lower(), rule.strip())
+    if rule.upper().startswith('RRULE:'):
+        rule = rule[6:]
+
+    parts = {}
+    for part in rule.split(';'):
+        if not part:
+            continue
+        key, sep, value = part.partition('=')
+        if not sep:
+            raise ValueError(f"Parte inválida na regra: {part}")
+        parts[key.strip().upper()] = value.strip().upper()
+
+    freq = parts.pop('FREQ', None)
+    if freq not in ('DAILY', 'WEEKLY', 'MONTHLY'):
+        raise ValueError("FREQ deve ser DAILY, WEEKLY ou MONTHLY")
+
+    parsed = {'freq': freq, 'interval': 1, 'byday': None, 'bymonthday': None, 'until': None, 'count': None}
+    try:
+        if 'INTERVAL' in parts:
+            parsed['interval'] = int(parts.pop('INTERVAL'))
+        if 'COUNT' in parts:
+            parsed['count'] = int(parts.pop('COUNT'))
+        if 'UNTIL' in parts:
+            parsed['until'] = datetime.strptime(parts.pop('UNTIL')[:8], '%Y%m%d').date()
+        if 'BYMONTHDAY' in parts:
+            parsed['bymonthday'] = int(parts.pop('BYMONTHDAY'))
+        if 'BYDAY' in parts:
+            parsed['byday'] = sorted({WEEKDAYS.index(day) for day in parts.pop('BYDAY').split(',')})
+    except ValueError:
+        raise ValueError("Valor inválido na regra de recorrência")
+
+    if parts:
+        raise ValueError(f"Parâmetros não suportados: {', '.join(sorted(parts))}")
+    if parsed['interval'] < 1 or (parsed['count'] is not None and parsed['count'] < 1):
+        raise ValueError("INTERVAL e COUNT devem ser positivos")
+    if parsed['byday'] and freq != 'WEEKLY':
+        raise ValueError("BYDAY só é suportado com FREQ=WEEKLY")
+    if parsed['bymonthday'] and (freq != 'MONTHLY' or not 1 <= parsed['bymonthday'] <= 31):
+        raise ValueError("BYMONTHDAY só é suportado com FREQ=MONTHLY (1 a 31)")
+    return parsed
+
+
+def occurrences(rule, anchor, start, end):
+    # Calcula direto o primeiro período que cai na janela, então o custo
+    # depende do tamanho da janela e não do tamanho da série
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    if rule['until'] is not None:
+        end = min(end, rule['until'])
+    start = max(start, anchor)
+    if start > end:
+        return []
+
+    if rule['freq'] == 'DAILY':
+        dates = _daily(rule, anchor, start, end)
+    elif rule['freq'] == 'WEEKLY':
+        dates = _weekly(rule, anchor, start, end)
+    else:
+        dates = _monthly(rule, anchor, start, end)
+
+    count = rule['count']
+    return [day for ordinal, day in dates if count is None or ordinal < count]
+
+
+def series_end(rule, anchor):
+    # Limite superior para a última ocorrência (UNTIL/COUNT); None se a série
+    # não tem fim. Com COUNT a conta é por cima: cada período rende ao menos
+    # uma data, e um mês nunca passa de 31 dias
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    ends = []
+    if rule['until'] is not None:
+        ends.append(rule['until'])
+    if rule['count'] is not None:
+        periods = rule['count'] * rule['interval']
+        days = {'DAILY': 1, 'WEEKLY': 7, 'MONTHLY': 31}[rule['freq']]
+        ends.append(anchor + timedelta(days=periods * days))
+    return min(ends) if ends else None
+
+
+def is_occurrence(rule, anchor, day):
+    return day in occurrences(rule, anchor, day, day)
+
+
+def _daily(rule, anchor, start, end):
+    interval = rule['interval']
+    period = -(-(start - anchor).days // interval)
+    day = anchor + timedelta(days=period * interval)
+    while day <= end:
+        yield period, day
+        period += 1
+        day += timedelta(days=interval)
+
+
+def _weekly(rule, anchor, start, end):
+    interval = rule['interval']
+    weekdays = rule['byday'] or [anchor.weekday()]
+    anchor_week = anchor - timedelta(days=anchor.weekday())
+    first_week = [wd for wd in weekdays if wd >= anchor.weekday()]
+
+    period = ((start - anchor_week).days // 7) // interval
+    week = anchor_week + timedelta(weeks=period * interval)
+    while week <= end:
+        for position, weekday in enumerate(weekdays):
+            day = week + timedelta(days=weekday)
+            if day < start or day > end:
+                continue
+            if period == 0:
+                ordinal = first_week.index(weekday)
+            else:
+                ordinal = len(first_week) + (period - 1) * len(weekdays) + position
+            yield ordinal, day
+        period += 1
+        week += timedelta(weeks=interval)
+
+
+def _monthly(rule, anchor, start, end):
+    # Meses sem o dia pedido (ex.: 31) usam o último dia do mês
+    interval = rule['interval']
+    monthday = rule['bymonthday'] or anchor.day
+
+    # Se o dia pedido cai antes da âncora, o primeiro mês não conta para COUNT
+    skipped = 1 if min(monthday, calendar.monthrange(anchor.year, anchor.month)[1]) < anchor.day else 0
+
+    months = (start.year - anchor.year) * 12 + start.month - anchor.month
+    period = max(0, months // interval)
+    while True:
+        index = anchor.month - 1 + period * interval
+        year, month = anchor.year + index // 12, index % 12 + 1
+        day = date(year, month, min(monthday, calendar.monthrange(year, month)[1]))
+        if day > end:
+            break
+        if day >= start:
+            yield period - skipped, day
+        period += 1
+
+
+def materialize_occurrence(task, occurrence_date, **changes):
+    # Cria a tarefa concreta de uma ocorrência (ao concluir ou editar);
+    # a tarefa modelo continua gerando as demais ocorrências
+    from .models import Task, Subtask
+    from .partitioning import move_to_workspace
+    from boards.models import Stage
+    from overview.flow import record_transition
+
+    with transaction.atomic():
+        occurrence, created = Task.objects.get_or_create(
+            recurrence_parent=task,
+            recurrence_date=occurrence_date,
+            defaults={
+                'title': task.title,
+                'description': task.description,
+                'stage_id': task.stage_id,
+                'position': task.position,
+                'due_date': occurrence_date,
+                'workspace_id': task.workspace_id,
+            }
+        )
+        previous_stage_id = None if created else occurrence.stage_id
+        for field, value in changes.items():
+            if value is not None:
+                setattr(occurrence, field, value)
+        if occurrence.stage_id != previous_stage_id:
+            # O estágio escolhido pode ser de um quadro de outro workspace
+            if occurrence.stage_id == task.stage_id:
+                workspace_id = task.workspace_id
+            else:
+                workspace_id = Stage.objects.filter(id=occurrence.stage_id).values_list('board__workspace_id', flat=True).get()
+            move_to_workspace(occurrence, workspace_id)
+        occurrence.save()
+        record_transition(occurrence, previous_stage_id, occurrence.stage_id)
+
+        if created:
+            occurrence.tags.set(task.tags.all(), through_defaults={'workspace_id': occurrence.workspace_id})
+            Subtask.objects.bulk_create([
+                Subtask(task=occurrence, title=subtask.title, position=subtask.position, workspace_id=occurrence.workspace_id)
+                for subtask in task.subtask_set.all()
+            ])
+    return occurrence
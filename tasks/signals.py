@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from boards.models import Stage
+from .models import Attachment, ArchivedAttachment
+from .storage import release_unreferenced
+
+@receiver(pre_delete, sender=Stage)
+def release_stage_files(sender, instance, **kwargs):
+    # Excluir estágio, quadro ou workspace apaga os anexos em cascata, sem
+    # passar pela API. Os estágios recebem o sinal em todas essas cascatas;
+    # os arquivos só são liberados depois do commit
+    keys = set(Attachment.objects.filter(task__stage=instance).exclude(sha256='').values_list('sha256', flat=True))
+    keys.update(ArchivedAttachment.objects.filter(task__stage=instance).exclude(sha256='').values_list('sha256', flat=True))
+    if keys:
+        transaction.on_commit(lambda: release_unreferenced(keys))
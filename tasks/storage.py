@@ -0,0 +1,143 @@
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Armazenamento dos anexos enviados pela API, endereçado por conteúdo:
+# a chave de cada arquivo é o SHA-256 dos bytes, então o mesmo arquivo
+# enviado duas vezes ocupa espaço uma vez só.
+#
+# O backend é plugável (settings.ATTACHMENT_STORAGE). LocalStorage guarda
+# em disco e expõe path(), usado para downloads zero-copy e miniaturas.
+#
+# Coleta: cada arquivo tem uma linha em StoredBlob. O upload trava a linha
+# (claim_blob) na transação que cria o anexo; release_unreferenced() trava
+# as mesmas linhas antes de conferir as referências. Assim a coleta nunca
+# apaga um arquivo que um upload em andamento acabou de reaproveitar.
+
+
+class StorageError(Exception):
+    pass
+
+
+class FileTooLarge(StorageError):
+    pass
+
+
+class BaseStorage:
+    def save_stream(self, chunks, max_size=None):
+        # Consome os chunks sem juntar o arquivo em memória.
+        # Retorna (sha256, tamanho, criado); criado=False quando já existia
+        raise NotImplementedError
+
+    def open(self, key):
+        raise NotImplementedError
+
+    def size(self, key):
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def path(self, key):
+        # Caminho local, quando o backend tem um; None nos remotos
+        return None
+
+
+class LocalStorage(BaseStorage):
+    def __init__(self, root=None):
+        self.root = Path(root or settings.ATTACHMENT_ROOT)
+
+    def path(self, key):
+        # Dois níveis de diretório para não concentrar milhões de arquivos num só
+        return self.root / key[:2] / key[2:4] / key
+
+    def save_stream(self, chunks, max_size=None):
+        tmp_dir = self.root / 'tmp'
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLarge(f"Arquivo maior que {max_size} bytes")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            key = digest.hexdigest()
+            target = self.path(key)
+            if target.exists():
+                return key, size, False
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # os.replace é atômico: dois uploads iguais em paralelo gravam o mesmo conteúdo
+            os.replace(tmp_path, target)
+            return key, size, True
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def open(self, key):
+        return open(self.path(key), 'rb')
+
+    def size(self, key):
+        return self.path(key).stat().st_size
+
+    def exists(self, key):
+        return self.path(key).exists()
+
+    def delete(self, key):
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+
+@lru_cache(maxsize=None)
+def get_storage():
+    return import_string(settings.ATTACHMENT_STORAGE)()
+
+
+def thumbnail_key(sha256):
+    # Fica no mesmo diretório do original
+    return f"{sha256}.thumb"
+
+
+def claim_blob(key, size):
+    # Chamado dentro da transação que cria o anexo, depois de save_stream().
+    # Segura o lock até o commit; False se a coleta apagou o arquivo entre
+    # o save_stream() e o lock (o upload precisa ser refeito)
+    from .models import StoredBlob
+
+    StoredBlob.objects.get_or_create(sha256=key, defaults={'size': size})
+    locked = list(StoredBlob.objects.select_for_update().filter(sha256=key))
+    return bool(locked) and get_storage().exists(key)
+
+
+def release_unreferenced(keys):
+    # Apaga os arquivos que nenhum anexo (ativo ou arquivado) usa mais.
+    # Rodar sempre depois do commit que removeu os anexos (on_commit)
+    from .models import Attachment, ArchivedAttachment, StoredBlob
+
+    keys = {key for key in keys if key}
+    if not keys:
+        return
+    storage = get_storage()
+    with transaction.atomic():
+        # Espera os uploads que estão reaproveitando estes arquivos
+        locked = set(StoredBlob.objects.select_for_update().filter(sha256__in=keys).values_list('sha256', flat=True))
+        referenced = set(Attachment.objects.filter(sha256__in=locked).values_list('sha256', flat=True))
+        referenced.update(ArchivedAttachment.objects.filter(sha256__in=locked).values_list('sha256', flat=True))
+        unreferenced = locked - referenced
+        StoredBlob.objects.filter(sha256__in=unreferenced).delete()
+        for key in unreferenced:
+            storage.delete(key)
+            storage.delete(thumbnail_key(key))
@@ -0,0 +1,38 @@
+from django.db.models import Count
+from ninja.errors import HttpError
+from .models import TaskTag
+
+# Filtro por tags (?tags=1,2,3&tag_mode=any|all). Vira um único semi-join
+# contra tasks_task_tags, resolvido pelo índice (tag_id, task_id, workspace_id):
+#   any -> task_id IN (SELECT task_id ... WHERE tag_id IN (...))
+#   all -> o mesmo subselect com GROUP BY task_id HAVING COUNT(*) = n
+
+TAG_MODES = ('any', 'all')
+
+
+def parse_tag_ids(tags):
+    if not tags:
+        return []
+    try:
+        return sorted({int(tag_id) for tag_id in tags.split(',') if tag_id.strip()})
+    except ValueError:
+        raise HttpError(400, "tags deve ser uma lista de ids separados por vírgula")
+
+
+def filter_by_tags(queryset, tags, tag_mode='any', task_field='id', workspaces=None, through=TaskTag, through_task='task_id'):
+    # through/through_task: outra tabela de ligação com tag_id, como a das
+    # tarefas arquivadas (ArchivedTask.tags.through, archivedtask_id)
+    if tag_mode not in TAG_MODES:
+        raise HttpError(400, f"tag_mode deve ser um de: {', '.join(TAG_MODES)}")
+    tag_ids = parse_tag_ids(tags)
+    if not tag_ids:
+        return queryset
+
+    links = through.objects.filter(tag_id__in=tag_ids)
+    if workspaces is not None:
+        # Chave de partição: o subselect só lê as partições dos workspaces visíveis
+        links = links.filter(workspace_id__in=workspaces)
+    if tag_mode == 'all' and len(tag_ids) > 1:
+        # (task, tag) é único, então COUNT(*) = n significa todas as tags
+        links = links.values(through_task).annotate(matched=Count('*')).filter(matched=len(tag_ids))
+    return queryset.filter(**{f"{task_field}__in": links.values(through_task)})
@@ -1,3 +1,407 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, timedelta
+from unittest import mock, skipUnless
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+from boards.models import Board, Stage
+from organiza_me.bench import bearer, seed
+from workspaces.models import Workspace
+from .models import ArchivedTask, Attachment, StoredBlob, Task, TaskTag, Subtask
+from .partitioning import TABLES, is_partitioned, partition_names, partition_tables, with_partition_key
+from .recurrence import materialize_occurrence, occurrences, series_end
+from .storage import get_storage, release_unreferenced
+from .tagging import filter_by_tags
+from .timeline import overlapping
 
 # Create your tests here.
+def api_client(uid):
+    return Client(HTTP_AUTHORIZATION=bearer(uid))
+
+
+class RecurrenceDeleteTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        board = Board.objects.create(name='b', workspace=self.workspace)
+        self.stage = Stage.objects.create(name='s', board=board)
+        self.template = Task.objects.create(
+            title='diária', stage=self.stage, due_date=date(2026, 1, 1),
+            recurrence_rule='FREQ=DAILY', workspace=self.workspace,
+        )
+
+    def test_deleting_template_keeps_materialized_occurrences(self):
+        occurrence = materialize_occurrence(self.template, date(2026, 1, 2))
+        Subtask.objects.create(title='sub', task=occurrence, workspace=self.workspace)
+
+        response = api_client('owner').delete(f'/api/tasks/{self.template.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        occurrence.refresh_from_db()
+        self.assertIsNone(occurrence.recurrence_parent_id)
+        self.assertEqual(occurrence.recurrence_date, date(2026, 1, 2))
+        self.assertTrue(Subtask.objects.filter(task=occurrence).exists())
+
+
+class RecurrenceEndTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_series_end_bounds_last_occurrence(self):
+        anchor = date(2026, 1, 31)
+        for rule in ('FREQ=DAILY;COUNT=10', 'FREQ=WEEKLY;BYDAY=MO,FR;COUNT=7', 'FREQ=MONTHLY;INTERVAL=2;COUNT=4'):
+            with self.subTest(rule=rule):
+                dates = occurrences(rule, anchor, anchor, date(2030, 1, 1))
+                self.assertGreaterEqual(series_end(rule, anchor), dates[-1])
+        self.assertEqual(series_end('FREQ=DAILY;UNTIL=20260210;COUNT=50', anchor), date(2026, 2, 10))
+        self.assertIsNone(series_end('FREQ=WEEKLY', anchor))
+
+    def test_api_keeps_end_in_sync(self):
+        workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        stage = Board.objects.create(name='b', workspace=workspace).stage_set.first()
+        client = api_client('owner')
+        task_id = client.post('/api/tasks/', {
+            'title': 't', 'stage_id': stage.id, 'due_date': '2026-01-01', 'recurrence_rule': 'FREQ=DAILY;UNTIL=20260105'
+        }, content_type='application/json').json()['id']
+        self.assertEqual(Task.objects.get(id=task_id).recurrence_end, date(2026, 1, 5))
+
+        client.put(f'/api/tasks/{task_id}/', {'recurrence_rule': 'FREQ=DAILY'}, content_type='application/json')
+        self.assertIsNone(Task.objects.get(id=task_id).recurrence_end)
+
+
+class ArchivedListTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        board = Board.objects.create(name='b', workspace=workspace)
+        self.stage = board.stage_set.first()
+
+    def test_limit_and_offset_are_validated(self):
+        client = api_client('owner')
+        for params in ({'limit': -1}, {'limit': 0}, {'limit': 101}, {'offset': -1}):
+            with self.subTest(**params):
+                self.assertEqual(client.get('/api/tasks/archived/', params).status_code, 400)
+
+    def test_pages_through_archived_tasks(self):
+        now = timezone.now()
+        for i in range(3):
+            ArchivedTask.objects.create(id=i + 1, title=f't{i}', stage=self.stage, created_at=now, updated_at=now)
+            # archived_at é auto_now_add: ajustado depois para fixar a ordem
+            ArchivedTask.objects.filter(id=i + 1).update(archived_at=now - timedelta(days=i))
+        client = api_client('owner')
+
+        first = client.get('/api/tasks/archived/', {'limit': 2}).json()
+        rest = client.get('/api/tasks/archived/', {'limit': 2, 'offset': 2}).json()
+        self.assertEqual([row['id'] for row in first + rest], [1, 2, 3])
+
+
+class TimelineTests(TestCase):
+    # Janela de 10 a 20 de março; as bordas contam como sobreposição
+    FROM, TO = date(2026, 3, 10), date(2026, 3, 20)
+
+    @classmethod
+    def setUpTestData(cls):
+        workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        stage = Board.objects.create(name='b', workspace=workspace).stage_set.first()
+        cases = {
+            'spans_window': (date(2026, 3, 1), date(2026, 3, 31)),
+            'ends_on_first_day': (date(2026, 3, 1), date(2026, 3, 10)),
+            'starts_on_last_day': (date(2026, 3, 20), date(2026, 4, 2)),
+            'inside': (date(2026, 3, 12), date(2026, 3, 14)),
+            'reversed_dates': (date(2026, 3, 25), date(2026, 3, 5)),
+            'start_only_inside': (date(2026, 3, 15), None),
+            'due_only_inside': (None, date(2026, 3, 10)),
+            'before': (date(2026, 3, 1), date(2026, 3, 9)),
+            'after': (date(2026, 3, 21), date(2026, 3, 25)),
+            'start_only_outside': (date(2026, 3, 21), None),
+            'due_only_outside': (None, date(2026, 3, 9)),
+            'no_dates': (None, None),
+        }
+        cls.tasks = {
+            title: Task.objects.create(title=title, stage=stage, start_date=start, due_date=due, workspace=workspace)
+            for title, (start, due) in cases.items()
+        }
+        cls.expected = {
+            'spans_window', 'ends_on_first_day', 'starts_on_last_day', 'inside',
+            'reversed_dates', 'start_only_inside', 'due_only_inside',
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def titles(self, interval_index):
+        return set(overlapping(Task.objects.all(), self.FROM, self.TO, interval_index).values_list('title', flat=True))
+
+    def test_btree_fallback(self):
+        # Caminho dos bancos sem daterange; roda em qualquer backend
+        self.assertNotIn('daterange', str(overlapping(Task.objects.all(), self.FROM, self.TO, False).query))
+        self.assertEqual(self.titles(False), self.expected)
+
+    @skipUnless(connection.vendor == 'postgresql', "daterange/GiST só no Postgres")
+    def test_interval_index_matches_fallback(self):
+        self.assertEqual(self.titles(True), self.expected)
+
+    def test_api_returns_interval_bounds(self):
+        response = api_client('owner').get('/api/tasks/timeline/', {'from': self.FROM, 'to': self.TO})
+
+        self.assertEqual(response.status_code, 200)
+        tasks = {
+            task['title']: (task['start'], task['end'])
+            for board in response.json()['boards'] for stage in board['stages'] for task in stage['tasks']
+        }
+        self.assertEqual(set(tasks), self.expected)
+        self.assertEqual(tasks['reversed_dates'], ('2026-03-05', '2026-03-25'))
+        self.assertEqual(tasks['start_only_inside'], ('2026-03-15', '2026-03-15'))
+        self.assertEqual(tasks['due_only_inside'], ('2026-03-10', '2026-03-10'))
+
+
+class TagFilterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        data = seed('owner', workspaces=1, boards=1, tasks=3000, tags=200, subtasks=0, description_size=0)
+        cls.workspaces = [workspace.id for workspace in data['workspaces']]
+        cls.tag_ids = [tag.id for tag in data['tags']]
+        # Cada tarefa com 4 tags espalhadas: ~60 tarefas por tag
+        TaskTag.objects.bulk_create([
+            TaskTag(task_id=task.id, tag_id=cls.tag_ids[(i * 7 + j * 13) % len(cls.tag_ids)], workspace_id=task.workspace_id)
+            for i, task in enumerate(data['tasks'])
+            for j in range(4)
+        ], batch_size=5000, ignore_conflicts=True)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE tasks_task_tags")
+                cursor.execute("ANALYZE tasks_task")
+
+    def setUp(self):
+        cache.clear()
+
+    def plan(self, tags, mode):
+        tasks = Task.objects.filter(workspace_id__in=self.workspaces)
+        return filter_by_tags(tasks, ','.join(map(str, tags)), mode, workspaces=self.workspaces).values('id').explain()
+
+    def test_any_and_all_plans_use_tag_index(self):
+        index_name = TaskTag._meta.indexes[0].name
+        for tags, mode in [(self.tag_ids[:1], 'any'), (self.tag_ids[:3], 'any'), (self.tag_ids[:2], 'all')]:
+            with self.subTest(mode=mode, tags=len(tags)):
+                self.assertIn(index_name, self.plan(tags, mode))
+
+    def test_all_mode_requires_every_tag(self):
+        first, second = self.tag_ids[0], self.tag_ids[13]
+        client = api_client('owner')
+        params = {'tags': f"{first},{second}", 'fields': 'title'}
+
+        any_ids = {task['id'] for task in client.get('/api/tasks/', {**params, 'tag_mode': 'any'}).json()}
+        all_ids = {task['id'] for task in client.get('/api/tasks/', {**params, 'tag_mode': 'all'}).json()}
+
+        tagged = lambda tag_id: set(TaskTag.objects.filter(tag_id=tag_id).values_list('task_id', flat=True))
+        self.assertEqual(any_ids, tagged(first) | tagged(second))
+        self.assertEqual(all_ids, tagged(first) & tagged(second))
+        self.assertTrue(all_ids)
+
+    def test_archived_board_view_filters_by_tag(self):
+        task = Task.objects.filter(workspace_id__in=self.workspaces).select_related('stage').first()
+        archived = ArchivedTask.objects.create(
+            id=task.id + 100000, title='arquivada', stage=task.stage, created_at=task.created_at, updated_at=task.updated_at
+        )
+        archived.tags.set([self.tag_ids[0]])
+        client = api_client('owner')
+        url = '/api/tasks/archived/'
+
+        self.assertEqual([row['id'] for row in client.get(url, {'tags': self.tag_ids[0]}).json()], [archived.id])
+        self.assertEqual(client.get(url, {'tags': self.tag_ids[1]}).json(), [])
+        self.assertEqual(client.get(url, {'tags': 'x'}).status_code, 400)
+
+
+class AttachmentStorageTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        settings_override = override_settings(ATTACHMENT_ROOT=root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        get_storage.cache_clear()
+        self.addCleanup(get_storage.cache_clear)
+
+        self.client = api_client('owner')
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        self.board = Board.objects.create(name='b', workspace=self.workspace)
+        self.stage = self.board.stage_set.first()
+        self.task = Task.objects.create(title='t', stage=self.stage, workspace=self.workspace)
+
+    def upload(self, content=b'conteudo', task=None):
+        task = task or self.task
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f'/api/tasks/attachments/upload/?task_id={task.id}&file_name=a.txt',
+                data=content, content_type='text/plain'
+            )
+
+    def stored(self, key):
+        return get_storage().exists(key)
+
+    def test_file_is_kept_while_any_attachment_uses_it(self):
+        first = self.upload().json()
+        second = self.upload().json()
+        self.assertTrue(second['deduplicated'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/tasks/attachments/{first['id']}/")
+        self.assertTrue(self.stored(first['sha256']))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/api/tasks/attachments/{second['id']}/")
+        self.assertFalse(self.stored(first['sha256']))
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_collection_between_save_and_claim_fails_the_upload(self):
+        key = self.upload().json()['sha256']
+        Attachment.objects.all().delete()
+        storage = get_storage()
+        save_stream = storage.save_stream
+
+        def save_then_collect(*args, **kwargs):
+            # A coleta de um delete concorrente roda logo depois do dedup
+            result = save_stream(*args, **kwargs)
+            release_unreferenced([key])
+            return result
+
+        with mock.patch.object(storage, 'save_stream', side_effect=save_then_collect):
+            response = self.upload()
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Attachment.objects.exists())
+
+        self.assertEqual(self.upload().status_code, 200)
+        self.assertTrue(self.stored(key))
+
+    def test_claimed_file_survives_collection(self):
+        key = self.upload().json()['sha256']
+        release_unreferenced([key])
+        self.assertTrue(self.stored(key))
+
+    def test_empty_upload_leaves_no_file(self):
+        response = self.upload(b'')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(get_storage().root.glob('??/??/*')), [])
+
+    def test_deleting_task_releases_after_commit(self):
+        key = self.upload().json()['sha256']
+        with mock.patch('tasks.api.release_unreferenced') as release:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.client.delete(f'/api/tasks/{self.task.id}/')
+            release.assert_not_called()
+            for callback in callbacks:
+                callback()
+        release.assert_called_once_with([key])
+
+    def test_cascade_deletes_release_files(self):
+        key = self.upload().json()['sha256']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/boards/{self.board.id}/')
+        self.assertFalse(Task.objects.filter(id=self.task.id).exists())
+        self.assertFalse(self.stored(key))
+
+        board = Board.objects.create(name='b2', workspace=self.workspace)
+        task = Task.objects.create(title='t', stage=board.stage_set.first(), workspace=self.workspace)
+        key = self.upload(b'outro', task=task).json()['sha256']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/workspaces/{self.workspace.id}/')
+        self.assertFalse(self.stored(key))
+
+    def test_download_without_file_is_404(self):
+        attachment = Attachment.objects.create(task=self.task, file_name='vazio')
+        response = self.client.get(f'/api/tasks/attachments/{attachment.id}/download/')
+        self.assertEqual(response.status_code, 404)
+
+    def download(self, attachment_id, byte_range=None):
+        headers = {'HTTP_RANGE': byte_range} if byte_range else {}
+        response = self.client.get(f'/api/tasks/attachments/{attachment_id}/download/', **headers)
+        return response, response.getvalue()
+
+    def test_full_download_advertises_ranges(self):
+        attachment_id = self.upload(b'0123456789').json()['id']
+        response, body = self.download(attachment_id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range_returns_partial_content(self):
+        attachment_id = self.upload(b'0123456789').json()['id']
+        for byte_range, content_range, expected in (
+            ('bytes=2-5', 'bytes 2-5/10', b'2345'),
+            ('bytes=8-', 'bytes 8-9/10', b'89'),
+            ('bytes=7-99', 'bytes 7-9/10', b'789'),
+            ('bytes=-3', 'bytes 7-9/10', b'789'),
+            ('bytes=-50', 'bytes 0-9/10', b'0123456789'),
+        ):
+            with self.subTest(byte_range=byte_range):
+                response, body = self.download(attachment_id, byte_range)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(response['Content-Length'], str(len(expected)))
+                self.assertEqual(body, expected)
+
+    def test_unsatisfiable_range_is_416(self):
+        attachment_id = self.upload(b'0123456789').json()['id']
+        for byte_range in ('bytes=10-', 'bytes=6-2', 'bytes=-0'):
+            with self.subTest(byte_range=byte_range):
+                response, _ = self.download(attachment_id, byte_range)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */10')
+
+
+class PartitioningTests(TestCase):
+
+    def test_partition_key_is_appended_once(self):
+        self.assertEqual(with_partition_key('UNIQUE (task_id, tag_id)'), 'UNIQUE (task_id, tag_id, workspace_id)')
+        self.assertEqual(
+            with_partition_key('(recurrence_parent_id, recurrence_date, workspace_id)'),
+            '(recurrence_parent_id, recurrence_date, workspace_id)',
+        )
+        self.assertEqual(with_partition_key('(lower(title)) WHERE (a > 0)'), '(lower(title), workspace_id) WHERE (a > 0)')
+
+    @skipUnless(connection.vendor == 'postgresql', "particionamento só no Postgres")
+    def test_conversion_keeps_rows_and_indexes(self):
+        data = seed('owner', workspaces=3, boards=1, tasks=300, tags=5, subtasks=1, description_size=0)
+        template = Task.objects.filter(workspace_id=data['workspaces'][0].id).first()
+        materialize_occurrence(template, date(2026, 1, 2))
+        counts = {table: self.count(table) for table in TABLES}
+        window = (date.today() - timedelta(days=10), date.today() + timedelta(days=10))
+        expected = set(overlapping(Task.objects.all(), *window, True).values_list('id', flat=True))
+
+        # DDL transacional: o rollback do TestCase desfaz a conversão
+        partition_tables(partitions=4)
+
+        for table in TABLES:
+            self.assertTrue(is_partitioned(table))
+            self.assertEqual(len(partition_names(table)), 4)
+            self.assertEqual(self.count(table), counts[table])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexdef FROM pg_indexes WHERE indexname = 'tasks_task_interval_gist'")
+            self.assertIn('USING gist (daterange(', cursor.fetchone()[0])
+            cursor.execute(
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conname = 'unique_task_occurrence'"
+            )
+            self.assertEqual(cursor.fetchone()[0], 'UNIQUE (recurrence_parent_id, recurrence_date, workspace_id)')
+        self.assertEqual(set(overlapping(Task.objects.all(), *window, True).values_list('id', flat=True)), expected)
+
+        # Sequência própria continua depois do maior id copiado
+        task = Task.objects.create(title='nova', stage=template.stage, workspace_id=template.workspace_id)
+        self.assertGreater(task.id, max(Task.objects.exclude(id=task.id).values_list('id', flat=True)))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Task.objects.create(
+                title='duplicada', stage=template.stage, workspace_id=template.workspace_id,
+                recurrence_parent=template, recurrence_date=date(2026, 1, 2),
+            )
+
+    def count(self, table):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            return cursor.fetchone()[0]
@@ -0,0 +1,64 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from importlib.util import find_spec
+from django.conf import settings
+from .storage import get_storage, thumbnail_key
+
+logger = logging.getLogger('tasks.thumbnails')
+
+# Miniaturas de imagens geradas fora do processo da requisição, num pool de
+# processos criado sob demanda. Só funciona com backends que têm path()
+# local; nos demais a miniatura simplesmente não existe (404).
+# Pillow é opcional e só é importado nos processos do pool.
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        # spawn: fork de um servidor com threads e conexões abertas não é seguro
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+@lru_cache(maxsize=None)
+def pillow_available():
+    return find_spec('PIL') is not None
+
+
+def render_thumbnail(source, target, size):
+    # Roda no processo filho: não toca no Django, só em arquivos
+    from PIL import Image
+
+    tmp = f"{target}.tmp{os.getpid()}"
+    with Image.open(source) as image:
+        image.thumbnail(size)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        image.save(tmp, format='JPEG', quality=80)
+    os.replace(tmp, target)
+    return target
+
+
+def schedule_thumbnail(sha256, content_type):
+    if not content_type.startswith('image/') or not pillow_available():
+        return None
+    storage = get_storage()
+    source = storage.path(sha256)
+    if source is None or storage.exists(thumbnail_key(sha256)):
+        return None
+    future = executor().submit(render_thumbnail, str(source), str(storage.path(thumbnail_key(sha256))), settings.THUMBNAIL_SIZE)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.warning("Falha ao gerar miniatura: %s", future.exception())
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.db.models import BooleanField, DateField, Func, Q, Value
+from django.db.models.functions import Greatest, Least
+
+# Consultas de sobreposição de intervalo para a timeline.
+# O intervalo de uma tarefa é [min(start_date, due_date), max(start_date, due_date)];
+# com só uma das datas, vira um único dia. Sem nenhuma, fica de fora.
+#
+# No Postgres a consulta usa o índice GiST de expressão criado na migração
+# tasks 0007; task_interval() precisa gerar a mesma expressão do índice.
+# Nos outros bancos cai para os índices B-tree de start_date e due_date.
+
+HAS_DATES = Q(start_date__isnull=False) | Q(due_date__isnull=False)
+
+
+class DateRange(Func):
+    function = 'daterange'
+    output_field = DateField()
+
+
+class RangeOverlaps(Func):
+    template = '%(expressions)s'
+    arg_joiner = ' && '
+    output_field = BooleanField()
+
+
+def task_interval():
+    # LEAST/GREATEST do Postgres ignoram NULL, então uma data só já basta
+    return DateRange(
+        Least('start_date', 'due_date'),
+        Greatest('start_date', 'due_date'),
+        Value('[]'),
+    )
+
+
+def use_interval_index():
+    return connection.vendor == 'postgresql'
+
+
+def overlapping(queryset, start, end, interval_index=None):
+    if interval_index is None:
+        interval_index = use_interval_index()
+    queryset = queryset.filter(HAS_DATES)
+
+    if interval_index:
+        window = DateRange(Value(start), Value(end), Value('[]'))
+        return queryset.filter(RangeOverlaps(task_interval(), window))
+
+    # min(start, due) <= end AND max(start, due) >= start; comparações com
+    # NULL são falsas, então cada OR resolve o caso de data faltando
+    return queryset.filter(
+        Q(start_date__lte=end) | Q(due_date__lte=end),
+        Q(start_date__gte=start) | Q(due_date__gte=start),
+    )
+
+
+def interval_bounds(start_date, due_date):
+    dates = [day for day in (start_date, due_date) if day is not None]
+    return min(dates), max(dates)
+
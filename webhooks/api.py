@@ -0,0 +1,158 @@
+import secrets
+import socket
+from ninja import Router, Schema
+from .destinations import UnsafeDestination, resolve
+from .models import WebhookSubscription, WebhookDelivery
+from workspaces.models import Workspace
+from workspaces.permissions import workspace_ids, OWNER
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from ninja.errors import HttpError
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+router = Router()
+
+# Assinaturas só são vistas e alteradas pelo dono do workspace
+MAX_CONCURRENCY = 16
+MAX_BATCH_SIZE = 500
+
+class SubscriptionIn(Schema):
+    workspace_id: int
+    url: str
+    events: List[str] = []
+    max_concurrency: int = 2
+    batch_size: int = 50
+
+class SubscriptionUpdate(Schema):
+    url: Optional[str] = None
+    events: Optional[List[str]] = None
+    is_active: Optional[bool] = None
+    max_concurrency: Optional[int] = None
+    batch_size: Optional[int] = None
+
+def validate_url(url):
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise HttpError(400, "URL deve ser http ou https")
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        # O worker confere de novo a cada conexão (webhooks.destinations)
+        resolve(parts.hostname, port)
+    except ValueError:
+        raise HttpError(400, "Porta inválida")
+    except UnsafeDestination:
+        raise HttpError(400, "URL aponta para um endereço interno ou reservado")
+    except socket.gaierror:
+        raise HttpError(400, "Host da URL não encontrado")
+
+def validate(data):
+    if data.url is not None:
+        validate_url(data.url)
+    if data.events is not None and any(not event.strip() for event in data.events):
+        raise HttpError(400, "Evento vazio")
+    if data.max_concurrency is not None and not 1 <= data.max_concurrency <= MAX_CONCURRENCY:
+        raise HttpError(400, f"max_concurrency deve estar entre 1 e {MAX_CONCURRENCY}")
+    if data.batch_size is not None and not 1 <= data.batch_size <= MAX_BATCH_SIZE:
+        raise HttpError(400, f"batch_size deve estar entre 1 e {MAX_BATCH_SIZE}")
+
+def serialize(subscription):
+    return {
+        "id": subscription.id,
+        "workspace_id": subscription.workspace_id,
+        "url": subscription.url,
+        "events": subscription.events,
+        "is_active": subscription.is_active,
+        "max_concurrency": subscription.max_concurrency,
+        "batch_size": subscription.batch_size,
+        "created_by": subscription.created_by,
+        "created_at": subscription.created_at
+    }
+
+@router.get("/")
+def list_subscriptions(request, workspace_id: int = None):
+    subscriptions = WebhookSubscription.objects.filter(workspace_id__in=workspace_ids(request, OWNER))
+    if workspace_id:
+        subscriptions = subscriptions.filter(workspace_id=workspace_id)
+    return [serialize(subscription) for subscription in subscriptions.order_by('id')]
+
+@router.post("/")
+def create_subscription(request, data: SubscriptionIn):
+    workspace = get_object_or_404(Workspace, id=data.workspace_id, id__in=workspace_ids(request, OWNER))
+    validate(data)
+    subscription = WebhookSubscription.objects.create(
+        workspace=workspace,
+        url=data.url,
+        secret=secrets.token_hex(32),
+        events=data.events,
+        max_concurrency=data.max_concurrency,
+        batch_size=data.batch_size,
+        created_by=request.auth
+    )
+    # O segredo só é devolvido aqui e ao rotacionar
+    return {**serialize(subscription), "secret": subscription.secret}
+
+@router.put("/{subscription_id}/")
+def update_subscription(request, subscription_id: int, data: SubscriptionUpdate):
+    subscription = get_object_or_404(WebhookSubscription, id=subscription_id, workspace_id__in=workspace_ids(request, OWNER))
+    validate(data)
+    for field, value in data.dict(exclude_none=True).items():
+        setattr(subscription, field, value)
+    subscription.save()
+    return serialize(subscription)
+
+@router.post("/{subscription_id}/rotate-secret/")
+def rotate_secret(request, subscription_id: int):
+    subscription = get_object_or_404(WebhookSubscription, id=subscription_id, workspace_id__in=workspace_ids(request, OWNER))
+    subscription.secret = secrets.token_hex(32)
+    subscription.save(update_fields=['secret'])
+    return {"id": subscription.id, "secret": subscription.secret}
+
+@router.delete("/{subscription_id}/")
+def delete_subscription(request, subscription_id: int):
+    subscription = get_object_or_404(WebhookSubscription, id=subscription_id, workspace_id__in=workspace_ids(request, OWNER))
+    subscription.delete()
+    return {"success": True}
+
+# Entregas: paginação por cursor (before_id), como o feed de atividade
+DELIVERY_PAGE_SIZE = 50
+DELIVERY_MAX_PAGE_SIZE = 100
+
+@router.get("/{subscription_id}/deliveries/")
+def list_deliveries(request, subscription_id: int, status: str = None, before_id: int = None, limit: int = DELIVERY_PAGE_SIZE):
+    subscription = get_object_or_404(WebhookSubscription, id=subscription_id, workspace_id__in=workspace_ids(request, OWNER))
+    if limit < 1:
+        raise HttpError(400, "limit deve ser positivo")
+    if status and status not in dict(WebhookDelivery.STATUS_CHOICES):
+        raise HttpError(400, "Status inválido")
+    limit = min(limit, DELIVERY_MAX_PAGE_SIZE)
+    deliveries = subscription.deliveries.all()
+    if status:
+        deliveries = deliveries.filter(status=status)
+    if before_id is not None:
+        deliveries = deliveries.filter(id__lt=before_id)
+    items = list(deliveries.order_by('-id').values(
+        'id', 'event_id', 'event__action', 'status', 'attempts', 'next_attempt_at',
+        'response_status', 'last_error', 'delivered_at'
+    )[:limit + 1])
+    for item in items:
+        item["action"] = item.pop("event__action")
+    next_before_id = items[limit - 1]["id"] if len(items) > limit else None
+    return {"items": items[:limit], "next_before_id": next_before_id}
+
+@router.post("/{subscription_id}/deliveries/{delivery_id}/retry/")
+def retry_delivery(request, subscription_id: int, delivery_id: int):
+    # Devolve uma entrega que esgotou as tentativas para a fila
+    delivery = get_object_or_404(
+        WebhookDelivery,
+        id=delivery_id,
+        subscription_id=subscription_id,
+        subscription__workspace_id__in=workspace_ids(request, OWNER)
+    )
+    if delivery.status != WebhookDelivery.FAILED:
+        raise HttpError(400, "Só entregas com falha podem ser reenviadas")
+    delivery.status = WebhookDelivery.PENDING
+    delivery.attempts = 0
+    delivery.next_attempt_at = timezone.now()
+    delivery.save(update_fields=['status', 'attempts', 'next_attempt_at'])
+    return {"success": True}
@@ -0,0 +1,323 @@
+import hashlib
+import hmac
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+from .destinations import create_connection
+from .models import OutboxEvent, WebhookDelivery, WebhookSubscription
+from .outbox import invalidate, matches
+
+# Lado do worker (manage.py run_webhooks): cada rodada
+# 1. distribui os eventos novos do outbox em entregas, uma por assinatura;
+# 2. para cada vaga livre no pool, reserva um lote de entregas vencidas
+#    (next_attempt_at <= agora) de uma assinatura e já o envia, respeitando
+#    max_concurrency da assinatura;
+# 3. recolhe os lotes que terminaram, sem esperar pelos que ainda estão em voo.
+# Só se reserva o que começa na hora: um lote dura no máximo algumas vezes
+# WEBHOOK_TIMEOUT, bem menos que WEBHOOK_LEASE, então a reserva não vence com
+# o lote ainda em voo (o que levaria a envio duplicado por outro worker).
+# max_concurrency vale por processo: N workers run_webhooks podem abrir até
+# N * max_concurrency requisições simultâneas para a mesma URL.
+# Entrega é "pelo menos uma vez": o receptor deduplica por delivery_id.
+
+USER_AGENT = 'OrganizaMe-Webhooks/1.0'
+
+
+def sign(secret, timestamp, body):
+    # HMAC-SHA256 de "<timestamp>.<corpo>"; o timestamp entra na assinatura
+    # para o receptor poder recusar reenvios antigos
+    message = f"{timestamp}.".encode() + body
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def backoff(attempts):
+    # Exponencial com teto e jitter de ±20%, para as falhas de um mesmo
+    # endpoint não voltarem todas no mesmo segundo
+    delay = min(settings.WEBHOOK_BACKOFF_MAX, settings.WEBHOOK_BACKOFF_BASE * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+class HttpPool:
+    # Conexões keep-alive reaproveitadas por (esquema, host), uma por thread:
+    # http.client não é thread-safe, e cada thread do worker atende um lote por vez
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.local = threading.local()
+
+    def connections(self):
+        if not hasattr(self.local, 'connections'):
+            self.local.connections = {}
+        return self.local.connections
+
+    def connection(self, scheme, netloc):
+        connections = self.connections()
+        conn = connections.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            conn = connections[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+            # Resolve e confere o destino a cada conexão aberta (SSRF, DNS rebinding)
+            conn._create_connection = create_connection
+        return conn
+
+    def discard(self, scheme, netloc):
+        conn = self.connections().pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def post(self, url, body, headers):
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        for retry in (False, True):
+            conn = self.connection(parts.scheme, parts.netloc)
+            try:
+                conn.request('POST', path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()  # esvazia a resposta para liberar a conexão
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # Conexão ociosa fechada pelo servidor: tenta uma vez numa nova
+                self.discard(parts.scheme, parts.netloc)
+                if retry:
+                    raise
+                continue
+            except Exception:
+                self.discard(parts.scheme, parts.netloc)
+                raise
+            if response.will_close:
+                self.discard(parts.scheme, parts.netloc)
+            return response.status
+
+
+def dispatch_events(limit=500):
+    # skip_locked: vários workers dividem o outbox sem se bloquear
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.filter(dispatched_at__isnull=True)
+            .order_by('id')
+            .select_for_update(skip_locked=True)[:limit]
+        )
+        if not events:
+            return 0
+
+        subscriptions = {}
+        active = WebhookSubscription.objects.filter(
+            workspace_id__in={event.workspace_id for event in events}, is_active=True,
+        )
+        for subscription in active:
+            subscriptions.setdefault(subscription.workspace_id, []).append(subscription)
+
+        now = timezone.now()
+        WebhookDelivery.objects.bulk_create([
+            WebhookDelivery(subscription=subscription, event=event, next_attempt_at=now)
+            for event in events
+            for subscription in subscriptions.get(event.workspace_id, [])
+            if matches(subscription.events, event.action)
+        ], batch_size=1000)
+        OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(dispatched_at=now)
+    return len(events)
+
+
+def due_deliveries(now):
+    return WebhookDelivery.objects.filter(status=WebhookDelivery.PENDING, next_attempt_at__lte=now)
+
+
+def due_subscriptions(now, exclude=()):
+    # Assinaturas com entrega vencida, a mais atrasada primeiro: nenhuma
+    # assinatura monopoliza as vagas enquanto as outras esperam
+    due = due_deliveries(now).filter(subscription=OuterRef('pk'))
+    return (
+        WebhookSubscription.objects.filter(is_active=True)
+        .exclude(id__in=exclude)
+        .filter(Exists(due))
+        .annotate(oldest=Subquery(due.order_by('next_attempt_at').values('next_attempt_at')[:1]))
+        .order_by('oldest', 'id')
+    )
+
+
+def claim_deliveries(subscription, limit):
+    # Reservar = adiar next_attempt_at pelo lease. Se o worker morrer no meio,
+    # a entrega volta a vencer sozinha e outro worker a pega
+    now = timezone.now()
+    with transaction.atomic():
+        deliveries = list(
+            due_deliveries(now).filter(subscription=subscription)
+            .select_related('event')
+            .order_by('next_attempt_at', 'id')
+            .select_for_update(skip_locked=True, of=('self',))[:limit]
+        )
+        WebhookDelivery.objects.filter(id__in=[delivery.id for delivery in deliveries]).update(
+            next_attempt_at=now + timedelta(seconds=settings.WEBHOOK_LEASE),
+        )
+    for delivery in deliveries:
+        delivery.subscription = subscription
+    return deliveries
+
+
+def batch_body(subscription, batch):
+    return json.dumps({
+        "subscription_id": subscription.id,
+        "workspace_id": subscription.workspace_id,
+        "events": [
+            {
+                "delivery_id": delivery.id,
+                "event_id": delivery.event.id,
+                "action": delivery.event.action,
+                "object_type": delivery.event.object_type,
+                "object_id": delivery.event.object_id,
+                "board_id": delivery.event.board_id,
+                "payload": delivery.event.payload,
+                "created_at": delivery.event.created_at,
+                "attempt": delivery.attempts + 1,
+            }
+            for delivery in batch
+        ],
+    }, cls=DjangoJSONEncoder).encode()
+
+
+def record_result(subscription, batch, status, error):
+    now = timezone.now()
+    if not error:
+        WebhookDelivery.objects.filter(id__in=[delivery.id for delivery in batch]).update(
+            status=WebhookDelivery.DELIVERED, attempts=F('attempts') + 1,
+            response_status=status, last_error='', delivered_at=now,
+        )
+        return WebhookDelivery.DELIVERED
+
+    gone = status == 410
+    if gone:
+        # 410 Gone: o receptor pediu para parar; desativa a assinatura
+        WebhookSubscription.objects.filter(id=subscription.id).update(is_active=False)
+        invalidate(subscription.workspace_id)
+
+    # Um lote pode misturar entregas com históricos diferentes
+    by_attempts = {}
+    for delivery in batch:
+        by_attempts.setdefault(delivery.attempts + 1, []).append(delivery.id)
+    outcome = WebhookDelivery.PENDING
+    for attempts, ids in by_attempts.items():
+        changes = {'attempts': attempts, 'response_status': status, 'last_error': error[:500]}
+        if gone or attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            changes['status'] = WebhookDelivery.FAILED
+            outcome = WebhookDelivery.FAILED
+        else:
+            changes['next_attempt_at'] = now + backoff(attempts)
+        WebhookDelivery.objects.filter(id__in=ids).update(**changes)
+    return outcome
+
+
+class Deliverer:
+
+    def __init__(self, workers=8, timeout=None):
+        self.workers = workers
+        self.http = HttpPool(timeout or settings.WEBHOOK_TIMEOUT)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='webhook')
+        # Lotes em voo: future -> assinatura, e contagem/limite por assinatura
+        self.running = {}
+        self.in_flight = Counter()
+        self.limits = {}
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def send(self, batch):
+        subscription = batch[0].subscription
+        body = batch_body(subscription, batch)
+        timestamp = str(int(time.time()))
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': USER_AGENT,
+            'X-OrganizaMe-Timestamp': timestamp,
+            'X-OrganizaMe-Signature': f"sha256={sign(subscription.secret, timestamp, body)}",
+        }
+        try:
+            status = self.http.post(subscription.url, body, headers)
+            error = '' if 200 <= status < 300 else f"HTTP {status}"
+        except (OSError, http.client.HTTPException) as exc:
+            status, error = None, f"{type(exc).__name__}: {exc}"
+        return record_result(subscription, batch, status, error), len(batch)
+
+    def fill(self):
+        # Preenche as vagas livres do pool: cada vaga recebe um lote recém
+        # reservado, nunca mais que max_concurrency lotes da mesma assinatura.
+        # Retorna quantas entregas começaram
+        started = 0
+        free = self.workers - len(self.running)
+        if free <= 0:
+            return 0
+        now = timezone.now()
+        saturated = [
+            subscription_id for subscription_id, count in self.in_flight.items()
+            if count >= self.limits[subscription_id]
+        ]
+        # Cada assinatura fora das saturadas ocupa pelo menos uma vaga
+        for subscription in list(due_subscriptions(now, exclude=saturated)[:free]):
+            self.limits[subscription.id] = max(1, subscription.max_concurrency)
+            slots = min(free, self.limits[subscription.id] - self.in_flight[subscription.id])
+            if slots <= 0:
+                continue
+            size = max(1, subscription.batch_size)
+            deliveries = claim_deliveries(subscription, slots * size)
+            for i in range(0, len(deliveries), size):
+                future = self.executor.submit(self.send, deliveries[i:i + size])
+                self.running[future] = subscription.id
+                self.in_flight[subscription.id] += 1
+                free -= 1
+            started += len(deliveries)
+            if free <= 0:
+                break
+        return started
+
+    def collect(self, timeout=0):
+        # Resultados dos lotes que terminaram; espera até timeout segundos
+        # por pelo menos um, sem bloquear nos que continuam em voo
+        results = Counter()
+        if not self.running:
+            return results
+        done, _ = wait(self.running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            subscription_id = self.running.pop(future)
+            self.in_flight[subscription_id] -= 1
+            if not self.in_flight[subscription_id]:
+                del self.in_flight[subscription_id], self.limits[subscription_id]
+            outcome, count = future.result()
+            results[outcome] += count
+        return results
+
+    def deliver(self):
+        # Tudo o que já venceu, até não sobrar nada (usado por --once e testes)
+        results = Counter()
+        while self.fill() or self.running:
+            results.update(self.collect(timeout=None))
+        return results
+
+
+def purge(retention_days=None):
+    # Eventos já distribuídos e sem entrega pendente saem após a retenção;
+    # as entregas concluídas vão junto pelo CASCADE
+    days = settings.WEBHOOK_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = timezone.now() - timedelta(days=days)
+    stale = (
+        OutboxEvent.objects.filter(dispatched_at__lt=cutoff)
+        .exclude(deliveries__status=WebhookDelivery.PENDING)
+        .values_list('id', flat=True)
+    )
+    deleted = 0
+    while True:
+        ids = list(stale[:1000])
+        if not ids:
+            return deleted
+        OutboxEvent.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
@@ -0,0 +1,48 @@
+import ipaddress
+import socket
+from django.conf import settings
+
+# Destinos permitidos para webhooks: só endereços públicos. Loopback,
+# privados, link-local (169.254.169.254, metadados da nuvem), reservados e
+# afins ficam de fora, para uma assinatura não virar proxy para a rede
+# interna (SSRF). A checagem roda ao assinar e de novo a cada conexão
+# aberta pelo worker, contra o endereço efetivamente usado: um DNS que muda
+# de resposta entre as duas (DNS rebinding) não escapa.
+# WEBHOOK_ALLOW_LOCALHOST libera só o loopback, para o receptor local
+# (manage.py webhook_receiver).
+
+
+class UnsafeDestination(OSError):
+    pass
+
+
+def blocked(address):
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    if ip.is_loopback:
+        return not settings.WEBHOOK_ALLOW_LOCALHOST
+    return not ip.is_global or ip.is_multicast
+
+
+def resolve(host, port):
+    # Todos os endereços do host precisam ser permitidos, não só o primeiro
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    for address in addresses:
+        if blocked(address):
+            raise UnsafeDestination(f"{host} resolve para um endereço não permitido ({address})")
+    return addresses
+
+
+def create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None, *args, **kwargs):
+    # Substitui socket.create_connection nas conexões do worker: conecta no
+    # endereço que acabou de ser conferido, nunca numa nova resolução
+    host, port = address
+    error = None
+    for ip in resolve(host, port):
+        try:
+            return socket.create_connection((ip, port), timeout, source_address)
+        except OSError as exc:
+            error = exc
+    raise error or UnsafeDestination(f"{host} não resolve para nenhum endereço")
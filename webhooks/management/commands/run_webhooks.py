@@ -0,0 +1,44 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from webhooks.delivery import Deliverer, dispatch_events, purge
+
+PURGE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    help = "Worker que distribui o outbox de eventos e entrega os webhooks em lotes, com retentativas"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Requisições HTTP simultâneas no total (max_concurrency de cada assinatura vale por processo)")
+        parser.add_argument('--batch', type=int, default=500, help="Eventos do outbox distribuídos por rodada")
+        parser.add_argument('--interval', type=float, default=1.0, help="Segundos de espera quando não há nada a fazer")
+        parser.add_argument('--once', action='store_true', help="Processa o que já está vencido e sai")
+
+    def handle(self, *args, **options):
+        deliverer = Deliverer(workers=options['workers'])
+        last_purge = 0
+        try:
+            while True:
+                close_old_connections()
+                dispatched = dispatch_events(options['batch'])
+                started = deliverer.fill()
+                # Lotes lentos seguem em voo enquanto as vagas livres recebem outros
+                busy = dispatched or started
+                results = deliverer.collect(timeout=0 if busy else options['interval'])
+                if results:
+                    summary = ', '.join(f"{count} {status}" for status, count in sorted(results.items()))
+                    self.stdout.write(f"{sum(results.values())} entrega(s): {summary}")
+                if time.monotonic() - last_purge > PURGE_INTERVAL:
+                    removed = purge(settings.WEBHOOK_RETENTION_DAYS)
+                    if removed:
+                        self.stdout.write(f"{removed} evento(s) antigos removidos do outbox")
+                    last_purge = time.monotonic()
+                if busy or results or deliverer.running:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            deliverer.close()
@@ -0,0 +1,73 @@
+import hmac
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from webhooks.delivery import sign
+
+
+class Command(BaseCommand):
+    help = "Receptor local de webhooks para testes: confere a assinatura e pode simular falhas e lentidão"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--secret', help="Segredo da assinatura; sem ele a assinatura não é conferida")
+        parser.add_argument('--fail-rate', type=float, default=0.0, help="Fração das requisições respondidas com 503")
+        parser.add_argument('--delay', type=float, default=0.0, help="Segundos de espera antes de responder")
+
+    def handle(self, *args, **options):
+        stdout = self.stdout
+        lock = threading.Lock()
+        state = {'in_flight': 0, 'peak': 0, 'events': 0}
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 para manter a conexão aberta entre lotes
+            protocol_version = 'HTTP/1.1'
+
+            def respond(self, status):
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if options['secret']:
+                    expected = f"sha256={sign(options['secret'], self.headers.get('X-OrganizaMe-Timestamp', ''), body)}"
+                    if not hmac.compare_digest(expected, self.headers.get('X-OrganizaMe-Signature', '')):
+                        stdout.write("assinatura inválida")
+                        return self.respond(401)
+                with lock:
+                    state['in_flight'] += 1
+                    state['peak'] = max(state['peak'], state['in_flight'])
+                try:
+                    time.sleep(options['delay'])
+                    if random.random() < options['fail_rate']:
+                        stdout.write("falha simulada (503)")
+                        return self.respond(503)
+                    events = json.loads(body)['events']
+                    with lock:
+                        state['events'] += len(events)
+                        total, peak = state['events'], state['peak']
+                    actions = ', '.join(sorted({event['action'] for event in events}))
+                    stdout.write(f"lote de {len(events)} evento(s) [{actions}] total={total} pico simultâneo={peak}")
+                    self.respond(200)
+                finally:
+                    with lock:
+                        state['in_flight'] -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f"Recebendo webhooks em http://127.0.0.1:{options['port']}/")
+        if not settings.WEBHOOK_ALLOW_LOCALHOST:
+            self.stdout.write(self.style.WARNING("Rode o worker e a API com WEBHOOK_ALLOW_LOCALHOST=1 para entregar aqui"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
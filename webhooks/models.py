@@ -0,0 +1,79 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from workspaces.models import Workspace
+
+# Create your models here.
+class WebhookSubscription(models.Model):
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='webhooks')
+    url = models.URLField(max_length=500)
+    # Chave do HMAC (X-OrganizaMe-Signature); só aparece na resposta de criação
+    secret = models.CharField(max_length=64)
+    # Ações assinadas ("task.created") ou prefixos ("task.*"); vazio = todas
+    events = models.JSONField(default=list, blank=True)
+    is_active = models.BooleanField(default=True)
+    # Requisições simultâneas para esta URL e eventos por requisição
+    max_concurrency = models.PositiveSmallIntegerField(default=2)
+    batch_size = models.PositiveSmallIntegerField(default=50)
+    created_by = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['workspace'], condition=Q(is_active=True), name='webhooks_active_idx'),
+        ]
+
+    def __str__(self):
+        return self.url
+
+# Outbox transacional: gravado na mesma transação da mutação (webhooks.outbox),
+# então evento e mudança são confirmados ou desfeitos juntos. O worker
+# (run_webhooks) distribui cada evento em entregas e marca dispatched_at.
+class OutboxEvent(models.Model):
+    workspace_id = models.BigIntegerField()
+    board_id = models.BigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=50)
+    object_type = models.CharField(max_length=20)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(default=timezone.now)
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=Q(dispatched_at__isnull=True), name='webhooks_outbox_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.object_type}:{self.object_id}"
+
+class WebhookDelivery(models.Model):
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendente'),
+        (DELIVERED, 'Entregue'),
+        (FAILED, 'Falhou'),
+    ]
+
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name='deliveries')
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='deliveries')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Próxima tentativa; o worker também empurra este horário ao reservar a
+    # entrega, para outro worker não pegá-la enquanto ela está em voo
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    last_error = models.CharField(max_length=500, blank=True, default='')
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=Q(status='pending'), name='webhooks_delivery_due_idx'),
+            models.Index(fields=['subscription', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.subscription_id}:{self.event_id} {self.status}"
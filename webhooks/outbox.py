@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from organiza_me.checks import shared_cache
+from .models import OutboxEvent, WebhookSubscription
+
+# Lado da API: cada evento registrado (activity.log.record) vira uma linha
+# do outbox na mesma transação da mutação. Workspace sem assinatura ativa
+# não grava nada; a checagem fica no cache, invalidada em webhooks.signals.
+# O "não" só vai para o cache se ele for compartilhado: num cache por
+# processo a invalidação não chega aos outros workers, e um "não" guardado
+# perderia os eventos de uma assinatura recém-criada até o timeout. Um "sim"
+# desatualizado só grava eventos que o worker descarta.
+
+
+def _cache_key(workspace_id):
+    return f"webhooks:subscribed:{workspace_id}"
+
+
+def has_subscribers(workspace_id):
+    key = _cache_key(workspace_id)
+    subscribed = cache.get(key)
+    if subscribed is None:
+        subscribed = WebhookSubscription.objects.filter(workspace_id=workspace_id, is_active=True).exists()
+        if subscribed or shared_cache():
+            cache.set(key, subscribed, settings.WEBHOOK_SUBSCRIPTION_CACHE_TIMEOUT)
+    return subscribed
+
+
+def invalidate(workspace_id):
+    cache.delete(_cache_key(workspace_id))
+
+
+def publish(event):
+    # event: ActivityEvent ainda não salvo, montado por record()
+    if not settings.WEBHOOKS_ENABLED or not has_subscribers(event.workspace_id):
+        return None
+    return OutboxEvent.objects.create(
+        workspace_id=event.workspace_id,
+        board_id=event.board_id,
+        action=event.action,
+        object_type=event.object_type,
+        object_id=event.object_id,
+        payload=event.payload,
+        created_at=event.created_at,
+    )
+
+
+def matches(patterns, action):
+    # Lista vazia assina tudo; "task.*" assina todas as ações de tarefa
+    if not patterns:
+        return True
+    return any(
+        action.startswith(pattern[:-1]) if pattern.endswith('*') else action == pattern
+        for pattern in patterns
+    )
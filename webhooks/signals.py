@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from activity.log import event_recorded
+from .models import WebhookSubscription
+from .outbox import invalidate, publish
+
+@receiver(event_recorded)
+def write_outbox(sender, event, **kwargs):
+    publish(event)
+
+@receiver(post_save, sender=WebhookSubscription)
+@receiver(post_delete, sender=WebhookSubscription)
+def invalidate_subscription_cache(sender, instance, **kwargs):
+    # Só depois do commit: antes dele, outro request recarregaria o valor antigo
+    workspace_id = instance.workspace_id
+    transaction.on_commit(lambda: invalidate(workspace_id))
@@ -0,0 +1,261 @@
+import hmac
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from activity.log import record
+from organiza_me.bench import bearer
+from workspaces.models import Workspace
+from .delivery import Deliverer, purge, record_result, sign
+from .models import OutboxEvent, WebhookDelivery, WebhookSubscription
+from .outbox import has_subscribers, matches
+
+# Create your tests here.
+class StubReceiver:
+    # Receptor HTTP em 127.0.0.1 numa thread; confere a assinatura como
+    # manage.py webhook_receiver. release: Event que segura as respostas
+
+    def __init__(self, secret, release=None):
+        self.requests = []
+        self.release = release
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                expected = f"sha256={sign(secret, self.headers.get('X-OrganizaMe-Timestamp', ''), body)}"
+                valid = hmac.compare_digest(expected, self.headers.get('X-OrganizaMe-Signature', ''))
+                receiver.requests.append(json.loads(body))
+                if receiver.release is not None:
+                    receiver.release.wait(10)
+                self.send_response(200 if valid else 401)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        if self.release is not None:
+            self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class WebhookFixtures:
+
+    def setUp(self):
+        cache.clear()
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+
+    def subscribe(self, url='http://93.184.216.34/hook', secret='s' * 64, **fields):
+        return WebhookSubscription.objects.create(
+            workspace=self.workspace, url=url, secret=secret, created_by='owner', **fields
+        )
+
+    def delivery(self, subscription, action='task.created', **fields):
+        event = OutboxEvent.objects.create(
+            workspace_id=self.workspace.id, action=action, object_type='task', object_id=1,
+            dispatched_at=fields.pop('dispatched_at', timezone.now()),
+        )
+        return WebhookDelivery.objects.create(subscription=subscription, event=event, **fields)
+
+
+class OutboxTests(WebhookFixtures, TestCase):
+
+    def test_committed_mutation_writes_outbox_row(self):
+        self.subscribe()
+        client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+        client.post('/api/boards/', {'name': 'b', 'workspace_id': self.workspace.id}, content_type='application/json')
+
+        self.assertEqual(list(OutboxEvent.objects.values_list('action', flat=True)), ['board.created'])
+
+    def test_rolled_back_mutation_writes_nothing(self):
+        self.subscribe()
+        try:
+            with transaction.atomic():
+                record(SimpleNamespace(auth='owner'), 'board.created', self.workspace.id, 'board', 1)
+                self.assertEqual(OutboxEvent.objects.count(), 1)
+                raise IntegrityError("falha depois do evento")
+        except IntegrityError:
+            pass
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_negative_is_not_cached_in_local_cache(self):
+        self.assertFalse(has_subscribers(self.workspace.id))
+        # Criada "em outro processo": nenhuma invalidação chega a este
+        WebhookSubscription.objects.bulk_create([WebhookSubscription(
+            workspace=self.workspace, url='http://93.184.216.34/', secret='s', created_by='owner'
+        )])
+        self.assertTrue(has_subscribers(self.workspace.id))
+
+    def test_matches_prefix_patterns(self):
+        self.assertTrue(matches([], 'task.created'))
+        self.assertTrue(matches(['task.*'], 'task.moved'))
+        self.assertTrue(matches(['board.created', 'task.*'], 'board.created'))
+        self.assertFalse(matches(['task.*'], 'board.created'))
+        self.assertFalse(matches(['task.created'], 'task.created.extra'))
+        self.assertFalse(matches(['task.c*'], 'task.moved'))
+
+
+class SubscriptionUrlTests(WebhookFixtures, TestCase):
+
+    def create(self, url):
+        client = Client(HTTP_AUTHORIZATION=bearer('owner'))
+        return client.post('/api/webhooks/', {'workspace_id': self.workspace.id, 'url': url}, content_type='application/json')
+
+    def test_internal_addresses_are_rejected(self):
+        for url in (
+            'http://169.254.169.254/latest/meta-data',
+            'http://10.0.0.5/',
+            'http://192.168.1.1:8080/',
+            'http://127.0.0.1:8765/',
+            'http://localhost:8765/',
+            'http://[::1]/',
+            'http://[::ffff:127.0.0.1]/',
+            'http://0.0.0.0/',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.create(url).status_code, 400)
+
+    def test_public_address_is_accepted(self):
+        self.assertEqual(self.create('https://93.184.216.34/hook').status_code, 200)
+
+    @override_settings(WEBHOOK_ALLOW_LOCALHOST=True)
+    def test_localhost_setting_allows_only_loopback(self):
+        self.assertEqual(self.create('http://127.0.0.1:8765/').status_code, 200)
+        self.assertEqual(self.create('http://169.254.169.254/').status_code, 400)
+
+
+@override_settings(WEBHOOK_MAX_ATTEMPTS=3)
+class RecordResultTests(WebhookFixtures, TestCase):
+
+    def test_failure_backs_off(self):
+        subscription = self.subscribe()
+        delivery = self.delivery(subscription)
+
+        outcome = record_result(subscription, [delivery], 503, "HTTP 503")
+
+        delivery.refresh_from_db()
+        self.assertEqual(outcome, WebhookDelivery.PENDING)
+        self.assertEqual((delivery.status, delivery.attempts, delivery.response_status), (WebhookDelivery.PENDING, 1, 503))
+        self.assertGreater(delivery.next_attempt_at, timezone.now() + timedelta(seconds=settings.WEBHOOK_BACKOFF_BASE * 0.7))
+
+    def test_last_attempt_fails_delivery(self):
+        subscription = self.subscribe()
+        delivery = self.delivery(subscription, attempts=2)
+
+        self.assertEqual(record_result(subscription, [delivery], None, "timeout"), WebhookDelivery.FAILED)
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), (WebhookDelivery.FAILED, 3))
+
+    def test_gone_deactivates_subscription(self):
+        subscription = self.subscribe()
+        delivery = self.delivery(subscription)
+
+        self.assertEqual(record_result(subscription, [delivery], 410, "HTTP 410"), WebhookDelivery.FAILED)
+        subscription.refresh_from_db()
+        self.assertFalse(subscription.is_active)
+
+
+class PurgeTests(WebhookFixtures, TestCase):
+
+    def test_keeps_events_with_pending_deliveries(self):
+        subscription = self.subscribe()
+        old = timezone.now() - timedelta(days=30)
+        pending = self.delivery(subscription, dispatched_at=old)
+        delivered = self.delivery(subscription, dispatched_at=old, status=WebhookDelivery.DELIVERED)
+        recent = self.delivery(subscription, status=WebhookDelivery.DELIVERED)
+
+        self.assertEqual(purge(retention_days=7), 1)
+        self.assertEqual(
+            set(OutboxEvent.objects.values_list('id', flat=True)),
+            {pending.event_id, recent.event_id}
+        )
+        self.assertFalse(OutboxEvent.objects.filter(id=delivered.event_id).exists())
+
+
+class SignatureTests(WebhookFixtures, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.receiver = StubReceiver('segredo')
+        self.addCleanup(self.receiver.close)
+        self.deliverer = Deliverer(workers=1)
+        self.addCleanup(self.deliverer.close)
+
+    @override_settings(WEBHOOK_ALLOW_LOCALHOST=True)
+    def test_receiver_verifies_signature(self):
+        good = self.subscribe(url=self.receiver.url, secret='segredo')
+        delivery = self.delivery(good)
+        self.assertEqual(self.deliverer.send([delivery]), (WebhookDelivery.DELIVERED, 1))
+        self.assertEqual(self.receiver.requests[0]['events'][0]['delivery_id'], delivery.id)
+
+        bad = self.subscribe(url=self.receiver.url, secret='outro')
+        delivery = self.delivery(bad)
+        self.assertEqual(self.deliverer.send([delivery]), (WebhookDelivery.PENDING, 1))
+        delivery.refresh_from_db()
+        self.assertEqual(delivery.response_status, 401)
+
+    def test_worker_refuses_loopback_at_connect_time(self):
+        # Assinatura antiga ou DNS que passou a apontar para a rede interna
+        subscription = self.subscribe(url=self.receiver.url, secret='segredo')
+        delivery = self.delivery(subscription)
+
+        self.assertEqual(self.deliverer.send([delivery]), (WebhookDelivery.PENDING, 1))
+        delivery.refresh_from_db()
+        self.assertIn('UnsafeDestination', delivery.last_error)
+        self.assertEqual(self.receiver.requests, [])
+
+
+@override_settings(WEBHOOK_ALLOW_LOCALHOST=True)
+class DelivererTests(WebhookFixtures, TransactionTestCase):
+    # Os lotes rodam nas threads do pool, com conexões próprias: os dados
+    # precisam estar confirmados, fora da transação do TestCase
+
+    def setUp(self):
+        super().setUp()
+        self.slow = StubReceiver('segredo', release=threading.Event())
+        self.fast = StubReceiver('segredo')
+        self.addCleanup(self.slow.close)
+        self.addCleanup(self.fast.close)
+        self.deliverer = Deliverer(workers=4)
+        self.addCleanup(self.deliverer.close)
+
+    def test_slow_endpoint_does_not_hold_the_others(self):
+        slow = self.subscribe(url=self.slow.url, secret='segredo', max_concurrency=1, batch_size=1)
+        fast = self.subscribe(url=self.fast.url, secret='segredo', max_concurrency=1, batch_size=1)
+        stuck = [self.delivery(slow) for _ in range(3)]
+        sent = [self.delivery(fast) for _ in range(2)]
+
+        # Só o que começa na hora é reservado: um lote por assinatura
+        self.assertEqual(self.deliverer.fill(), 2)
+        self.assertEqual(WebhookDelivery.objects.filter(next_attempt_at__gt=timezone.now()).count(), 2)
+
+        results = self.deliverer.collect(timeout=5)
+        self.assertEqual(results[WebhookDelivery.DELIVERED], 1)
+        self.deliverer.fill()
+        self.deliverer.collect(timeout=5)
+        self.assertEqual(
+            WebhookDelivery.objects.filter(id__in=[d.id for d in sent], status=WebhookDelivery.DELIVERED).count(), 2
+        )
+        self.assertEqual(len(self.slow.requests), 1)
+
+        self.slow.release.set()
+        self.deliverer.deliver()
+        self.assertEqual(
+            WebhookDelivery.objects.filter(id__in=[d.id for d in stuck], status=WebhookDelivery.DELIVERED).count(), 3
+        )
@@ -1,6 +1,12 @@
 from ninja import Router, Schema
-from .models import Workspace
+from .models import Workspace, WorkspaceMember
+from .permissions import workspace_ids, workspace_role, EDITOR, OWNER
+from organiza_me.sparse import model_fields, select_fields, selected_values
+from activity.log import record
+from activity.models import ActivityEvent
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from ninja.errors import HttpError
 from typing import Optional
 
 router = Router()
@@ -13,39 +19,57 @@ class WorkspaceUpdate(Schema):
     name: Optional[str] = None
     description: Optional[str] = None
 
+class MemberIn(Schema):
+    member_uid: str
+    role: str = EDITOR
+
+class MemberUpdate(Schema):
+    role: str
+
 @router.get("/")
-def list_workspaces(request):
-    workspaces = Workspace.objects.filter(owner_uid=request.auth)
-    return list(workspaces.values())
-    
+def list_workspaces(request, fields: str = None):
+    workspaces = Workspace.objects.filter(id__in=workspace_ids(request))
+    columns = model_fields(Workspace) + ['role']
+    selected = select_fields(fields, columns, columns)
+    result = list(selected_values(workspaces, selected))
+    if 'role' in selected:
+        for workspace in result:
+            workspace["role"] = workspace_role(request, workspace["id"])
+    return result
+
 @router.post("/")
 def create_workspace(request, data: WorkspaceIn):
-    workspace = Workspace.objects.create(
-        name=data.name,
-        description=data.description,
-        owner_uid=request.auth
-    )
+    with transaction.atomic():
+        workspace = Workspace.objects.create(
+            name=data.name,
+            description=data.description,
+            owner_uid=request.auth
+        )
+        record(request, "workspace.created", workspace.id, "workspace", workspace.id, name=workspace.name)
     return {"id": workspace.id, "name": workspace.name}
 
 @router.get("/{workspace_id}/")
 def get_workspace(request, workspace_id: int):
-    workspace = get_object_or_404(Workspace, id=workspace_id, owner_uid=request.auth)
+    workspace = get_object_or_404(Workspace, id=workspace_id, id__in=workspace_ids(request))
     return {
         "id": workspace.id,
         "name": workspace.name,
         "description": workspace.description,
         "owner_uid": workspace.owner_uid,
+        "role": workspace_role(request, workspace.id),
         "created_at": workspace.created_at
     }
 
 @router.put("/{workspace_id}/")
 def update_workspace(request, workspace_id: int, data: WorkspaceUpdate):
-    workspace = get_object_or_404(Workspace, id=workspace_id, owner_uid=request.auth)
+    workspace = get_object_or_404(Workspace, id=workspace_id, id__in=workspace_ids(request, EDITOR))
     if data.name is not None:
         workspace.name = data.name
     if data.description is not None:
         workspace.description = data.description
-    workspace.save()
+    with transaction.atomic():
+        workspace.save()
+        record(request, "workspace.updated", workspace.id, "workspace", workspace.id, fields=sorted(data.dict(exclude_none=True)))
     return {"success": True}
 
 @router.delete("/{workspace_id}/")
@@ -53,3 +77,72 @@ def delete_workspace(request, workspace_id: int):
     workspace = get_object_or_404(Workspace, id=workspace_id, owner_uid=request.auth)
     workspace.delete()
     return {"success": True}
+
+# Membros
+@router.get("/{workspace_id}/members/")
+def list_members(request, workspace_id: int):
+    workspace = get_object_or_404(Workspace, id=workspace_id, id__in=workspace_ids(request))
+    members = [{"id": None, "member_uid": workspace.owner_uid, "role": OWNER}]
+    members.extend(workspace.members.order_by('created_at').values('id', 'member_uid', 'role'))
+    return members
+
+@router.post("/{workspace_id}/members/")
+def add_member(request, workspace_id: int, data: MemberIn):
+    workspace = get_object_or_404(Workspace, id=workspace_id, owner_uid=request.auth)
+    if data.role not in dict(WorkspaceMember.ROLE_CHOICES):
+        raise HttpError(400, "Papel inválido")
+    with transaction.atomic():
+        member, created = WorkspaceMember.objects.update_or_create(
+            workspace=workspace,
+            member_uid=data.member_uid,
+            defaults={"role": data.role}
+        )
+        record(request, "member.added" if created else "member.updated", workspace.id, "member", member.id, member_uid=member.member_uid, role=member.role)
+    return {"id": member.id, "member_uid": member.member_uid, "role": member.role}
+
+@router.put("/{workspace_id}/members/{member_id}/")
+def update_member(request, workspace_id: int, member_id: int, data: MemberUpdate):
+    member = get_object_or_404(WorkspaceMember, id=member_id, workspace_id=workspace_id, workspace__owner_uid=request.auth)
+    if data.role not in dict(WorkspaceMember.ROLE_CHOICES):
+        raise HttpError(400, "Papel inválido")
+    member.role = data.role
+    with transaction.atomic():
+        member.save()
+        record(request, "member.updated", member.workspace_id, "member", member.id, member_uid=member.member_uid, role=member.role)
+    return {"success": True}
+
+@router.delete("/{workspace_id}/members/{member_id}/")
+def remove_member(request, workspace_id: int, member_id: int):
+    # O dono remove qualquer membro; um membro pode sair sozinho
+    member = get_object_or_404(WorkspaceMember, id=member_id, workspace_id=workspace_id)
+    if member.member_uid != request.auth:
+        get_object_or_404(Workspace, id=workspace_id, owner_uid=request.auth)
+    with transaction.atomic():
+        member.delete()
+        record(request, "member.removed", workspace_id, "member", member_id, member_uid=member.member_uid)
+    return {"success": True}
+
+# Atividade: paginação por cursor (before_id), sem OFFSET. Leitura pura:
+# eventos ainda no buffer de algum processo (activity.log) aparecem depois
+# do próximo flush, em até ACTIVITY_FLUSH_INTERVAL segundos
+ACTIVITY_PAGE_SIZE = 50
+ACTIVITY_MAX_PAGE_SIZE = 100
+
+@router.get("/{workspace_id}/activity/")
+def list_activity(request, workspace_id: int, before_id: int = None, limit: int = ACTIVITY_PAGE_SIZE, board_id: int = None, actor_uid: str = None):
+    workspace = get_object_or_404(Workspace, id=workspace_id, id__in=workspace_ids(request))
+    if limit < 1:
+        raise HttpError(400, "limit deve ser positivo")
+    limit = min(limit, ACTIVITY_MAX_PAGE_SIZE)
+    events = ActivityEvent.objects.filter(workspace_id=workspace.id)
+    if before_id is not None:
+        events = events.filter(id__lt=before_id)
+    if board_id is not None:
+        events = events.filter(board_id=board_id)
+    if actor_uid:
+        events = events.filter(actor_uid=actor_uid)
+    items = list(events.order_by('-id').values(
+        'id', 'board_id', 'actor_uid', 'action', 'object_type', 'object_id', 'payload', 'created_at'
+    )[:limit + 1])
+    next_before_id = items[limit - 1]["id"] if len(items) > limit else None
+    return {"items": items[:limit], "next_before_id": next_before_id}
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-19 14:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workspaces', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workspace',
+            name='owner_uid',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.CreateModel(
+            name='WorkspaceMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_uid', models.CharField(max_length=255)),
+                ('role', models.CharField(choices=[('editor', 'Editor'), ('viewer', 'Leitor')], default='editor', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('workspace', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='workspaces.workspace')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['member_uid', 'workspace'], name='workspaces__member__3d26bd_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='workspacemember',
+            constraint=models.UniqueConstraint(fields=('workspace', 'member_uid'), name='unique_workspace_member'),
+        ),
+    ]
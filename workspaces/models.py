@@ -4,8 +4,30 @@ from django.db import models
 class Workspace(models.Model):
     name = models.CharField(max_length = 30)
     description = models.TextField(null=True, blank=True)
-    owner_uid = models.CharField(max_length=255)
+    owner_uid = models.CharField(max_length=255, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class WorkspaceMember(models.Model):
+    ROLE_CHOICES = [
+        ('editor', 'Editor'),
+        ('viewer', 'Leitor'),
+    ]
+
+    workspace = models.ForeignKey(Workspace, on_delete=models.CASCADE, related_name='members')
+    member_uid = models.CharField(max_length=255)
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='editor')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['workspace', 'member_uid'], name='unique_workspace_member'),
+        ]
+        indexes = [
+            models.Index(fields=['member_uid', 'workspace']),
+        ]
+
+    def __str__(self):
+        return f"{self.member_uid} ({self.role})"
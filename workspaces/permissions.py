@@ -0,0 +1,58 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from .models import Workspace, WorkspaceMember
+
+# Papéis em ordem crescente de permissão; o dono vem de Workspace.owner_uid
+VIEWER = 'viewer'
+EDITOR = 'editor'
+OWNER = 'owner'
+ROLE_LEVELS = {VIEWER: 0, EDITOR: 1, OWNER: 2}
+
+
+def _version_key(uid):
+    return f"workspace_access_version:{uid}"
+
+
+def bump_access_version(uid):
+    # Não usamos incr: se a chave expirar, um contador recomeçaria em um
+    # número já usado e poderia reaproveitar um conjunto antigo do cache
+    cache.set(_version_key(uid), time.time_ns(), None)
+
+
+def load_access(uid):
+    # Sempre do primário: o resultado vai para o cache sob a versão nova e
+    # uma réplica atrasada gravaria ali um conjunto desatualizado
+    access = dict(WorkspaceMember.objects.using(DEFAULT_DB_ALIAS).filter(member_uid=uid).values_list('workspace_id', 'role'))
+    for workspace_id in Workspace.objects.using(DEFAULT_DB_ALIAS).filter(owner_uid=uid).values_list('id', flat=True):
+        access[workspace_id] = OWNER
+    return access
+
+
+def get_access(request):
+    # Resolvido uma vez por request; entre requests fica no cache até a
+    # versão do usuário mudar (ver workspaces.signals)
+    if not hasattr(request, '_workspace_access'):
+        uid = request.auth
+        version = cache.get(_version_key(uid), 0)
+        key = f"workspace_access:{uid}:{version}"
+        access = cache.get(key)
+        if access is None:
+            access = load_access(uid)
+            cache.set(key, access, settings.WORKSPACE_ACCESS_CACHE_TIMEOUT)
+        request._workspace_access = access
+    return request._workspace_access
+
+
+def workspace_ids(request, role=VIEWER):
+    level = ROLE_LEVELS[role]
+    return [
+        workspace_id
+        for workspace_id, workspace_role in get_access(request).items()
+        if ROLE_LEVELS[workspace_role] >= level
+    ]
+
+
+def workspace_role(request, workspace_id):
+    return get_access(request).get(workspace_id)
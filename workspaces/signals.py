@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Workspace, WorkspaceMember
+from .permissions import bump_access_version
+
+# A versão só muda depois do commit: antes dele, um request concorrente ainda
+# leria a associação antiga e a guardaria no cache já sob a versão nova
+
+def bump_on_commit(uid):
+    transaction.on_commit(lambda: bump_access_version(uid))
+
+@receiver(post_save, sender=Workspace)
+def invalidate_owner_access_on_create(sender, instance, created, **kwargs):
+    if created:
+        bump_on_commit(instance.owner_uid)
+
+@receiver(post_delete, sender=Workspace)
+def invalidate_owner_access_on_delete(sender, instance, **kwargs):
+    bump_on_commit(instance.owner_uid)
+
+@receiver(post_save, sender=WorkspaceMember)
+@receiver(post_delete, sender=WorkspaceMember)
+def invalidate_member_access(sender, instance, **kwargs):
+    bump_on_commit(instance.member_uid)
@@ -1,3 +1,32 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase
+from organiza_me.bench import bearer
+from .models import Workspace, WorkspaceMember
+from .permissions import _version_key
 
 # Create your tests here.
+class AccessInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.workspace = Workspace.objects.create(name='w', owner_uid='owner')
+        self.member = WorkspaceMember.objects.create(workspace=self.workspace, member_uid='member')
+
+    def can_read(self, uid):
+        client = Client(HTTP_AUTHORIZATION=bearer(uid))
+        return client.get(f'/api/workspaces/{self.workspace.id}/').status_code == 200
+
+    def test_version_changes_only_after_commit(self):
+        before = cache.get(_version_key('member'))
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.member.delete()
+                self.assertEqual(cache.get(_version_key('member')), before)
+        self.assertNotEqual(cache.get(_version_key('member')), before)
+
+    def test_removed_member_loses_cached_access(self):
+        self.assertTrue(self.can_read('member'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.delete()
+        self.assertFalse(self.can_read('member'))